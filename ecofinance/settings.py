@@ -134,7 +134,9 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 # Configuración de correo electrónico
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Se puede cambiar por el backend de archivo, consola o locmem para probar la bandeja de salida
+EMAIL_BACKEND = config['email'].get('backend', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config['email'].get('file_path', os.path.join(BASE_DIR, 'correos_enviados'))
 EMAIL_HOST = config['email']['host']
 EMAIL_PORT = int(config['email']['port'])
 EMAIL_USE_TLS = config['email'].getboolean('use_tls')
@@ -143,4 +145,74 @@ EMAIL_HOST_PASSWORD = config['email']['password']
 DEFAULT_FROM_EMAIL = config['email'].get('default_from_email', EMAIL_HOST_USER)
 
 # OpenAI API key
-OPENAI_API_KEY = config['openai']['api_key']
\ No newline at end of file
+OPENAI_API_KEY = config['openai']['api_key']
+OPENAI_BASE_URL = config['openai'].get('base_url', 'https://openrouter.ai/api/v1')
+OPENAI_MODELO = config['openai'].get('modelo', 'deepseek/deepseek-r1:free')
+OPENAI_TIMEOUT = config['openai'].getfloat('timeout', 60)
+OPENAI_MAX_CONEXIONES = config['openai'].getint('max_conexiones', 10)
+# 'falso' usa un cliente local sin red (finanzas.openai_utils.ClienteFalso)
+OPENAI_CLIENTE = config['openai'].get('cliente', 'openai')
+
+# Servicio de recomendaciones (finanzas/recomendaciones.py)
+RECOMENDACIONES_CACHE_SEGUNDOS = 30 * 24 * 3600
+RECOMENDACIONES_LIMITE_POR_HORA = config['openai'].getint('limite_por_hora', 10)
+# Tamaño máximo (tokens estimados) del prompt de recomendaciones, síntesis del mes incluida
+RECOMENDACIONES_PRESUPUESTO_TOKENS = config['openai'].getint('presupuesto_tokens', 600)
+# Caché (recomendaciones y dashboard). Sin la sección [cache] de config.ini se usa la caché
+# en memoria de cada proceso; con varios workers conviene un backend compartido (p. ej.
+# django.core.cache.backends.redis.RedisCache) para que la invalidación llegue a todos
+if config.has_section('cache'):
+    CACHES = {
+        'default': {
+            'BACKEND': config['cache']['backend'],
+            'LOCATION': config['cache'].get('location', ''),
+        }
+    }
+DASHBOARD_CACHE_SEGUNDOS = config.getint('cache', 'dashboard_segundos', fallback=24 * 3600)
+
+# Importación de transacciones desde archivos del banco (finanzas/importaciones.py)
+IMPORTACION_MAX_MB = 50
+
+# Instrumentación por petición (finanzas/instrumentacion.py): consultas SQL y tiempo de base
+# de datos, plantillas y servicios externos, con métricas en /metricas/. Desactivada por defecto
+INSTRUMENTACION = config.getboolean('instrumentacion', 'activa', fallback=False)
+# En modo estricto superar el presupuesto de consultas lanza una excepción (pruebas, benchmarks)
+INSTRUMENTACION_ESTRICTA = config.getboolean('instrumentacion', 'estricta', fallback=False)
+# Token para leer /metricas/ sin sesión (cabecera "Authorization: Bearer <token>")
+INSTRUMENTACION_TOKEN = config.get('instrumentacion', 'token', fallback='')
+# Máximo de consultas SQL por petición según el nombre de la URL; las vistas sin entrada no tienen límite
+# (las cifras incluyen las consultas de sesión y usuario y la primera transacción de un usuario, que crea
+# sus acumulados y saldos; no deben crecer con el volumen de datos)
+PRESUPUESTO_CONSULTAS = {
+    'dashboard': 6,
+    'dashboard_widget': 10,
+    'evolucion_saldo': 5,
+    'lista_transacciones': 10,
+    'nueva_transaccion': 18,
+    'eliminar_transaccion': 12,
+    'eliminar_recurrente': 12,
+    'descargar_transacciones': 5,
+    'descargar_transacciones_pdf': 5,
+    'descargar_transacciones_excel': 5,
+    'lista_objetivos': 5,
+    'nuevo_objetivo': 5,
+    'editar_objetivo': 5,
+    'añadir_dinero_objetivo': 16,
+    'eliminar_dinero_objetivo': 6,
+    'eliminar_objetivo': 8,
+    'perfil_usuario': 4,
+    'establecer_presupuesto': 5,
+    'establecer_balance_inicial': 18,
+    'enviar_transacciones_mes': 8,
+    'estado_tarea': 4,
+    'generar_recomendaciones': 8,
+}
+if INSTRUMENTACION:
+    MIDDLEWARE.insert(0, 'finanzas.instrumentacion.MedicionMiddleware')
+    TEMPLATES[0]['BACKEND'] = 'finanzas.instrumentacion.DjangoTemplatesMedidas'
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {'consola': {'class': 'logging.StreamHandler'}},
+        'loggers': {'finanzas.instrumentacion': {'handlers': ['consola'], 'level': 'INFO'}},
+    }
@@ -0,0 +1,175 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from . import cache_dashboard, saldos
+from .models import AcumuladoMensual, Transaccion
+
+
+def _normalizar(transaccion):
+    """
+    Devuelve (fecha, monto) tal como quedan guardados en la base de datos.
+    Las vistas a veces asignan un datetime o un float antes de guardar.
+    """
+    fecha = Transaccion._meta.get_field('fecha').to_python(transaccion.fecha)
+    monto = Transaccion._meta.get_field('monto').to_python(transaccion.monto)
+    return fecha, monto
+
+
+@dataclass
+class Cambios:
+    """
+    Cambios pendientes en los acumulados mensuales y en los saldos: se juntan en memoria
+    (uno por mes, tipo y categoría y uno por día) y se guardan con ``guardar``.
+    """
+    mensuales: dict = field(default_factory=lambda: defaultdict(lambda: [Decimal('0'), 0]))
+    saldos: dict = field(default_factory=lambda: defaultdict(Decimal))
+
+    def agregar(self, transacciones, signo=1):
+        for transaccion in transacciones:
+            if transaccion.usuario_id is None or transaccion.fecha is None:
+                continue
+            fecha, monto = _normalizar(transaccion)
+            clave = (transaccion.usuario_id, fecha.year, fecha.month, transaccion.tipo, transaccion.categoria or '')
+            self.mensuales[clave][0] += signo * monto
+            self.mensuales[clave][1] += signo
+            self.saldos[(transaccion.usuario_id, fecha)] += signo * saldos.efecto(transaccion.tipo, monto)
+
+
+def guardar(cambios):
+    """
+    Aplica ``cambios`` a los acumulados mensuales y a los saldos.
+    Debe llamarse dentro de la misma transacción que crea o elimina las filas.
+    """
+    with transaction.atomic():
+        for (usuario_id, anio, mes, tipo, categoria), (total, cantidad) in cambios.mensuales.items():
+            filtro = AcumuladoMensual.objects.filter(
+                usuario_id=usuario_id, anio=anio, mes=mes, tipo=tipo, categoria=categoria
+            )
+            valores = {
+                'total': F('total') + total,
+                'cantidad': F('cantidad') + cantidad,
+            }
+            if filtro.update(**valores):
+                continue
+            try:
+                # Savepoint propio: si otra petición creó la fila a la vez, se actualiza la suya
+                with transaction.atomic():
+                    AcumuladoMensual.objects.create(
+                        usuario_id=usuario_id, anio=anio, mes=mes, tipo=tipo, categoria=categoria,
+                        total=total, cantidad=cantidad
+                    )
+            except IntegrityError:
+                filtro.update(**valores)
+        saldos.aplicar(cambios.saldos)
+
+
+def _aplicar(transacciones, signo):
+    cambios = Cambios()
+    cambios.agregar(transacciones, signo)
+    guardar(cambios)
+
+
+def registrar_altas(transacciones):
+    """
+    Suma las transacciones recién creadas a los acumulados mensuales y al saldo del usuario.
+    Debe llamarse dentro de la misma transacción que las inserta.
+    """
+    _aplicar(transacciones, 1)
+
+
+def registrar_bajas(transacciones):
+    """
+    Resta las transacciones que se van a eliminar de los acumulados mensuales y del saldo del usuario.
+    Debe llamarse dentro de la misma transacción que las elimina.
+    """
+    _aplicar(transacciones, -1)
+
+
+def registrar_cambio(anterior, actual):
+    """
+    Reemplaza en los acumulados mensuales y en el saldo la versión ``anterior`` de una
+    transacción editada (la que estaba guardada) por la ``actual``. Sirve igual si cambian
+    la fecha, el tipo, la categoría o el monto. Debe llamarse dentro de la misma transacción
+    que guarda la edición.
+    """
+    cambios = Cambios()
+    cambios.agregar([anterior], -1)
+    cambios.agregar([actual], 1)
+    guardar(cambios)
+
+
+def calcular_desde_transacciones(usuarios=None):
+    """
+    Recalcula los acumulados a partir de las transacciones.
+    Devuelve un diccionario {(usuario_id, anio, mes, tipo, categoria): (total, cantidad)}.
+    """
+    transacciones = Transaccion.objects.filter(usuario__isnull=False, fecha__isnull=False)
+    if usuarios is not None:
+        transacciones = transacciones.filter(usuario__in=usuarios)
+    filas = (
+        transacciones
+        .annotate(anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'))
+        .values('usuario_id', 'anio', 'mes', 'tipo', 'categoria')
+        .annotate(total=Sum('monto'), cantidad=Count('id'))
+        .order_by()
+    )
+    esperado = defaultdict(lambda: [Decimal('0'), 0])
+    for fila in filas:
+        # NULL y '' se guardan juntos como "Sin categoría"
+        clave = (fila['usuario_id'], fila['anio'], fila['mes'], fila['tipo'], fila['categoria'] or '')
+        esperado[clave][0] += fila['total']
+        esperado[clave][1] += fila['cantidad']
+    return {clave: tuple(valor) for clave, valor in esperado.items()}
+
+
+def buscar_diferencias(usuarios=None):
+    """
+    Compara los acumulados guardados con los calculados desde las transacciones.
+    Devuelve una lista de (clave, guardado, esperado) con las filas que no coinciden.
+    """
+    esperado = calcular_desde_transacciones(usuarios)
+    acumulados = AcumuladoMensual.objects.all()
+    if usuarios is not None:
+        acumulados = acumulados.filter(usuario__in=usuarios)
+    guardado = {
+        (a.usuario_id, a.anio, a.mes, a.tipo, a.categoria): (a.total, a.cantidad)
+        for a in acumulados
+        if a.cantidad or a.total
+    }
+    diferencias = []
+    for clave in sorted(set(esperado) | set(guardado)):
+        valor_guardado = guardado.get(clave, (Decimal('0'), 0))
+        valor_esperado = esperado.get(clave, (Decimal('0'), 0))
+        if valor_guardado != valor_esperado:
+            diferencias.append((clave, valor_guardado, valor_esperado))
+    return diferencias
+
+
+@transaction.atomic
+def reconstruir(usuarios=None):
+    """
+    Reemplaza los acumulados por los calculados desde las transacciones.
+    Devuelve el número de filas creadas.
+    """
+    esperado = calcular_desde_transacciones(usuarios)
+    acumulados = AcumuladoMensual.objects.all()
+    if usuarios is not None:
+        acumulados = acumulados.filter(usuario__in=usuarios)
+    afectados = set(acumulados.values_list('usuario_id', flat=True).distinct())
+    afectados.update(usuario_id for usuario_id, *_ in esperado)
+    acumulados.delete()
+    for usuario_id in afectados:
+        cache_dashboard.invalidar(usuario_id)
+    AcumuladoMensual.objects.bulk_create([
+        AcumuladoMensual(
+            usuario_id=usuario_id, anio=anio, mes=mes, tipo=tipo, categoria=categoria,
+            total=total, cantidad=cantidad
+        )
+        for (usuario_id, anio, mes, tipo, categoria), (total, cantidad) in esperado.items()
+    ], batch_size=1000)
+    return len(esperado)
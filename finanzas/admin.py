@@ -1,7 +1,35 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Transaccion, ObjetivoAhorro
+from .acumulados import registrar_altas, registrar_bajas, registrar_cambio
+from .models import Transaccion, ObjetivoAhorro, CorreoPendiente, Tarea
 
-admin.site.register(Transaccion)
-admin.site.register(ObjetivoAhorro)
 
+@admin.register(Transaccion)
+class TransaccionAdmin(admin.ModelAdmin):
+    # Los acumulados mensuales y los saldos se mantienen al crear, editar y eliminar desde aquí
+    # igual que desde las vistas (ver finanzas/acumulados.py)
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            anterior = Transaccion.objects.select_for_update().get(pk=obj.pk) if change else None
+            super().save_model(request, obj, form, change)
+            if anterior is None:
+                registrar_altas([obj])
+            else:
+                registrar_cambio(anterior, obj)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            registrar_bajas([obj])
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            registrar_bajas(queryset)
+            super().delete_queryset(request, queryset)
+
+
+admin.site.register(ObjetivoAhorro)
+admin.site.register(CorreoPendiente)
+admin.site.register(Tarea)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FinanzasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finanzas'
+
+    def ready(self):
+        # Conectar los receptores de señales (invalidación de la caché del dashboard)
+        from . import signals
@@ -0,0 +1,119 @@
+"""
+Caché por usuario de las partes costosas del dashboard (cifras del mes, gráficos, selector
+de meses y progreso de objetivos).
+
+Cada usuario tiene un número de versión en la caché que forma parte de todas sus claves.
+Las señales de finanzas/signals.py lo incrementan cuando cambia una transacción, un objetivo,
+un presupuesto o una serie recurrente del usuario: las entradas anteriores dejan de leerse y expiran solas, sin
+tener que buscarlas ni borrarlas. Funciona con cualquier backend de caché de Django (locmem
+en desarrollo, uno compartido entre procesos en producción para que la invalidación llegue
+a todos los workers).
+"""
+import logging
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'dashboard'
+METRICAS = ('aciertos', 'fallos', 'invalidaciones')
+
+
+def _clave_version(usuario_id):
+    return f'{PREFIJO}:version:{usuario_id}'
+
+
+def _clave_modificado(usuario_id):
+    return f'{PREFIJO}:modificado:{usuario_id}'
+
+
+def version(usuario_id):
+    """
+    Versión actual de la caché del usuario.
+    """
+    clave = _clave_version(usuario_id)
+    actual = cache.get(clave)
+    if actual is None:
+        # Si la versión se perdió (expiró o el backend se reinició) se parte de un valor
+        # nuevo, nunca de 1, para no volver a leer entradas de una versión anterior
+        cache.add(clave, time.time_ns(), None)
+        actual = cache.get(clave)
+    return actual
+
+
+def _incrementar(usuario_id):
+    try:
+        cache.incr(_clave_version(usuario_id))
+    except ValueError:
+        cache.set(_clave_version(usuario_id), time.time_ns(), None)
+    cache.set(_clave_modificado(usuario_id), time.time(), None)
+    _contar('invalidaciones')
+
+
+def modificado(usuario_id):
+    """
+    Momento (UTC) del último cambio en los datos del usuario, para la cabecera Last-Modified
+    de los widgets. Si no se conoce (p. ej. se reinició la caché) se usa el momento actual:
+    a lo sumo el navegador vuelve a pedir datos que no cambiaron.
+    """
+    marca = cache.get(_clave_modificado(usuario_id))
+    if marca is None:
+        marca = time.time()
+        cache.add(_clave_modificado(usuario_id), marca, None)
+    return datetime.fromtimestamp(marca, tz=timezone.utc)
+
+
+def invalidar(usuario_id):
+    """
+    Descarta todo lo guardado para el usuario incrementando su versión. Dentro de una
+    transacción el incremento espera al commit: antes, otra petición podría volver a
+    guardar los datos viejos con la versión nueva.
+    """
+    if usuario_id is None:
+        return
+    transaction.on_commit(lambda: _incrementar(usuario_id))
+
+
+def _contar(metrica):
+    clave = f'{PREFIJO}:metricas:{metrica}'
+    cache.add(clave, 0, None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, 1, None)
+
+
+def metricas():
+    """
+    Contadores de aciertos, fallos e invalidaciones desde el último ``reiniciar_metricas``.
+    """
+    valores = cache.get_many([f'{PREFIJO}:metricas:{metrica}' for metrica in METRICAS])
+    resultado = {metrica: valores.get(f'{PREFIJO}:metricas:{metrica}', 0) for metrica in METRICAS}
+    consultas = resultado['aciertos'] + resultado['fallos']
+    resultado['tasa_aciertos'] = round(resultado['aciertos'] / consultas, 3) if consultas else None
+    return resultado
+
+
+def reiniciar_metricas():
+    cache.delete_many([f'{PREFIJO}:metricas:{metrica}' for metrica in METRICAS])
+
+
+def obtener(usuario_id, clave, calcular):
+    """
+    Devuelve el valor guardado para ``clave`` (p. ej. "2025-06:2025-06-14") en la versión
+    actual del usuario, o lo calcula con ``calcular()`` y lo guarda.
+    """
+    clave_cache = f'{PREFIJO}:{usuario_id}:{version(usuario_id)}:{clave}'
+    valor = cache.get(clave_cache)
+    if valor is not None:
+        _contar('aciertos')
+        return valor
+    _contar('fallos')
+    logger.debug('Caché del dashboard sin %s', clave_cache)
+    valor = calcular()
+    cache.set(clave_cache, valor, settings.DASHBOARD_CACHE_SEGUNDOS)
+    return valor
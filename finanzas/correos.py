@@ -0,0 +1,139 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .instrumentacion import medir
+from .models import CorreoPendiente
+
+logger = logging.getLogger(__name__)
+
+MAX_INTENTOS = 5
+ESPERA_BASE = timedelta(seconds=30)  # Se duplica en cada reintento
+ESPERA_MAXIMA = timedelta(hours=1)
+# Tiempo que un lote reservado por un worker queda fuera de la cola mientras se envía
+RESERVA = timedelta(minutes=10)
+
+
+def encolar_correo(asunto, mensaje, remitente, destinatarios, usuario=None, adjunto=None):
+    """
+    Guarda un correo en la bandeja de salida para que lo envíe el worker. Los argumentos
+    siguen el orden de ``send_mail``; si ``remitente`` es None se usa DEFAULT_FROM_EMAIL.
+    ``adjunto`` es opcional: (nombre, contenido en bytes, tipo MIME), como en ``EmailMessage.attach``.
+
+    Si se llama dentro de una transacción, el correo solo queda encolado si la transacción
+    se confirma.
+    """
+    correo = CorreoPendiente(
+        usuario=usuario,
+        asunto=asunto,
+        mensaje=mensaje,
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+    )
+    if adjunto:
+        correo.adjunto_nombre, correo.adjunto_contenido, correo.adjunto_tipo = adjunto
+    correo.save()
+    return correo
+
+
+def espera_reintento(intentos):
+    """
+    Espera antes del siguiente intento: backoff exponencial acotado por ESPERA_MAXIMA.
+    """
+    return min(ESPERA_BASE * 2 ** (intentos - 1), ESPERA_MAXIMA)
+
+
+def _construir_mensaje(correo, conexion):
+    mensaje = EmailMessage(
+        correo.asunto,
+        correo.mensaje,
+        correo.remitente,
+        correo.destinatarios,
+        connection=conexion,
+    )
+    if correo.adjunto_nombre:
+        mensaje.attach(correo.adjunto_nombre, bytes(correo.adjunto_contenido), correo.adjunto_tipo)
+    return mensaje
+
+
+def reservar_pendientes(lote=50):
+    """
+    Toma hasta ``lote`` correos pendientes cuyo próximo intento ya venció y los reserva
+    durante RESERVA: cuenta el intento y corre el próximo intento al fin de la reserva.
+    La transacción solo dura la reserva (las filas se bloquean con ``skip_locked`` para que
+    varios workers no tomen el mismo correo); el envío ocurre después, sin candados. Si el
+    worker muere a mitad del envío, los correos no confirmados vuelven a la cola al vencer
+    la reserva.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        correos = list(
+            CorreoPendiente.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado='PENDIENTE', proximo_intento__lte=ahora)
+            .order_by('proximo_intento', 'id')[:lote]
+        )
+        for correo in correos:
+            correo.intentos += 1
+            correo.proximo_intento = ahora + RESERVA
+        CorreoPendiente.objects.bulk_update(correos, ['intentos', 'proximo_intento'])
+    return correos
+
+
+def procesar_pendientes(conexion, lote=50, max_intentos=MAX_INTENTOS):
+    """
+    Reserva un lote de correos pendientes y los envía usando ``conexion`` para todos.
+    Los que fallan se reprograman con backoff y, al agotar ``max_intentos``, quedan como
+    FALLIDO. Devuelve (enviados, fallidos).
+    """
+    enviados = 0
+    fallidos = 0
+    for correo in reservar_pendientes(lote):
+        try:
+            # open() no hace nada si la conexión sigue abierta; la reabre tras un fallo
+            with medir('smtp'):
+                conexion.open()
+                conexion.send_messages([_construir_mensaje(correo, conexion)])
+        except Exception as e:
+            fallidos += 1
+            correo.ultimo_error = f'{type(e).__name__}: {e}'
+            if correo.intentos >= max_intentos:
+                correo.estado = 'FALLIDO'
+                logger.error('Correo %s descartado tras %s intentos: %s', correo.id, correo.intentos, e)
+            else:
+                correo.proximo_intento = timezone.now() + espera_reintento(correo.intentos)
+                logger.warning('Correo %s falló (intento %s): %s', correo.id, correo.intentos, e)
+            # La conexión puede haber quedado inutilizable: se descarta y se abre otra
+            conexion.close()
+        else:
+            enviados += 1
+            correo.estado = 'ENVIADO'
+            correo.fecha_envio = timezone.now()
+            correo.ultimo_error = ''
+        # Cada resultado se guarda apenas se conoce: si el worker muere, solo se reenvía
+        # el correo que estaba en curso
+        correo.save(update_fields=['estado', 'proximo_intento', 'ultimo_error', 'fecha_envio'])
+    return enviados, fallidos
+
+
+def vaciar_bandeja(lote=50, max_intentos=MAX_INTENTOS):
+    """
+    Envía lotes hasta que no quede ningún correo vencido, con una sola conexión SMTP.
+    Devuelve (enviados, fallidos).
+    """
+    enviados = 0
+    fallidos = 0
+    # Con la cola vacía no se abre la conexión: el worker consulta cada pocos segundos
+    if not CorreoPendiente.objects.filter(estado='PENDIENTE', proximo_intento__lte=timezone.now()).exists():
+        return enviados, fallidos
+    with get_connection(fail_silently=False) as conexion:
+        while True:
+            enviados_lote, fallidos_lote = procesar_pendientes(conexion, lote, max_intentos)
+            enviados += enviados_lote
+            fallidos += fallidos_lote
+            if enviados_lote + fallidos_lote < lote:
+                return enviados, fallidos
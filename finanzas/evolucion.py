@@ -0,0 +1,194 @@
+"""
+Evolución del saldo, los ingresos y los gastos de un usuario en el tiempo (gráfico del dashboard).
+
+Los totales de cada periodo (día, semana o mes) y el saldo al cierre de cada uno se calculan en
+la base de datos con funciones de ventana: una suma particionada por periodo para ingresos y
+gastos y una suma acumulada ordenada por periodo para el saldo, que parte del saldo mantenido
+al día anterior al rango (finanzas/saldos.py). ``SELECT DISTINCT`` deja una fila por periodo.
+
+Para que un rango de varios años no envíe miles de puntos, ``reducir`` conserva los puntos más
+representativos de la curva de saldo con Largest-Triangle-Three-Buckets y suma los ingresos y
+gastos de los periodos descartados en el punto conservado siguiente: los totales no cambian.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When, Window
+from django.db.models.functions import Trunc
+
+from .models import Transaccion
+from .reglas import sumar_meses
+from .saldos import saldo_al
+
+# Granularidad de la API -> tipo de Trunc (la fecha ya es el día: no hace falta truncarla)
+GRANULARIDADES = {'dia': None, 'semana': 'week', 'mes': 'month'}
+MAX_PUNTOS = 1000
+# Largo máximo del rango: 10 años, el mayor del selector del dashboard (con los bisiestos).
+# Acota los periodos que se recorren en Python al rellenar los que no tienen transacciones
+MAX_DIAS = 10 * 366
+# Primera fecha válida para ``desde``: el saldo inicial se lee al día anterior
+MIN_FECHA = date.min + timedelta(days=1)
+
+CERO = Decimal('0')
+
+
+@dataclass
+class Punto:
+    fecha: date  # primer día del periodo
+    ingresos: Decimal
+    gastos: Decimal
+    saldo: Decimal  # al cierre del periodo
+
+
+def inicio_periodo(fecha, granularidad):
+    if granularidad == 'semana':
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == 'mes':
+        return fecha.replace(day=1)
+    return fecha
+
+
+def periodos(desde, hasta, granularidad):
+    """
+    Genera el primer día de cada periodo entre ``desde`` y ``hasta``.
+    """
+    actual = inicio_periodo(desde, granularidad)
+    while actual <= hasta:
+        yield actual
+        try:
+            if granularidad == 'mes':
+                actual = sumar_meses(actual, 1)
+            else:
+                actual += timedelta(days=7 if granularidad == 'semana' else 1)
+        except (ValueError, OverflowError):
+            # El periodo siguiente empezaría después de date.max
+            return
+
+
+def _importe(condicion, valor):
+    return Case(When(condicion, then=valor), default=Value(CERO), output_field=DecimalField())
+
+
+def calcular_serie(usuario, desde, hasta, granularidad='dia'):
+    """
+    Devuelve (saldo al día anterior a ``desde``, [Punto] con un punto por periodo, incluidos
+    los periodos sin transacciones). Como en el dashboard, el balance inicial cuenta para el
+    saldo pero no como ingreso.
+    """
+    saldo_inicial = saldo_al(usuario, desde - timedelta(days=1))
+    periodo = Trunc('fecha', GRANULARIDADES[granularidad]) if GRANULARIDADES[granularidad] else F('fecha')
+    neto = Case(
+        When(tipo='INGRESO', then=F('monto')),
+        When(tipo='GASTO', then=-F('monto')),
+        default=Value(CERO),
+        output_field=DecimalField(),
+    )
+    filas = (
+        Transaccion.objects
+        .filter(usuario=usuario, fecha__gte=desde, fecha__lte=hasta)
+        .annotate(periodo=periodo)
+        .annotate(
+            ingresos=Window(
+                Sum(_importe(Q(tipo='INGRESO') & ~Q(descripcion='Balance Inicial'), F('monto'))),
+                partition_by=F('periodo'),
+            ),
+            gastos=Window(Sum(_importe(Q(tipo='GASTO'), F('monto'))), partition_by=F('periodo')),
+            # El marco por defecto (RANGE hasta la fila actual) incluye todas las filas del mismo
+            # periodo, así que todas llevan el acumulado al cierre del periodo
+            acumulado=Window(Sum(neto), order_by=F('periodo').asc()),
+        )
+        .values_list('periodo', 'ingresos', 'gastos', 'acumulado')
+        .distinct()
+        .order_by('periodo')
+    )
+    por_periodo = {fila[0]: fila[1:] for fila in filas}
+
+    puntos = []
+    saldo = saldo_inicial
+    for inicio in periodos(desde, hasta, granularidad):
+        ingresos, gastos, acumulado = por_periodo.get(inicio, (CERO, CERO, None))
+        if acumulado is not None:
+            saldo = saldo_inicial + acumulado
+        puntos.append(Punto(inicio, ingresos, gastos, saldo))
+    return saldo_inicial, puntos
+
+
+def lttb(valores, umbral):
+    """
+    Índices de los ``umbral`` valores (equiespaciados) que conserva Largest-Triangle-Three-Buckets:
+    el primero, el último y, de cada tramo intermedio, el que forma el triángulo de mayor área
+    con el punto elegido antes y el promedio del tramo siguiente.
+    """
+    cantidad = len(valores)
+    if umbral >= cantidad:
+        return list(range(cantidad))
+    if umbral < 3:
+        return [0, cantidad - 1][:umbral]
+
+    tamanio = (cantidad - 2) / (umbral - 2)
+    indices = [0]
+    anterior = 0
+    for tramo in range(umbral - 2):
+        inicio = int(tramo * tamanio) + 1
+        fin = int((tramo + 1) * tamanio) + 1
+        siguiente_fin = min(int((tramo + 2) * tamanio) + 1, cantidad)
+        promedio_x = (fin + siguiente_fin - 1) / 2
+        promedio_y = sum(valores[fin:siguiente_fin]) / (siguiente_fin - fin)
+
+        x_anterior, y_anterior = anterior, valores[anterior]
+        mejor, mayor_area = inicio, -1
+        for indice in range(inicio, fin):
+            area = abs(
+                (x_anterior - promedio_x) * (valores[indice] - y_anterior)
+                - (x_anterior - indice) * (promedio_y - y_anterior)
+            )
+            if area > mayor_area:
+                mejor, mayor_area = indice, area
+        indices.append(mejor)
+        anterior = mejor
+    indices.append(cantidad - 1)
+    return indices
+
+
+def reducir(puntos, maximo):
+    """
+    Deja como mucho ``maximo`` puntos. Cada punto conservado suma los ingresos y gastos de
+    los periodos descartados desde el conservado anterior.
+    """
+    indices = lttb([float(punto.saldo) for punto in puntos], maximo)
+    reducidos = []
+    desde = 0
+    for indice in indices:
+        tramo = puntos[desde:indice + 1]
+        reducidos.append(Punto(
+            fecha=puntos[indice].fecha,
+            ingresos=sum((punto.ingresos for punto in tramo), CERO),
+            gastos=sum((punto.gastos for punto in tramo), CERO),
+            saldo=puntos[indice].saldo,
+        ))
+        desde = indice + 1
+    return reducidos
+
+
+def evolucion(usuario, desde, hasta, granularidad='dia', maximo=MAX_PUNTOS):
+    """
+    Serie lista para JSON: saldo inicial, cantidad de periodos y los puntos (ya reducidos).
+    """
+    saldo_inicial, puntos = calcular_serie(usuario, desde, hasta, granularidad)
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'granularidad': granularidad,
+        'saldo_inicial': float(saldo_inicial),
+        'periodos': len(puntos),
+        'puntos': [
+            {
+                'fecha': punto.fecha.isoformat(),
+                'ingresos': float(punto.ingresos),
+                'gastos': float(punto.gastos),
+                'saldo': float(punto.saldo),
+            }
+            for punto in reducir(puntos, maximo)
+        ],
+    }
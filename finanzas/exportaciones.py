@@ -0,0 +1,267 @@
+import csv
+import tempfile
+from functools import cache
+
+# reportlab y openpyxl se importan dentro de las funciones que los usan: son pesados y
+# la mayoría de los procesos (peticiones normales, comandos) nunca generan un PDF o un Excel.
+
+
+COLUMNAS = ['Fecha', 'Descripción', 'Categoría', 'Tipo', 'Monto']
+CAMPOS = ('fecha', 'descripcion', 'categoria', 'tipo', 'monto')
+
+
+def formatear_monto(monto):
+    """
+    Formatea un monto como pesos chilenos sin decimales (ej: $1.234.567).
+    """
+    return f"${monto:,.0f}".replace(',', '.')
+
+
+def iterar_filas(transacciones, tamano_lote=2000):
+    """
+    Recorre un queryset de Transaccion por lotes con ``values_list``,
+    sin cargar el resultado completo ni instanciar modelos.
+    """
+    return transacciones.values_list(*CAMPOS).iterator(chunk_size=tamano_lote)
+
+
+class _Eco:
+    """
+    Pseudo-archivo cuyo ``write`` devuelve lo escrito, para que ``csv.writer`` genere texto
+    sin acumularlo en memoria.
+    """
+    def write(self, valor):
+        return valor
+
+
+def generar_csv(transacciones, tamano_lote=2000, tamano_bloque=64 * 1024):
+    """
+    Genera el CSV (separado por punto y coma) en bloques de bytes de ~``tamano_bloque``.
+    El primer bloque lleva el BOM de UTF-8 para que Excel reconozca los acentos.
+    """
+    escritor = csv.writer(_Eco(), delimiter=';')
+    bloque = ['\ufeff', escritor.writerow(COLUMNAS)]
+    tamano = 0
+    for fecha, descripcion, categoria, tipo, monto in iterar_filas(transacciones, tamano_lote):
+        linea = escritor.writerow([
+            fecha.strftime('%d/%m/%Y'),
+            descripcion,
+            categoria or 'Sin categoría',
+            tipo,
+            formatear_monto(monto),
+        ])
+        bloque.append(linea)
+        tamano += len(linea)
+        if tamano >= tamano_bloque:
+            yield ''.join(bloque).encode('utf-8')
+            bloque = []
+            tamano = 0
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+# --- PDF ---
+
+PULGADA = 72  # puntos PDF (equivale a reportlab.lib.units.inch)
+# Fecha, tipo y monto tienen un ancho acotado ('31/12/2024', 'INGRESO', '$-100.000.000') y sus
+# columnas alcanzan para el más largo; descripción y categoría se recortan al ancho de la suya
+ANCHOS_COLUMNAS_PDF = [0.9 * PULGADA, 2.3 * PULGADA, 1.3 * PULGADA, 0.9 * PULGADA, 1.1 * PULGADA]
+RELLENO_CELDA_PDF = 6  # LEFTPADDING y RIGHTPADDING por defecto de las tablas de reportlab
+FUENTE_FILAS_PDF = ('Helvetica', 10)
+ALTO_TITULO_PDF = 50  # Espacio que ocupa el título en la primera página
+
+
+@cache
+def estilo_tabla_pdf():
+    """
+    Estilo común a todas las páginas (se construye una vez por proceso). Las filas alternadas
+    se pintan con ROWBACKGROUNDS en lugar de añadir un comando por fila.
+    """
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), FUENTE_FILAS_PDF[0]),
+        ('FONTSIZE', (0, 1), (-1, -1), FUENTE_FILAS_PDF[1]),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ALIGN', (4, 1), (4, -1), 'RIGHT'),  # Alinear montos a la derecha
+    ])
+
+
+def tabla_pdf(filas):
+    from reportlab.platypus import Table
+
+    tabla = Table([COLUMNAS] + filas, colWidths=ANCHOS_COLUMNAS_PDF)
+    tabla.setStyle(estilo_tabla_pdf())
+    return tabla
+
+
+@cache
+def filas_por_pagina_pdf(alto_pagina):
+    """
+    Devuelve (filas de la primera página, filas de las demás) para páginas de ``alto_pagina``
+    puntos. El alto de la cabecera y de cada fila se mide con reportlab una vez por proceso.
+    """
+    alto_cabecera = tabla_pdf([]).wrap(0, 0)[1]
+    alto_fila = tabla_pdf([['x'] * len(COLUMNAS)]).wrap(0, 0)[1] - alto_cabecera
+    disponible = alto_pagina - 2 * PULGADA - alto_cabecera
+    return int((disponible - ALTO_TITULO_PDF) // alto_fila), int(disponible // alto_fila)
+
+
+def _recortar(texto, columna):
+    """
+    Recorta ``texto`` con '…' para que quepa en una línea de la ``columna`` (las filas tienen
+    alto fijo: los textos largos no se parten en varias líneas). Se mide el ancho real en la
+    fuente de las filas, no el número de caracteres.
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    ancho = ANCHOS_COLUMNAS_PDF[columna] - 2 * RELLENO_CELDA_PDF
+    if stringWidth(texto, *FUENTE_FILAS_PDF) <= ancho:
+        return texto
+    # Prefijo más largo que cabe junto con los puntos suspensivos (búsqueda binaria)
+    bajo, alto = 0, len(texto) - 1
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if stringWidth(texto[:medio].rstrip() + '…', *FUENTE_FILAS_PDF) <= ancho:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return texto[:bajo].rstrip() + '…'
+
+
+def fila_pdf(fecha, descripcion, categoria, tipo, monto):
+    return [
+        fecha.strftime('%d/%m/%Y'),
+        _recortar(descripcion, 1),
+        _recortar(categoria or 'Sin categoría', 2),
+        tipo,
+        formatear_monto(monto),
+    ]
+
+
+def _paginas(filas, primera, resto):
+    pagina = []
+    capacidad = primera
+    for fila in filas:
+        pagina.append(fila)
+        if len(pagina) == capacidad:
+            yield pagina
+            pagina = []
+            capacidad = resto
+    if pagina:
+        yield pagina
+
+
+def generar_pdf(transacciones, destino, titulo="Historial de Transacciones", tamano_lote=2000):
+    """
+    Escribe el PDF de las transacciones en ``destino`` (ruta o archivo binario).
+
+    Las filas se leen por lotes y cada página es una tabla independiente con la cabecera
+    repetida y tantas filas como caben entre los márgenes, que se dibuja y se descarta; así
+    nunca se arma una tabla gigante que reportlab tenga que partir. Devuelve el número de páginas.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    ancho, alto = letter
+    margen = PULGADA
+    pdf = canvas.Canvas(destino, pagesize=letter, pageCompression=1)
+    pdf.setTitle(titulo)
+
+    filas = (fila_pdf(*valores) for valores in iterar_filas(transacciones, tamano_lote))
+
+    numero = 0
+    for numero, pagina in enumerate(_paginas(filas, *filas_por_pagina_pdf(alto)), start=1):
+        tope = alto - margen
+        if numero == 1:
+            pdf.setFont('Helvetica-Bold', 16)
+            pdf.drawString(margen, tope - 16, titulo)
+            tope -= ALTO_TITULO_PDF
+        tabla = tabla_pdf(pagina)
+        _, alto_tabla = tabla.wrapOn(pdf, ancho - 2 * margen, tope - margen)
+        tabla.drawOn(pdf, margen, tope - alto_tabla)
+        pdf.setFont('Helvetica', 9)
+        pdf.drawRightString(ancho - margen, margen / 2, f"Página {numero}")
+        pdf.showPage()
+
+    if numero == 0:
+        # Sin transacciones: solo el título y la cabecera
+        pdf.setFont('Helvetica-Bold', 16)
+        pdf.drawString(margen, alto - margen - 16, titulo)
+        tabla = tabla_pdf([])
+        _, alto_tabla = tabla.wrapOn(pdf, ancho - 2 * margen, alto)
+        tabla.drawOn(pdf, margen, alto - margen - ALTO_TITULO_PDF - alto_tabla)
+        pdf.showPage()
+        numero = 1
+
+    pdf.save()
+    return numero
+
+
+# --- Excel ---
+
+ANCHOS_COLUMNAS_EXCEL = {'A': 12, 'B': 40, 'C': 20, 'D': 10, 'E': 14}
+FORMATO_FECHA_EXCEL = 'DD/MM/YYYY'
+FORMATO_MONTO_EXCEL = '"$"#,##0'
+# Hasta este tamaño el .xlsx se mantiene en memoria; si lo supera, se vuelca a disco
+UMBRAL_MEMORIA_EXCEL = 5 * 1024 * 1024
+CONTENT_TYPE_EXCEL = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def generar_excel(transacciones, destino, titulo_hoja="Transacciones", tamano_lote=2000):
+    """
+    Escribe el .xlsx de las transacciones en ``destino`` (ruta o archivo binario con seek).
+
+    Usa el modo de solo escritura de openpyxl: cada fila se serializa al agregarla y no se
+    guardan objetos de celda. Las fechas y los montos se escriben como valores tipados para
+    que la planilla pueda ordenarlos y sumarlos.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(titulo_hoja)
+    for columna, ancho in ANCHOS_COLUMNAS_EXCEL.items():
+        hoja.column_dimensions[columna].width = ancho
+    hoja.freeze_panes = 'A2'
+
+    negrita = Font(bold=True)
+    cabecera = []
+    for nombre in COLUMNAS:
+        celda = WriteOnlyCell(hoja, value=nombre)
+        celda.font = negrita
+        cabecera.append(celda)
+    hoja.append(cabecera)
+
+    # Las celdas con formato se reutilizan: append copia su valor y estilo a la fila
+    celda_fecha = WriteOnlyCell(hoja)
+    celda_fecha.number_format = FORMATO_FECHA_EXCEL
+    celda_monto = WriteOnlyCell(hoja)
+    celda_monto.number_format = FORMATO_MONTO_EXCEL
+    for fecha, descripcion, categoria, tipo, monto in iterar_filas(transacciones, tamano_lote):
+        celda_fecha.value = fecha
+        celda_monto.value = monto
+        hoja.append([celda_fecha, descripcion, categoria or 'Sin categoría', tipo, celda_monto])
+
+    libro.save(destino)
+
+
+def archivo_excel(transacciones, umbral=UMBRAL_MEMORIA_EXCEL, **kwargs):
+    """
+    Genera el .xlsx en un archivo temporal que vive en memoria hasta ``umbral`` bytes y
+    luego pasa a disco. Devuelve el archivo posicionado al inicio; quien lo recibe lo cierra.
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=umbral)
+    generar_excel(transacciones, archivo, **kwargs)
+    archivo.seek(0)
+    return archivo
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from django.db.models import Q, Sum
+
+from .models import AcumuladoMensual
+from .resumen import rango_mes
+
+
+def _parametro(params, nombre):
+    # Los enlaces de la plantilla pueden enviar la cadena 'None'
+    valor = params.get(nombre)
+    if valor in ('None', ''):
+        return None
+    return valor
+
+
+def _fecha(valor):
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def filtros_desde_parametros(params):
+    """
+    Lee los filtros de la lista de transacciones (mes, categoría y rango de fechas)
+    desde un QueryDict. Los valores con formato inválido se ignoran.
+    """
+    fecha_desde_str = _parametro(params, 'fecha_desde')
+    fecha_hasta_str = _parametro(params, 'fecha_hasta')
+    return {
+        'mes': _parametro(params, 'mes'),
+        'categoria': _parametro(params, 'categoria'),
+        'fecha_desde_str': fecha_desde_str,
+        'fecha_hasta_str': fecha_hasta_str,
+        'fecha_desde': _fecha(fecha_desde_str),
+        'fecha_hasta': _fecha(fecha_hasta_str),
+    }
+
+
+def filtrar_transacciones(transacciones, filtros):
+    """
+    Aplica a un queryset de Transaccion los filtros leídos con ``filtros_desde_parametros``.
+    """
+    mes = filtros['mes']
+    if mes:
+        # Si el mes viene en formato YYYY-MM, filtrar por el rango de fechas de ese mes
+        if '-' in mes:
+            try:
+                mes_date = datetime.strptime(mes, '%Y-%m').date()
+                inicio_mes, fin_mes = rango_mes(mes_date.year, mes_date.month)
+                transacciones = transacciones.filter(fecha__gte=inicio_mes, fecha__lt=fin_mes)
+            except ValueError:
+                # Si hay un error en el formato, no aplicar el filtro de mes
+                pass
+        else:
+            # Si es solo el número del mes, filtrar por ese mes de cualquier año
+            try:
+                transacciones = transacciones.filter(fecha__month=int(mes))
+            except ValueError:
+                pass
+    if filtros['categoria']:
+        transacciones = transacciones.filter(categoria=filtros['categoria'])
+    if filtros['fecha_desde']:
+        transacciones = transacciones.filter(fecha__gte=filtros['fecha_desde'])
+    if filtros['fecha_hasta']:
+        transacciones = transacciones.filter(fecha__lte=filtros['fecha_hasta'])
+    return transacciones
+
+
+def contar_aproximado(usuario, filtros, hasta=None):
+    """
+    Estima cuántas transacciones cumplen los filtros sumando los acumulados mensuales,
+    sin contar filas de Transaccion. Los rangos de fechas se redondean a meses completos,
+    por lo que el resultado puede ser algo mayor que el real.
+    """
+    acumulados = AcumuladoMensual.objects.filter(usuario=usuario)
+    mes = filtros['mes']
+    if mes:
+        try:
+            if '-' in mes:
+                mes_date = datetime.strptime(mes, '%Y-%m').date()
+                acumulados = acumulados.filter(anio=mes_date.year, mes=mes_date.month)
+            else:
+                acumulados = acumulados.filter(mes=int(mes))
+        except ValueError:
+            pass
+    if filtros['categoria']:
+        acumulados = acumulados.filter(categoria=filtros['categoria'])
+    desde = filtros['fecha_desde']
+    if desde:
+        acumulados = acumulados.filter(Q(anio__gt=desde.year) | Q(anio=desde.year, mes__gte=desde.month))
+    for limite in (filtros['fecha_hasta'], hasta):
+        if limite:
+            acumulados = acumulados.filter(Q(anio__lt=limite.year) | Q(anio=limite.year, mes__lte=limite.month))
+    return acumulados.aggregate(total=Sum('cantidad'))['total'] or 0
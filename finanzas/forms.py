@@ -1,4 +1,6 @@
 from django import forms
+from django.conf import settings
+from django.core.validators import FileExtensionValidator
 from .models import Transaccion, ObjetivoAhorro, Presupuesto
 from django.utils.timezone import now
 
@@ -114,3 +116,26 @@ class PresupuestoForm(forms.ModelForm):
         widgets = {
             'monto': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'})
         }
+
+class FilaImportacionForm(TransaccionForm):
+    """
+    Reglas de TransaccionForm para cada fila de un archivo importado, más la fecha (que en el
+    formulario se asigna sola). finanzas/importaciones.py usa sus campos uno a uno.
+    """
+    fecha = forms.DateField(label='Fecha', input_formats=['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d', '%d.%m.%Y'])
+
+    class Meta(TransaccionForm.Meta):
+        fields = ['monto', 'descripcion', 'categoria', 'tipo', 'fecha']
+
+class ImportacionForm(forms.Form):
+    archivo = forms.FileField(
+        label='Archivo del banco',
+        validators=[FileExtensionValidator(['csv', 'xlsx', 'ofx', 'qfx'])],
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx,.ofx,.qfx'})
+    )
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data['archivo']
+        if archivo.size > settings.IMPORTACION_MAX_MB * 1024 * 1024:
+            raise forms.ValidationError(f'El archivo no puede superar los {settings.IMPORTACION_MAX_MB} MB.')
+        return archivo
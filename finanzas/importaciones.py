@@ -0,0 +1,423 @@
+"""
+Importación de transacciones desde archivos del banco (CSV, Excel u OFX).
+
+El archivo se lee fila a fila (``leer_csv``, ``leer_xlsx``, ``leer_ofx``) sin cargarlo
+entero en memoria. Cada fila se valida con los campos de FilaImportacionForm, que son los de
+TransaccionForm más la fecha. Las filas válidas se insertan con ``bulk_create`` por lotes,
+todos dentro de una misma transacción: si algo falla (o se corta la conexión que sigue el
+progreso) no queda nada a medias.
+
+Las filas que ya estaban registradas se descartan por su huella (fecha, monto, tipo y
+descripción; ver models.calcular_huella), con una consulta por lote sobre el índice
+(usuario, huella). Se comparan solo con las filas anteriores a la importación. Así, dos
+compras iguales del mismo día dentro del archivo se importan las dos, y al reimportar el
+mismo archivo (o un extracto que se solapa) no se duplica nada.
+
+Los acumulados mensuales y los saldos se actualizan una sola vez al final, con los cambios
+de todos los lotes ya sumados en memoria (acumulados.Cambios).
+"""
+import codecs
+import csv
+import html
+import io
+import re
+import unicodedata
+import zipfile
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count
+
+from . import acumulados, cache_dashboard
+from .forms import FilaImportacionForm
+from .models import Transaccion, calcular_huella
+
+TAMANIO_LOTE = 500
+# Errores de validación que se informan (el resto solo se cuenta)
+MAX_ERRORES = 50
+# Valores distintos que se recuerdan por columna al validar (ver Validador)
+MAX_VALORES_RECORDADOS = 5000
+
+# Nombres de columna aceptados (en minúsculas y sin tildes) para cada dato
+COLUMNAS = {
+    'fecha': ('fecha', 'date', 'fecha operacion', 'fecha de operacion', 'fecha transaccion', 'fecha contable'),
+    'descripcion': ('descripcion', 'description', 'detalle', 'glosa', 'concepto', 'movimiento', 'name', 'memo'),
+    'monto': ('monto', 'amount', 'importe', 'valor'),
+    'tipo': ('tipo', 'type'),
+    'categoria': ('categoria', 'category'),
+    # Extractos con una columna para cargos y otra para abonos
+    'cargo': ('cargo', 'cargos', 'debito', 'debitos', 'debe', 'debit'),
+    'abono': ('abono', 'abonos', 'credito', 'creditos', 'haber', 'credit'),
+}
+
+TIPOS = {
+    'INGRESO': 'INGRESO', 'INGRESOS': 'INGRESO', 'ABONO': 'INGRESO', 'CREDITO': 'INGRESO', 'CREDIT': 'INGRESO',
+    'GASTO': 'GASTO', 'GASTOS': 'GASTO', 'CARGO': 'GASTO', 'DEBITO': 'GASTO', 'DEBIT': 'GASTO',
+}
+
+
+class ArchivoInvalido(Exception):
+    pass
+
+
+def _sin_tildes(texto):
+    return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+
+
+def formato_de(nombre_archivo):
+    """
+    Formato ('csv', 'xlsx' u 'ofx') según la extensión del archivo.
+    """
+    extension = nombre_archivo.rsplit('.', 1)[-1].lower()
+    if extension == 'qfx':
+        return 'ofx'
+    if extension not in LECTORES:
+        raise ArchivoInvalido(f'Formato no soportado: .{extension}')
+    return extension
+
+
+def _tamanio(archivo):
+    posicion = archivo.tell()
+    tamanio = archivo.seek(0, io.SEEK_END)
+    archivo.seek(posicion)
+    return tamanio
+
+
+# 📄 Lectores: cada uno genera (número de fila, {dato: valor}, avance entre 0 y 1)
+
+def _abrir_texto(archivo):
+    # UTF-8 (con o sin BOM) o, si la muestra no lo es, Windows-1252 (Excel en español)
+    muestra = archivo.read(64 * 1024)
+    archivo.seek(0)
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+        codificacion = 'utf-8-sig'
+    except UnicodeDecodeError:
+        codificacion = 'cp1252'
+    return io.TextIOWrapper(archivo, encoding=codificacion, errors='replace', newline='')
+
+
+def _columnas(encabezado):
+    """
+    {dato: índice} a partir de la fila de encabezado; las columnas desconocidas se ignoran.
+    """
+    alias = {nombre: dato for dato, nombres in COLUMNAS.items() for nombre in nombres}
+    indices = {}
+    for indice, nombre in enumerate(encabezado):
+        dato = alias.get(' '.join(_sin_tildes(str(nombre or '')).lower().split()))
+        if dato and dato not in indices:
+            indices[dato] = indice
+    faltantes = [dato for dato in ('fecha', 'descripcion') if dato not in indices]
+    if 'monto' not in indices and not ('cargo' in indices or 'abono' in indices):
+        faltantes.append('monto')
+    if faltantes:
+        raise ArchivoInvalido('Faltan las columnas: ' + ', '.join(faltantes))
+    return indices
+
+
+def _filas_tabla(filas):
+    # Salta las filas vacías, toma la primera como encabezado y arma un dict por fila
+    indices = None
+    for numero, fila, avance in filas:
+        if not any(valor not in (None, '') for valor in fila):
+            continue
+        if indices is None:
+            indices = _columnas(fila)
+            continue
+        yield numero, {dato: fila[indice] if indice < len(fila) else None for dato, indice in indices.items()}, avance
+    if indices is None:
+        raise ArchivoInvalido('El archivo está vacío.')
+
+
+def leer_csv(archivo):
+    tamanio = _tamanio(archivo) or 1
+    texto = _abrir_texto(archivo)
+    try:
+        try:
+            dialecto = csv.Sniffer().sniff(texto.read(16 * 1024), delimiters=',;\t|')
+        except csv.Error:
+            dialecto = csv.excel
+        texto.seek(0)
+        lector = csv.reader(texto, dialecto)
+        yield from _filas_tabla((lector.line_num, fila, archivo.tell() / tamanio) for fila in lector)
+    finally:
+        # Sin detach, cerrar el TextIOWrapper cerraría también el archivo subido
+        texto.detach()
+
+
+def leer_xlsx(archivo):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):
+        raise ArchivoInvalido('El archivo no es un Excel (.xlsx) válido.')
+    try:
+        hoja = libro.active
+        total = hoja.max_row or 0
+        filas = (
+            (numero, fila, numero / total if total else 0.0)
+            for numero, fila in enumerate(hoja.iter_rows(values_only=True), start=1)
+        )
+        yield from _filas_tabla(filas)
+    finally:
+        libro.close()
+
+
+_ETIQUETA_OFX = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def _etiquetas_ofx(texto):
+    # OFX 1.x es SGML (los elementos no se cierran) y 2.x es XML: en los dos casos basta con
+    # recorrer las etiquetas y el texto que las sigue. Se lee por bloques; la última etiqueta
+    # de cada bloque puede seguir en el siguiente
+    resto = ''
+    while True:
+        bloque = texto.read(64 * 1024)
+        if not bloque:
+            break
+        contenido = resto + bloque
+        corte = contenido.rfind('<')
+        if corte <= 0:
+            resto = contenido
+            continue
+        resto = contenido[corte:]
+        yield from _ETIQUETA_OFX.findall(contenido[:corte])
+    yield from _ETIQUETA_OFX.findall(resto)
+
+
+def leer_ofx(archivo):
+    tamanio = _tamanio(archivo) or 1
+    texto = _abrir_texto(archivo)
+    try:
+        numero = 0
+        actual = None
+        for cierre, nombre, valor in _etiquetas_ofx(texto):
+            nombre = nombre.upper()
+            if nombre == 'STMTTRN':
+                if cierre and actual is not None:
+                    numero += 1
+                    yield numero, _movimiento_ofx(actual), archivo.tell() / tamanio
+                actual = None if cierre else {}
+            elif actual is not None and not cierre:
+                actual[nombre] = html.unescape(valor.strip())
+    finally:
+        texto.detach()
+
+
+def _movimiento_ofx(movimiento):
+    fecha = movimiento.get('DTPOSTED', '')[:8]
+    return {
+        'fecha': f'{fecha[:4]}-{fecha[4:6]}-{fecha[6:8]}' if len(fecha) == 8 else fecha,
+        'descripcion': movimiento.get('NAME') or movimiento.get('MEMO'),
+        # El signo del monto dice si es ingreso o gasto
+        'monto': movimiento.get('TRNAMT'),
+    }
+
+
+LECTORES = {
+    'csv': leer_csv,
+    'xlsx': leer_xlsx,
+    'ofx': leer_ofx,
+}
+
+
+# ✅ Validación
+
+def normalizar_monto(valor):
+    """
+    Convierte montos como '15.990', '$ -1.234,50', '(1,234.50)' o 1234.5 (celda de Excel)
+    en (texto sin signo que entiende DecimalField, si era negativo).
+    """
+    if isinstance(valor, (int, Decimal)):
+        return str(abs(valor)), valor < 0
+    if isinstance(valor, float):
+        return f'{abs(valor):.2f}', valor < 0
+    texto = ''.join(str(valor or '').split()).replace('$', '')
+    negativo = texto.startswith('-') or texto.endswith('-') or (texto.startswith('(') and texto.endswith(')'))
+    texto = texto.strip('-+()')
+    if ',' in texto and '.' in texto:
+        # El separador que aparece último es el decimal
+        decimal, miles = (',', '.') if texto.rfind(',') > texto.rfind('.') else ('.', ',')
+        texto = texto.replace(miles, '').replace(decimal, '.')
+    else:
+        for separador in (',', '.'):
+            if separador in texto:
+                # Repetido o seguido de tres dígitos separa miles (los montos tienen a lo más
+                # dos decimales): '15.990' son 15990 pesos; '12,5' y '12.50' llevan decimales
+                if texto.count(separador) > 1 or len(texto.rpartition(separador)[2]) == 3:
+                    texto = texto.replace(separador, '')
+                else:
+                    texto = texto.replace(separador, '.')
+    return texto, negativo
+
+
+class Validador:
+    """
+    Valida cada fila con los campos de FilaImportacionForm sin crear un formulario por fila
+    (un ModelForm completo tarda unas diez veces más). Las columnas con pocos valores
+    distintos (fecha, tipo, categoría) se validan una sola vez por valor.
+    """
+    RECORDADOS = ('fecha', 'tipo', 'categoria')
+
+    def __init__(self):
+        self.campos = FilaImportacionForm().fields
+        self.recordados = {nombre: {} for nombre in self.RECORDADOS}
+
+    def _limpiar(self, nombre, valor):
+        recordados = self.recordados.get(nombre)
+        if recordados is None:
+            return self.campos[nombre].clean(valor)
+        if valor not in recordados:
+            if len(recordados) >= MAX_VALORES_RECORDADOS:
+                recordados.clear()
+            try:
+                recordados[valor] = (self.campos[nombre].clean(valor), None)
+            except ValidationError as error:
+                recordados[valor] = (None, error)
+        limpio, error = recordados[valor]
+        if error is not None:
+            raise error
+        return limpio
+
+    def validar(self, valores):
+        """
+        Devuelve los datos limpios de la fila o lanza ValidationError con un mensaje por campo.
+        """
+        monto, tipo = valores.get('monto'), valores.get('tipo')
+        if monto in (None, ''):
+            # Columnas de cargo y abono: la que trae el monto dice el tipo
+            cargo, abono = valores.get('cargo'), valores.get('abono')
+            monto, tipo = (cargo, 'GASTO') if cargo not in (None, '') else (abono, 'INGRESO')
+        monto, negativo = normalizar_monto(monto)
+        if tipo in (None, ''):
+            tipo = 'GASTO' if negativo else 'INGRESO'
+        else:
+            tipo = str(tipo).strip()
+            tipo = TIPOS.get(_sin_tildes(tipo).upper(), tipo)
+
+        datos = {
+            'fecha': valores.get('fecha'),
+            'descripcion': str(valores.get('descripcion') or '').strip(),
+            'monto': monto,
+            'tipo': tipo,
+            'categoria': str(valores.get('categoria') or '').strip(),
+        }
+        limpios = {}
+        errores = []
+        for nombre, valor in datos.items():
+            try:
+                limpios[nombre] = self._limpiar(nombre, valor)
+            except ValidationError as error:
+                errores.append(f'{self.campos[nombre].label}: {" ".join(error.messages)}')
+        if errores:
+            raise ValidationError(errores)
+        return limpios
+
+
+# 📥 Importación
+
+@dataclass
+class Progreso:
+    leidas: int = 0
+    importadas: int = 0
+    duplicadas: int = 0
+    invalidas: int = 0
+    avance: float = 0.0
+    terminada: bool = False
+    errores: list = field(default_factory=list)  # [(número de fila, mensaje)], los primeros MAX_ERRORES
+
+    def como_dict(self):
+        return {
+            'leidas': self.leidas,
+            'importadas': self.importadas,
+            'duplicadas': self.duplicadas,
+            'invalidas': self.invalidas,
+            'avance': round(self.avance, 3),
+            'terminada': self.terminada,
+            'errores': [{'fila': fila, 'error': error} for fila, error in self.errores],
+        }
+
+
+class Importacion:
+    def __init__(self, usuario, lote=TAMANIO_LOTE):
+        self.usuario = usuario
+        self.lote = lote
+        self.progreso = Progreso()
+        self.cambios = acumulados.Cambios()
+        # Filas anteriores a la importación ya usadas como duplicado de otra, por huella
+        self.usadas = {}
+        self.ultimo_id = 0
+
+    def ejecutar(self, filas):
+        """
+        Importa ``filas`` ((número, {dato: valor}, avance), como las de los lectores).
+        Es un generador: entrega el progreso después de cada lote y una última vez al
+        terminar, ya confirmada la transacción.
+        """
+        validador = Validador()
+        with transaction.atomic():
+            # Las filas nuevas tendrán un id mayor: solo las anteriores cuentan como duplicados
+            self.ultimo_id = Transaccion.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            pendientes = []
+            for numero, valores, avance in filas:
+                self.progreso.leidas += 1
+                try:
+                    datos = validador.validar(valores)
+                except ValidationError as error:
+                    self.progreso.invalidas += 1
+                    if len(self.progreso.errores) < MAX_ERRORES:
+                        self.progreso.errores.append((numero, ' '.join(error.messages)))
+                    continue
+                pendientes.append(Transaccion(
+                    usuario=self.usuario,
+                    fecha_inicio=datos['fecha'],
+                    huella=calcular_huella(datos['fecha'], datos['monto'], datos['tipo'], datos['descripcion']),
+                    **datos,
+                ))
+                if len(pendientes) >= self.lote:
+                    self._guardar(pendientes)
+                    pendientes = []
+                    self.progreso.avance = avance
+                    yield self.progreso
+            self._guardar(pendientes)
+            acumulados.guardar(self.cambios)
+            # bulk_create no envía post_save
+            cache_dashboard.invalidar(self.usuario.id)
+        self.progreso.avance = 1.0
+        self.progreso.terminada = True
+        yield self.progreso
+
+    def _guardar(self, transacciones):
+        if not transacciones:
+            return
+        anteriores = dict(
+            Transaccion.objects
+            .filter(usuario=self.usuario, huella__in={t.huella for t in transacciones}, id__lte=self.ultimo_id)
+            .values('huella')
+            .annotate(cantidad=Count('id'))
+            .order_by()
+            .values_list('huella', 'cantidad')
+        )
+        nuevas = []
+        for transaccion in transacciones:
+            usadas = self.usadas.get(transaccion.huella, 0)
+            if usadas < anteriores.get(transaccion.huella, 0):
+                self.usadas[transaccion.huella] = usadas + 1
+                self.progreso.duplicadas += 1
+                continue
+            nuevas.append(transaccion)
+        Transaccion.objects.bulk_create(nuevas)
+        self.cambios.agregar(nuevas)
+        self.progreso.importadas += len(nuevas)
+
+
+def importar(usuario, archivo, formato, lote=TAMANIO_LOTE):
+    """
+    Importa el archivo (binario, abierto) en el ``formato`` indicado para ``usuario``.
+    Generador de Progreso; lanza ArchivoInvalido si el archivo no se puede leer.
+    """
+    return Importacion(usuario, lote).ejecutar(LECTORES[formato](archivo))
@@ -0,0 +1,327 @@
+"""
+Medición por petición: consultas SQL, tiempo de base de datos, de plantillas y de servicios
+externos (SMTP, modelo de lenguaje).
+
+Es opcional (sección [instrumentacion] de config.ini). Con ella activa, ``MedicionMiddleware``
+abre una ``Medicion`` por petición en una variable de contexto, así que también la ven las
+vistas asíncronas y el código que corre en ``sync_to_async``. Las consultas se cuentan con un
+``execute_wrapper`` instalado en cada conexión, las plantillas con el backend
+``DjangoTemplatesMedidas`` y el resto con ``medir(tipo)`` en los puntos de llamada.
+
+Cada petición deja una línea JSON en el logger ``finanzas.instrumentacion`` (las respuestas
+por partes, cuando terminan de enviarse, con las consultas que hacen mientras tanto) y se
+suma a un histograma en memoria del proceso que publica la vista ``metricas`` en formato de
+texto de Prometheus. Si una vista supera su presupuesto de consultas (PRESUPUESTO_CONSULTAS) se
+registra una advertencia, o se lanza ``PresupuestoConsultasExcedido`` en modo estricto
+(pensado para pruebas y benchmarks).
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template import TemplateDoesNotExist
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+# Límites de los histogramas (segundos de la petición y número de consultas)
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class PresupuestoConsultasExcedido(Exception):
+    pass
+
+
+@dataclass
+class Medicion:
+    consultas: int = 0
+    bd: float = 0.0
+    plantillas: float = 0.0
+    externo: dict = field(default_factory=dict)  # {'smtp': segundos, 'llm': segundos}
+
+
+_actual = ContextVar('finanzas_medicion', default=None)
+
+_FIN = object()
+
+
+def medicion_actual():
+    return _actual.get()
+
+
+@contextmanager
+def abrir_medicion():
+    """
+    Abre una ``Medicion`` para el bloque, como hace el middleware con cada petición
+    (el benchmark de vistas la usa alrededor de las llamadas del cliente de pruebas).
+    """
+    medicion = Medicion()
+    marca = _actual.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _actual.reset(marca)
+
+
+@contextmanager
+def medir(tipo):
+    """
+    Suma la duración del bloque al tiempo externo ``tipo`` de la petición en curso
+    (no hace nada fuera de una petición o con la instrumentación desactivada).
+    """
+    medicion = _actual.get()
+    if medicion is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.externo[tipo] = medicion.externo.get(tipo, 0.0) + time.perf_counter() - inicio
+
+
+# 🗄️ Consultas SQL
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.consultas += 1
+        medicion.bd += time.perf_counter() - inicio
+
+
+def _instalar_en_conexion(connection, **kwargs):
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+def instalar():
+    """
+    Agrega el contador de consultas a las conexiones abiertas y a las que se abran después.
+    """
+    connection_created.connect(_instalar_en_conexion, dispatch_uid='finanzas.instrumentacion')
+    for connection in connections.all(initialized_only=True):
+        _instalar_en_conexion(connection)
+
+
+# 🖼️ Plantillas
+
+class PlantillaMedida(Template):
+    def render(self, context=None, request=None):
+        medicion = _actual.get()
+        if medicion is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            medicion.plantillas += time.perf_counter() - inicio
+
+
+class DjangoTemplatesMedidas(DjangoTemplates):
+    """
+    Backend de plantillas de Django que mide el tiempo de ``render`` (las plantillas incluidas
+    o heredadas se cuentan dentro de la que las usa).
+    """
+    def from_string(self, template_code):
+        return PlantillaMedida(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return PlantillaMedida(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# 📊 Histograma en memoria del proceso
+
+class Histograma:
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.vistas = {}
+
+    def registrar(self, vista, segundos, medicion):
+        with self._candado:
+            datos = self.vistas.setdefault(vista, {
+                'peticiones': 0,
+                'segundos': [0] * (len(LIMITES_SEGUNDOS) + 1),
+                'consultas': [0] * (len(LIMITES_CONSULTAS) + 1),
+                'suma_segundos': 0.0,
+                'suma_consultas': 0,
+                'suma_bd': 0.0,
+                'suma_plantillas': 0.0,
+                'suma_externo': {},
+            })
+            datos['peticiones'] += 1
+            datos['segundos'][_cubeta(LIMITES_SEGUNDOS, segundos)] += 1
+            datos['consultas'][_cubeta(LIMITES_CONSULTAS, medicion.consultas)] += 1
+            datos['suma_segundos'] += segundos
+            datos['suma_consultas'] += medicion.consultas
+            datos['suma_bd'] += medicion.bd
+            datos['suma_plantillas'] += medicion.plantillas
+            for tipo, duracion in medicion.externo.items():
+                datos['suma_externo'][tipo] = datos['suma_externo'].get(tipo, 0.0) + duracion
+
+    def reiniciar(self):
+        with self._candado:
+            self.vistas = {}
+
+    def exportar(self):
+        """
+        Texto en el formato de exposición de Prometheus (histogramas acumulativos).
+        """
+        with self._candado:
+            vistas = {vista: {**datos, 'suma_externo': dict(datos['suma_externo'])} for vista, datos in self.vistas.items()}
+        lineas = []
+        for nombre, limites, clave, suma in (
+            ('ecofinance_peticion_segundos', LIMITES_SEGUNDOS, 'segundos', 'suma_segundos'),
+            ('ecofinance_peticion_consultas', LIMITES_CONSULTAS, 'consultas', 'suma_consultas'),
+        ):
+            lineas.append(f'# TYPE {nombre} histogram')
+            for vista, datos in sorted(vistas.items()):
+                acumulado = 0
+                for limite, cantidad in zip((*limites, '+Inf'), datos[clave]):
+                    acumulado += cantidad
+                    lineas.append(f'{nombre}_bucket{{vista="{vista}",le="{limite}"}} {acumulado}')
+                lineas.append(f'{nombre}_sum{{vista="{vista}"}} {datos[suma]}')
+                lineas.append(f'{nombre}_count{{vista="{vista}"}} {datos["peticiones"]}')
+        for nombre, suma in (('ecofinance_bd_segundos_total', 'suma_bd'), ('ecofinance_plantillas_segundos_total', 'suma_plantillas')):
+            lineas.append(f'# TYPE {nombre} counter')
+            for vista, datos in sorted(vistas.items()):
+                lineas.append(f'{nombre}{{vista="{vista}"}} {datos[suma]:.6f}')
+        lineas.append('# TYPE ecofinance_externo_segundos_total counter')
+        for vista, datos in sorted(vistas.items()):
+            for tipo, duracion in sorted(datos['suma_externo'].items()):
+                lineas.append(f'ecofinance_externo_segundos_total{{vista="{vista}",tipo="{tipo}"}} {duracion:.6f}')
+        return '\n'.join(lineas) + '\n'
+
+
+def _cubeta(limites, valor):
+    for indice, limite in enumerate(limites):
+        if valor <= limite:
+            return indice
+    return len(limites)
+
+
+histograma = Histograma()
+
+
+# 🧭 Middleware
+
+def _nombre_vista(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    if coincidencia is None:
+        return 'sin_ruta'
+    return coincidencia.url_name or coincidencia.view_name or 'sin_nombre'
+
+
+def _cerrar(request, response, medicion, inicio):
+    segundos = time.perf_counter() - inicio
+    vista = _nombre_vista(request)
+    histograma.registrar(vista, segundos, medicion)
+    logger.info(json.dumps({
+        'vista': vista,
+        'metodo': request.method,
+        'ruta': request.path,
+        'estado': response.status_code,
+        'ms': round(segundos * 1000, 2),
+        'consultas': medicion.consultas,
+        'bd_ms': round(medicion.bd * 1000, 2),
+        'plantillas_ms': round(medicion.plantillas * 1000, 2),
+        'externo_ms': {tipo: round(duracion * 1000, 2) for tipo, duracion in medicion.externo.items()},
+    }, ensure_ascii=False))
+
+    presupuesto = settings.PRESUPUESTO_CONSULTAS.get(vista)
+    if presupuesto is not None and medicion.consultas > presupuesto:
+        mensaje = f'La vista {vista} hizo {medicion.consultas} consultas (presupuesto: {presupuesto})'
+        if settings.INSTRUMENTACION_ESTRICTA:
+            raise PresupuestoConsultasExcedido(mensaje)
+        logger.warning(mensaje)
+
+
+def _partes_medidas(partes, medicion, al_terminar):
+    # Una respuesta por partes (p. ej. el CSV) hace sus consultas mientras se envía, después
+    # de que el middleware cerró la medición: se vuelve a abrir mientras se genera cada parte
+    try:
+        iterador = iter(partes)
+        while True:
+            marca = _actual.set(medicion)
+            try:
+                parte = next(iterador, _FIN)
+            finally:
+                _actual.reset(marca)
+            if parte is _FIN:
+                break
+            yield parte
+    finally:
+        al_terminar()
+
+
+async def _partes_medidas_async(partes, medicion, al_terminar):
+    try:
+        iterador = aiter(partes)
+        while True:
+            marca = _actual.set(medicion)
+            try:
+                parte = await anext(iterador, _FIN)
+            finally:
+                _actual.reset(marca)
+            if parte is _FIN:
+                break
+            yield parte
+    finally:
+        al_terminar()
+
+
+def _terminar(request, response, medicion, inicio):
+    """
+    Registra la petición; si la respuesta se envía por partes, cuando termina de enviarse
+    (así las consultas y el tiempo del cuerpo cuentan para la vista).
+    """
+    if not response.streaming:
+        _cerrar(request, response, medicion, inicio)
+        return
+
+    def al_terminar():
+        _cerrar(request, response, medicion, inicio)
+
+    if response.is_async:
+        response.streaming_content = _partes_medidas_async(response.streaming_content, medicion, al_terminar)
+    else:
+        response.streaming_content = _partes_medidas(response.streaming_content, medicion, al_terminar)
+
+
+@sync_and_async_middleware
+def MedicionMiddleware(get_response):
+    instalar()
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            inicio = time.perf_counter()
+            with abrir_medicion() as medicion:
+                response = await get_response(request)
+            _terminar(request, response, medicion, inicio)
+            return response
+    else:
+        def middleware(request):
+            inicio = time.perf_counter()
+            with abrir_medicion() as medicion:
+                response = get_response(request)
+            _terminar(request, response, medicion, inicio)
+            return response
+
+    return middleware
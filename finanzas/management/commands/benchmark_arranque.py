@@ -0,0 +1,125 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEPENDENCIAS_PESADAS = ('openai', 'httpx', 'reportlab', 'openpyxl')
+# Vistas que finanzas/urls.py registra con vista_perezosa: no deben cargarse al arrancar
+VISTAS_PEREZOSAS = ('finanzas.views.exportaciones', 'finanzas.views.recomendaciones', 'finanzas.views.tareas')
+
+# Código que se ejecuta en un intérprete nuevo: mide django.setup() + la importación del
+# módulo y reporta qué dependencias pesadas y vistas quedaron cargadas y la memoria máxima
+MEDICION = '''
+import json, resource, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+for modulo in {previos!r}:
+    __import__(modulo)
+__import__({modulo!r})
+segundos = time.perf_counter() - inicio
+print(json.dumps({{
+    'segundos': segundos,
+    'cargadas': [m for m in {pesadas!r} if m in sys.modules],
+    'modulos': len(sys.modules),
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,  # KB en Linux
+}}))
+'''
+
+
+def ejecutar(codigo, importtime=False):
+    comando = [sys.executable]
+    if importtime:
+        comando += ['-X', 'importtime']
+    comando += ['-c', codigo]
+    entorno = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'ecofinance.settings')}
+    return subprocess.run(comando, capture_output=True, text=True, check=True, env=entorno, cwd=settings.BASE_DIR)
+
+
+def medir(modulo, previos, repeticiones):
+    codigo = MEDICION.format(modulo=modulo, previos=tuple(previos), pesadas=DEPENDENCIAS_PESADAS + VISTAS_PEREZOSAS)
+    corridas = [json.loads(ejecutar(codigo).stdout) for _ in range(repeticiones)]
+    return {
+        'mediana_ms': round(statistics.median(c['segundos'] for c in corridas) * 1000, 1),
+        'rss_mb': round(statistics.median(c['rss_kb'] for c in corridas) / 1024, 1),
+        'modulos': corridas[-1]['modulos'],
+        'dependencias_cargadas': [m for m in corridas[-1]['cargadas'] if m in DEPENDENCIAS_PESADAS],
+        'vistas_cargadas': [m for m in corridas[-1]['cargadas'] if m in VISTAS_PEREZOSAS],
+    }
+
+
+def mas_lentos(modulo, cantidad):
+    """
+    Módulos con mayor tiempo acumulado según ``python -X importtime``.
+    """
+    codigo = MEDICION.format(modulo=modulo, previos=(), pesadas=())
+    filas = []
+    for linea in ejecutar(codigo, importtime=True).stderr.splitlines():
+        # Formato: "import time:  propio | acumulado | módulo" (en µs; la primera línea es la cabecera)
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        filas.append((int(acumulado), nombre.strip()))
+    filas.sort(reverse=True)
+    return [{'modulo': nombre, 'acumulado_ms': round(us / 1000, 1)} for us, nombre in filas[:cantidad]]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el tiempo y la memoria de arranque (django.setup() + importar las URLs) en procesos '
+        'nuevos, comparándolo con cargar de entrada las vistas pesadas y sus dependencias.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modulo', default='finanzas.urls', help='Módulo a importar (por defecto finanzas.urls).')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Procesos por escenario.')
+        parser.add_argument('--top', type=int, default=10, help='Módulos más lentos a listar según -X importtime.')
+        parser.add_argument('--json', dest='salida_json', help='Guarda el resultado en este archivo JSON.')
+        parser.add_argument('--maximo-ms', type=float, help='Falla si el arranque perezoso supera estos milisegundos.')
+        parser.add_argument('--maximo-rss-mb', type=float, help='Falla si la memoria máxima del arranque perezoso supera estos MB.')
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Falla si el arranque perezoso carga dependencias pesadas o vistas que deberían importarse a demanda.'
+        )
+
+    def handle(self, *args, **options):
+        modulo = options['modulo']
+        resultado = {
+            'modulo': modulo,
+            'perezoso': medir(modulo, (), options['repeticiones']),
+            # Lo que costaba arrancar cuando un solo views.py importaba todo al cargarse
+            'dependencias_al_inicio': medir(modulo, VISTAS_PEREZOSAS + DEPENDENCIAS_PESADAS, options['repeticiones']),
+            'mas_lentos': mas_lentos(modulo, options['top']),
+        }
+
+        for escenario in ('perezoso', 'dependencias_al_inicio'):
+            datos = resultado[escenario]
+            self.stdout.write(
+                f"{escenario:<24} {datos['mediana_ms']:>8} ms  {datos['rss_mb']:>6} MB  módulos={datos['modulos']}  "
+                f"cargadas={','.join(datos['dependencias_cargadas'] + datos['vistas_cargadas']) or '-'}"
+            )
+        self.stdout.write(f'\nMódulos más lentos al importar {modulo} (-X importtime, acumulado):')
+        for fila in resultado['mas_lentos']:
+            self.stdout.write(f"  {fila['acumulado_ms']:>8} ms  {fila['modulo']}")
+
+        if options['salida_json']:
+            with open(options['salida_json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['salida_json']}")
+
+        perezoso = resultado['perezoso']
+        errores = []
+        if options['maximo_ms'] is not None and perezoso['mediana_ms'] > options['maximo_ms']:
+            errores.append(f"el arranque tardó {perezoso['mediana_ms']} ms (máximo {options['maximo_ms']} ms)")
+        if options['maximo_rss_mb'] is not None and perezoso['rss_mb'] > options['maximo_rss_mb']:
+            errores.append(f"el arranque usó {perezoso['rss_mb']} MB (máximo {options['maximo_rss_mb']} MB)")
+        if options['verificar'] and (perezoso['dependencias_cargadas'] or perezoso['vistas_cargadas']):
+            cargadas = ', '.join(perezoso['dependencias_cargadas'] + perezoso['vistas_cargadas'])
+            errores.append(f'al importar {modulo} se cargaron módulos que deberían importarse a demanda: {cargadas}')
+        if errores:
+            raise CommandError('Regresión de arranque: ' + '; '.join(errores))
@@ -0,0 +1,95 @@
+import json
+import tempfile
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from finanzas import exportaciones, semillas
+from finanzas.models import Transaccion
+
+
+PREFIJO_USUARIO = 'benchmark_exportaciones_'
+
+
+def exportar_csv(transacciones):
+    tamano = 0
+    for bloque in exportaciones.generar_csv(transacciones):
+        tamano += len(bloque)
+    return tamano
+
+
+def exportar_pdf(transacciones):
+    with tempfile.TemporaryFile() as archivo:
+        exportaciones.generar_pdf(transacciones, archivo)
+        return archivo.tell()
+
+
+def exportar_excel(transacciones):
+    with exportaciones.archivo_excel(transacciones) as archivo:
+        archivo.seek(0, 2)
+        return archivo.tell()
+
+
+FORMATOS = {
+    'csv': exportar_csv,
+    'pdf': exportar_pdf,
+    'excel': exportar_excel,
+}
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo, memoria máxima y tamaño de las exportaciones para distintos volúmenes de transacciones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas', type=int, nargs='+', default=[10_000, 100_000],
+            help='Cantidades de transacciones a exportar (por defecto 10000 100000).'
+        )
+        parser.add_argument(
+            '--formatos', nargs='+', choices=sorted(FORMATOS), default=sorted(FORMATOS),
+            help='Formatos a medir.'
+        )
+        parser.add_argument('--json', dest='salida_json', help='Guarda el resultado en este archivo JSON.')
+        parser.add_argument('--limpiar', action='store_true', help='Elimina los usuarios de benchmark al terminar.')
+
+    def handle(self, *args, **options):
+        resultados = []
+        for cantidad in options['filas']:
+            usuario = semillas.obtener_usuario(f'{PREFIJO_USUARIO}{cantidad}')
+            faltantes = cantidad - Transaccion.objects.filter(usuario=usuario).count()
+            if faltantes > 0:
+                self.stdout.write(f'Sembrando {faltantes} transacciones para {usuario.username}...')
+                semillas.sembrar_transacciones(usuario, faltantes, semilla=cantidad)
+            transacciones = Transaccion.objects.filter(usuario=usuario).order_by('-fecha', '-id')
+
+            for formato in options['formatos']:
+                exportar = FORMATOS[formato]
+                inicio = time.perf_counter()
+                tamano = exportar(transacciones)
+                duracion = time.perf_counter() - inicio
+
+                # tracemalloc ralentiza mucho la ejecución: la memoria se mide en una segunda pasada
+                tracemalloc.start()
+                exportar(transacciones)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                resultado = {
+                    'formato': formato,
+                    'filas': cantidad,
+                    'segundos': round(duracion, 3),
+                    'filas_por_segundo': round(cantidad / duracion) if duracion else None,
+                    'memoria_pico_mb': round(pico / 1024 / 1024, 2),
+                    'tamano_mb': round(tamano / 1024 / 1024, 2),
+                }
+                resultados.append(resultado)
+                self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in resultado.items()))
+
+        if options['salida_json']:
+            with open(options['salida_json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['salida_json']}")
+
+        if options['limpiar']:
+            User.objects.filter(username__startswith=PREFIJO_USUARIO).delete()
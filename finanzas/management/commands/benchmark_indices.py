@@ -0,0 +1,217 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from finanzas import acumulados, saldos, semillas
+from finanzas.models import SerieRecurrente, Transaccion
+from finanzas.paginacion import filtrar_despues_de
+from finanzas.resumen import rango_mes
+
+
+PREFIJO_USUARIO = 'benchmark_indices_'
+
+
+def consultas_a_medir(usuario, serie, hoy):
+    """
+    Devuelve {nombre: queryset} con las formas de consulta que usan las vistas.
+    """
+    inicio_mes, fin_mes = rango_mes(hoy.year, hoy.month)
+    return {
+        'mes_por_tipo_categoria_dia': (
+            Transaccion.objects.filter(usuario=usuario, fecha__gte=inicio_mes, fecha__lt=fin_mes)
+            .values('tipo', 'categoria', 'fecha').annotate(total=Sum('monto')).order_by('fecha')
+        ),
+        'gastos_mes_rango': (
+            Transaccion.objects.filter(usuario=usuario, tipo='GASTO', fecha__gte=inicio_mes, fecha__lt=fin_mes)
+            .values('tipo').annotate(total=Sum('monto')).order_by()
+        ),
+        'gastos_mes_year_month': (
+            Transaccion.objects.filter(usuario=usuario, tipo='GASTO', fecha__year=hoy.year, fecha__month=hoy.month)
+            .values('tipo').annotate(total=Sum('monto')).order_by()
+        ),
+        'lista_primera_pagina': (
+            Transaccion.objects.filter(usuario=usuario, fecha__lte=hoy).order_by('-fecha', '-id')[:10]
+        ),
+        **paginas_profundas(usuario, hoy),
+        'lista_por_categoria': (
+            Transaccion.objects.filter(usuario=usuario, categoria='Salud', fecha__lte=hoy).order_by('-fecha', '-id')[:10]
+        ),
+        'fechas_de_serie': (
+            Transaccion.objects.filter(serie_recurrente=serie, fecha__gte=hoy - timedelta(days=90), fecha__lte=hoy)
+            .values_list('serie_recurrente_id', 'fecha')
+        ),
+        'balance_inicial': (
+            Transaccion.objects.filter(usuario=usuario, descripcion='Balance Inicial').values('id')[:1]
+        ),
+    }
+
+
+def paginas_profundas(usuario, hoy):
+    """
+    La misma página de la mitad del historial pedida con OFFSET y con cursor (keyset),
+    para el orden por fecha y por monto.
+    """
+    lista = Transaccion.objects.filter(usuario=usuario, fecha__lte=hoy)
+    desplazamiento = lista.count() // 2
+    consultas = {}
+    for nombre, ordenes in (('fecha', ['-fecha', '-id']), ('monto', ['-monto', '-fecha', '-id'])):
+        ordenada = lista.order_by(*ordenes)
+        anterior = ordenada[desplazamiento - 1:desplazamiento].first()
+        consultas[f'lista_{nombre}_offset'] = ordenada[desplazamiento:desplazamiento + 10]
+        if anterior is not None:
+            valores = [getattr(anterior, orden.lstrip('-')) for orden in ordenes]
+            consultas[f'lista_{nombre}_cursor'] = filtrar_despues_de(lista, ordenes, valores).order_by(*ordenes)[:10]
+    return consultas
+
+
+def medir(queryset, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        list(queryset.all())  # .all() clona el queryset y evita la caché de resultados
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        'mediana_ms': round(statistics.median(tiempos), 3),
+        'p95_ms': round(tiempos[max(0, int(len(tiempos) * 0.95) - 1)], 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide plan de ejecución y latencia de las consultas principales sobre Transaccion '
+        'con y sin los índices compuestos, sobre una tabla sembrada con datos deterministas. '
+        'Por defecto se ejecuta en una base de datos de pruebas que se crea y se elimina al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1_000_000, help='Total de transacciones a sembrar.')
+        parser.add_argument('--usuarios', type=int, default=20, help='Usuarios entre los que se reparten las filas.')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Ejecuciones por consulta.')
+        parser.add_argument('--json', dest='salida_json', help='Guarda el resultado en este archivo JSON.')
+        parser.add_argument(
+            '--forzar', action='store_true',
+            help='Mide sobre la base de datos configurada en lugar de una base de pruebas '
+                 '(elimina y vuelve a crear sus índices, y siembra usuarios de benchmark en ella).'
+        )
+        parser.add_argument(
+            '--limpiar', action='store_true',
+            help='Con --forzar, elimina los usuarios de benchmark al terminar.'
+        )
+
+    def handle(self, *args, **options):
+        if options['forzar']:
+            self.stdout.write(self.style.WARNING(
+                f"Midiendo sobre la base configurada ({connection.settings_dict['NAME']}): "
+                'sus índices de Transaccion se eliminan durante la medición.'
+            ))
+            self.medir_indices(options)
+            return
+
+        # El escenario "antes" elimina índices de la tabla: nunca sobre la base configurada
+        # sin pedirlo. Igual que el runner de tests, se crea una base desechable con las
+        # migraciones aplicadas y se restaura la conexión al terminar
+        nombre_original = connection.settings_dict['NAME']
+        self.stdout.write('Creando una base de datos de pruebas...')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.medir_indices(options)
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+    def medir_indices(self, options):
+        hoy = timezone.now().date()
+        usuario = self.sembrar(options['filas'], options['usuarios'], hoy)
+        serie = SerieRecurrente.objects.filter(usuario=usuario).first()
+        consultas = consultas_a_medir(usuario, serie, hoy)
+
+        resultado = {'motor': connection.vendor, 'filas': Transaccion.objects.count(), 'consultas': {}}
+        indices = list(Transaccion._meta.indexes)
+        try:
+            self.stdout.write('Eliminando índices compuestos para medir el escenario "antes"...')
+            with connection.schema_editor() as editor:
+                for indice in indices:
+                    editor.remove_index(Transaccion, indice)
+            self.analizar()
+            for nombre, queryset in consultas.items():
+                resultado['consultas'][nombre] = {
+                    'antes': {**medir(queryset, options['repeticiones']), 'plan': queryset.explain()}
+                }
+        finally:
+            self.stdout.write('Restaurando índices...')
+            with connection.schema_editor() as editor:
+                for indice in indices:
+                    editor.add_index(Transaccion, indice)
+            self.analizar()
+
+        for nombre, queryset in consultas.items():
+            resultado['consultas'][nombre]['despues'] = {
+                **medir(queryset, options['repeticiones']), 'plan': queryset.explain()
+            }
+
+        self.imprimir(resultado)
+        if options['salida_json']:
+            with open(options['salida_json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['salida_json']}")
+
+        if options['limpiar']:
+            User.objects.filter(username__startswith=PREFIJO_USUARIO).delete()
+
+    def sembrar(self, filas, usuarios, hoy):
+        """
+        Siembra las filas repartidas entre los usuarios de benchmark (solo las que falten)
+        y devuelve el primer usuario, que es el que se consulta.
+        """
+        por_usuario = max(1, filas // usuarios)
+        primero = None
+        for indice in range(usuarios):
+            usuario = semillas.obtener_usuario(f'{PREFIJO_USUARIO}{indice}')
+            primero = primero or usuario
+            existentes = Transaccion.objects.filter(usuario=usuario).count()
+            if existentes < por_usuario:
+                self.stdout.write(f'Sembrando {por_usuario - existentes} transacciones para {usuario.username}...')
+                semillas.sembrar_transacciones(usuario, por_usuario - existentes, semilla=indice * 1000 + existentes)
+
+        # Una serie diaria y un balance inicial para el usuario consultado
+        if not SerieRecurrente.objects.filter(usuario=primero).exists():
+            serie = SerieRecurrente.objects.create(usuario=primero)
+            Transaccion.objects.bulk_create([
+                Transaccion(
+                    usuario=primero, descripcion='Café', monto=2500, tipo='GASTO', categoria='Alimentos',
+                    fecha=hoy - timedelta(days=dias), fecha_inicio=hoy - timedelta(days=365),
+                    es_recurrente=True, periodicidad='DIARIA', serie_recurrente=serie
+                )
+                for dias in range(365)
+            ])
+            Transaccion.objects.create(
+                usuario=primero, descripcion='Balance Inicial', monto=100_000, tipo='INGRESO',
+                categoria='General', fecha=hoy - timedelta(days=3 * 365)
+            )
+            # bulk_create no pasa por los acumulados ni por los saldos: se recalculan
+            acumulados.reconstruir([primero])
+            saldos.reconstruir([primero])
+        return primero
+
+    def analizar(self):
+        # Actualizar estadísticas para que el planificador vea los índices recién creados
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Transaccion._meta.db_table}')
+
+    def imprimir(self, resultado):
+        self.stdout.write(f"\nMotor: {resultado['motor']}  Filas: {resultado['filas']}\n")
+        self.stdout.write(f"{'consulta':<30} {'antes (ms)':>12} {'después (ms)':>14} {'mejora':>8}")
+        for nombre, datos in resultado['consultas'].items():
+            antes = datos['antes']['mediana_ms']
+            despues = datos['despues']['mediana_ms']
+            mejora = f'{antes / despues:.1f}x' if despues else '-'
+            self.stdout.write(f'{nombre:<30} {antes:>12} {despues:>14} {mejora:>8}')
+        for nombre, datos in resultado['consultas'].items():
+            self.stdout.write(f'\n== {nombre}\n-- antes:\n{datos["antes"]["plan"]}\n-- después:\n{datos["despues"]["plan"]}')
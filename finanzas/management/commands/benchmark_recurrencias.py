@@ -0,0 +1,95 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand
+
+from finanzas.reglas import Regla
+
+
+# Incrementos con los que se generaban las fechas antes de las reglas, paso a paso
+INCREMENTOS = {
+    'DIARIA': relativedelta(days=1),
+    'SEMANAL': relativedelta(weeks=1),
+    'MENSUAL': relativedelta(months=1),
+    'ANUAL': relativedelta(years=1),
+}
+
+
+def reglas_aleatorias(cantidad, semilla, hoy):
+    """
+    Reglas con frecuencia, inicio (incluidos días 29-31), fin e intervalo al azar.
+    """
+    generador = random.Random(semilla)
+    reglas = []
+    for _ in range(cantidad):
+        frecuencia = generador.choice(list(INCREMENTOS))
+        inicio = hoy - timedelta(days=generador.randint(0, 2 * 365))
+        if generador.random() < 0.3:
+            # Forzar fin de mes para cubrir el ajuste de febrero y de los meses de 30 días
+            inicio = inicio.replace(day=1) + relativedelta(months=1) - timedelta(days=generador.randint(1, 3))
+        fin = inicio + timedelta(days=generador.randint(30, 6 * 365)) if generador.random() < 0.5 else None
+        reglas.append(Regla(frecuencia, inicio, fin, intervalo=generador.choice([1, 1, 1, 2, 3])))
+    return reglas
+
+
+def expandir_paso_a_paso(regla, desde, hasta):
+    """
+    Expansión anterior: sumar el incremento a la fecha previa hasta pasar del límite.
+    """
+    incremento = INCREMENTOS[regla.frecuencia] * regla.intervalo
+    limite = min(hasta, regla.fin) if regla.fin else hasta
+    fechas = []
+    fecha_actual = regla.inicio
+    while fecha_actual <= limite:
+        if fecha_actual >= desde:
+            fechas.append(fecha_actual)
+        fecha_actual += incremento
+    return fechas
+
+
+def medir(funcion, reglas, desde, hasta, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fechas = sum(len(funcion(regla, desde, hasta)) for regla in reglas)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return round(min(tiempos), 1), fechas
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la expansión de reglas de recurrencia en forma cerrada frente a la expansión paso a paso '
+        'con relativedelta, para miles de series. La equivalencia de ambas se comprueba en las pruebas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--series', type=int, nargs='+', default=[1_000, 5_000], help='Cantidad de series a expandir.')
+        parser.add_argument('--dias', type=int, default=90, help='Largo de la ventana a expandir, en días desde hoy.')
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--json', dest='salida_json', help='Guarda el resultado en este archivo JSON.')
+
+    def handle(self, *args, **options):
+        hoy = date.today()
+        desde, hasta = hoy, hoy + timedelta(days=options['dias'])
+        resultados = []
+        for cantidad in options['series']:
+            reglas = reglas_aleatorias(cantidad, options['semilla'], hoy)
+            paso_a_paso_ms, fechas = medir(expandir_paso_a_paso, reglas, desde, hasta, options['repeticiones'])
+            cerrada_ms, _ = medir(Regla.expandir, reglas, desde, hasta, options['repeticiones'])
+            resultado = {
+                'series': cantidad,
+                'fechas': fechas,
+                'paso_a_paso_ms': paso_a_paso_ms,
+                'forma_cerrada_ms': cerrada_ms,
+            }
+            resultados.append(resultado)
+            self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in resultado.items()))
+
+        if options['salida_json']:
+            with open(options['salida_json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['salida_json']}")
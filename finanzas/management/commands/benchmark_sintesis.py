@@ -0,0 +1,95 @@
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from finanzas import semillas
+from finanzas.models import Transaccion
+from finanzas.openai_utils import construir_prompt
+from finanzas.resumen import rango_mes
+from finanzas.sintesis import calcular_sintesis, estimar_tokens, redactar_sintesis
+
+
+PREFIJO_USUARIO = 'benchmark_sintesis_'
+
+
+def prompt_detallado(usuario, inicio_mes, fin_mes):
+    """
+    Prompt con una línea por transacción, como se armaba antes de la síntesis.
+    """
+    transacciones = Transaccion.objects.filter(
+        usuario=usuario, fecha__gte=inicio_mes, fecha__lt=fin_mes
+    ).values('fecha', 'descripcion', 'categoria', 'tipo', 'monto')
+    return construir_prompt("\n".join(
+        f"{t['fecha']} - {t['descripcion']} - {t['categoria']} - {t['tipo']} - ${t['monto']}"
+        for t in transacciones
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el tamaño del prompt de recomendaciones (una línea por transacción vs. síntesis '
+        'agregada con presupuesto de tokens) según la cantidad de transacciones del mes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--transacciones', type=int, nargs='+', default=[100, 1_000, 10_000],
+            help='Transacciones del mes actual a sembrar (por defecto 100 1000 10000).'
+        )
+        parser.add_argument(
+            '--presupuesto', type=int, default=settings.RECOMENDACIONES_PRESUPUESTO_TOKENS,
+            help='Presupuesto de tokens del prompt completo.'
+        )
+        parser.add_argument('--json', dest='salida_json', help='Guarda el resultado en este archivo JSON.')
+        parser.add_argument('--limpiar', action='store_true', help='Elimina los usuarios de benchmark al terminar.')
+
+    def handle(self, *args, **options):
+        hoy = timezone.now().date()
+        inicio_mes, fin_mes = rango_mes(hoy.year, hoy.month)
+        resultados = []
+        for cantidad in options['transacciones']:
+            usuario = semillas.obtener_usuario(f'{PREFIJO_USUARIO}{cantidad}')
+            if not Transaccion.objects.filter(usuario=usuario).exists():
+                self.stdout.write(f'Sembrando {cantidad} transacciones del mes (y 3 meses previos) para {usuario.username}...')
+                # El mes actual y tres meses anteriores con el mismo volumen mensual
+                semillas.sembrar_transacciones(usuario, cantidad, semilla=cantidad, dias=hoy.day, hasta=hoy)
+                semillas.sembrar_transacciones(
+                    usuario, 3 * cantidad, semilla=cantidad + 1, dias=90, hasta=inicio_mes - timedelta(days=1)
+                )
+
+            inicio = time.perf_counter()
+            detallado = prompt_detallado(usuario, inicio_mes, fin_mes)
+            segundos_detallado = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            sintesis = calcular_sintesis(usuario.id, hoy.year, hoy.month)
+            presupuesto = options['presupuesto'] - estimar_tokens(construir_prompt(""))
+            compacto = construir_prompt(redactar_sintesis(sintesis, presupuesto))
+            segundos_sintesis = time.perf_counter() - inicio
+
+            resultado = {
+                'transacciones_mes': sintesis.cantidad,
+                'detallado_caracteres': len(detallado),
+                'detallado_tokens': estimar_tokens(detallado),
+                'detallado_segundos': round(segundos_detallado, 3),
+                'sintesis_caracteres': len(compacto),
+                'sintesis_tokens': estimar_tokens(compacto),
+                'sintesis_segundos': round(segundos_sintesis, 3),
+            }
+            resultados.append(resultado)
+            self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in resultado.items()))
+
+        self.stdout.write(f'\nEjemplo de síntesis ({options["presupuesto"]} tokens):\n{compacto}')
+
+        if options['salida_json']:
+            with open(options['salida_json'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultado guardado en {options['salida_json']}")
+
+        if options['limpiar']:
+            User.objects.filter(username__startswith=PREFIJO_USUARIO).delete()
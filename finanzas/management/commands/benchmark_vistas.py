@@ -0,0 +1,263 @@
+import copy
+import datetime
+import json
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from finanzas import cache_dashboard, instrumentacion, semillas
+from finanzas.models import SerieRecurrente, Transaccion
+from finanzas.recurrentes import generar_transacciones_recurrentes
+
+
+PREFIJO_USUARIO = 'benchmark_vistas_'
+
+# Widgets que dashboard.js pide al abrir la página
+WIDGETS_PAGINA = ('resumen', 'categorias', 'gastos-mensuales', 'objetivos', 'ultimas')
+
+# Filas del CSV del escenario importar_csv
+FILAS_IMPORTACION = 1_000
+
+# Diferencias de latencia por debajo de este margen se consideran ruido al comparar con la base
+MARGEN_MS = 2.0
+
+
+def _consumir(response):
+    # Las exportaciones se envían por partes: hay que leerlas completas para medirlas
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response.status_code
+
+
+def csv_importacion(filas):
+    hoy = timezone.now().date()
+    lineas = ['fecha,descripcion,monto,tipo,categoria']
+    for i in range(filas):
+        fecha = hoy - datetime.timedelta(days=i % 365)
+        lineas.append(f'{fecha:%d/%m/%Y},Importada {i},{-(1000 + i * 37 % 90000)},,Otros')
+    return '\n'.join(lineas).encode('utf-8')
+
+
+def escenarios(cliente, usuario):
+    """
+    Devuelve {nombre: (funcion, url_name)}: cada función hace una petición (o corre el
+    generador de recurrentes) y devuelve el código de estado.
+    """
+    hace_5_anios = timezone.now().date().replace(day=1).replace(year=timezone.now().year - 5)
+
+    def peticion(url):
+        return lambda: _consumir(cliente.get(url))
+
+    def sin_cache(url):
+        # Equivale a la primera carga después de un cambio en los datos del usuario
+        def funcion():
+            cache_dashboard.invalidar(usuario.id)
+            return _consumir(cliente.get(url))
+        return funcion
+
+    def revalidar(url):
+        # El navegador repite la petición con el ETag que recibió: sin cambios, responde 304.
+        # El ETag se toma en la primera llamada (la de calentamiento), después de los
+        # escenarios anteriores que invalidan la caché
+        etags = {}
+
+        def funcion():
+            if url not in etags:
+                etags[url] = cliente.get(url)['ETag']
+            return _consumir(cliente.get(url, HTTP_IF_NONE_MATCH=etags[url]))
+        return funcion
+
+    def widgets_sin_cache():
+        # Todos los widgets que pide dashboard.js al abrir la página, después de un cambio
+        cache_dashboard.invalidar(usuario.id)
+        estados = [_consumir(cliente.get(f'/dashboard/widgets/{nombre}/')) for nombre in WIDGETS_PAGINA]
+        return max(estados)
+
+    def generar_recurrentes():
+        # Se deshace al terminar para que cada repetición tenga las mismas fechas pendientes
+        with transaction.atomic():
+            generar_transacciones_recurrentes(usuario.id, timezone.now().date())
+            transaction.set_rollback(True)
+        return 200
+
+    def importar_csv():
+        # Importación de un extracto del banco; también se deshace al terminar
+        contenido = csv_importacion(FILAS_IMPORTACION)
+        with transaction.atomic():
+            archivo = SimpleUploadedFile('extracto.csv', contenido, content_type='text/csv')
+            estado = _consumir(cliente.post('/transacciones/importar/', {'archivo': archivo}))
+            transaction.set_rollback(True)
+        return estado
+
+    return {
+        'dashboard': (peticion('/'), 'dashboard'),
+        'dashboard_revalidado': (revalidar('/'), 'dashboard'),
+        'widget_resumen': (sin_cache('/dashboard/widgets/resumen/'), 'dashboard_widget'),
+        'widget_resumen_en_cache': (peticion('/dashboard/widgets/resumen/'), 'dashboard_widget'),
+        'widget_resumen_revalidado': (revalidar('/dashboard/widgets/resumen/'), 'dashboard_widget'),
+        'widget_ultimas': (peticion('/dashboard/widgets/ultimas/'), 'dashboard_widget'),
+        'widgets_sin_cache': (widgets_sin_cache, None),
+        'evolucion_5_anios': (
+            sin_cache(f'/dashboard/evolucion/?granularidad=semana&desde={hace_5_anios}'), 'evolucion_saldo'
+        ),
+        'lista_transacciones': (peticion('/transacciones/'), 'lista_transacciones'),
+        'lista_por_monto': (peticion('/transacciones/?orden=-monto'), 'lista_transacciones'),
+        'lista_por_categoria': (peticion('/transacciones/?orden=categoria&page=5'), 'lista_transacciones'),
+        'exportar_csv': (peticion('/transacciones/descargar/'), 'descargar_transacciones'),
+        'exportar_pdf': (peticion('/transacciones/descargar-pdf/'), 'descargar_transacciones_pdf'),
+        'exportar_excel': (peticion('/transacciones/descargar-excel/'), 'descargar_transacciones_excel'),
+        'generar_recurrentes': (generar_recurrentes, None),
+        'importar_csv': (importar_csv, None),
+    }
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def medir(funcion, repeticiones):
+    # tracemalloc ralentiza mucho la ejecución: la memoria se mide en una pasada aparte,
+    # que además sirve de calentamiento (importaciones perezosas, cachés de plantillas)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        with instrumentacion.abrir_medicion() as medicion:
+            inicio = time.perf_counter()
+            estado = funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'estado': estado,
+        'p50_ms': round(percentil(tiempos, 50), 1),
+        'p95_ms': round(percentil(tiempos, 95), 1),
+        'max_ms': round(max(tiempos), 1),
+        'consultas': medicion.consultas,
+        'bd_ms': round(medicion.bd * 1000, 1),
+        'plantillas_ms': round(medicion.plantillas * 1000, 1),
+        'memoria_pico_mb': round(pico / 1024 / 1024, 2),
+    }
+
+
+def comparar(resultados, base, tolerancia):
+    """
+    Devuelve las regresiones respecto de ``base``: más consultas, o una mediana más lenta
+    que la de la base en más de ``tolerancia`` (proporción) y de MARGEN_MS.
+    """
+    anteriores = {(r['filas'], r['escenario']): r for r in base['resultados']}
+    regresiones = []
+    for resultado in resultados:
+        anterior = anteriores.get((resultado['filas'], resultado['escenario']))
+        if anterior is None:
+            continue
+        nombre = f"{resultado['escenario']} ({resultado['filas']} filas)"
+        if resultado['consultas'] > anterior['consultas']:
+            regresiones.append(f"{nombre}: {anterior['consultas']} -> {resultado['consultas']} consultas")
+        limite = max(anterior['p50_ms'] * (1 + tolerancia), anterior['p50_ms'] + MARGEN_MS)
+        if resultado['p50_ms'] > limite:
+            regresiones.append(f"{nombre}: p50 {anterior['p50_ms']} -> {resultado['p50_ms']} ms")
+    return regresiones
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el dashboard, la lista de transacciones, las exportaciones, la importación y el '
+        'generador de recurrentes con datos sembrados (latencia p50/p95, consultas y memoria máxima) y '
+        'compara el resultado con un informe base.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas', type=int, nargs='+', default=[1_000, 100_000],
+            help='Transacciones del usuario de cada corrida (por defecto 1000 100000; p. ej. 1000000).'
+        )
+        parser.add_argument('--series', type=int, default=20, help='Series recurrentes por usuario.')
+        parser.add_argument('--objetivos', type=int, default=8, help='Objetivos de ahorro por usuario.')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--escenarios', nargs='+', help='Solo estos escenarios (por defecto, todos).')
+        parser.add_argument('--json', dest='salida_json', help='Guarda el informe en este archivo JSON.')
+        parser.add_argument('--base', help='Informe JSON anterior con el que comparar; termina con error si hay regresiones.')
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.25,
+            help='Aumento de la mediana tolerado respecto de la base (por defecto 0.25 = 25%%).'
+        )
+        parser.add_argument('--limpiar', action='store_true', help='Elimina los usuarios de benchmark al terminar.')
+
+    def handle(self, *args, **options):
+        plantillas = copy.deepcopy(settings.TEMPLATES)
+        plantillas[0]['BACKEND'] = 'finanzas.instrumentacion.DjangoTemplatesMedidas'
+        instrumentacion.instalar()
+
+        resultados = []
+        # El cliente de pruebas usa el host 'testserver'; los correos no salen del proceso
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+            TEMPLATES=plantillas,
+        ):
+            for cantidad in options['filas']:
+                usuario = self.preparar_usuario(cantidad, options)
+                cliente = Client()
+                cliente.force_login(usuario)
+                for nombre, (funcion, vista) in escenarios(cliente, usuario).items():
+                    if options['escenarios'] and nombre not in options['escenarios']:
+                        continue
+                    resultado = {
+                        'filas': cantidad,
+                        'escenario': nombre,
+                        **medir(funcion, options['repeticiones']),
+                        'presupuesto': settings.PRESUPUESTO_CONSULTAS.get(vista),
+                    }
+                    resultados.append(resultado)
+                    self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in resultado.items()))
+
+        informe = {
+            'motor': connection.vendor,
+            'fecha': timezone.now().isoformat(timespec='seconds'),
+            'repeticiones': options['repeticiones'],
+            'resultados': resultados,
+        }
+        if options['salida_json']:
+            with open(options['salida_json'], 'w', encoding='utf-8') as archivo:
+                json.dump(informe, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Informe guardado en {options['salida_json']}")
+
+        if options['limpiar']:
+            User.objects.filter(username__startswith=PREFIJO_USUARIO).delete()
+
+        errores = [
+            f"{r['escenario']} ({r['filas']} filas): {r['consultas']} consultas (presupuesto: {r['presupuesto']})"
+            for r in resultados if r['presupuesto'] is not None and r['consultas'] > r['presupuesto']
+        ]
+        if options['base']:
+            with open(options['base'], encoding='utf-8') as archivo:
+                base = json.load(archivo)
+            if base.get('motor') != connection.vendor:
+                self.stdout.write(self.style.WARNING(f"La base se midió con {base.get('motor')}, no con {connection.vendor}"))
+            errores += comparar(resultados, base, options['tolerancia'])
+        if errores:
+            raise CommandError('Regresiones de rendimiento:\n' + '\n'.join(errores))
+
+    def preparar_usuario(self, cantidad, options):
+        usuario = semillas.obtener_usuario(f'{PREFIJO_USUARIO}{cantidad}')
+        faltantes = cantidad - Transaccion.objects.filter(usuario=usuario).count()
+        if faltantes > 0:
+            self.stdout.write(f'Sembrando {faltantes} transacciones para {usuario.username}...')
+            semillas.sembrar_transacciones(usuario, faltantes, semilla=cantidad)
+        if not SerieRecurrente.objects.filter(usuario=usuario).exists():
+            semillas.sembrar_series(usuario, options['series'], semilla=cantidad)
+            semillas.sembrar_objetivos(usuario, options['objetivos'], semilla=cantidad)
+        return usuario
@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finanzas import saldos
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara los saldos mantenidos (actual y diarios) con los calculados desde las '
+        'transacciones y reconstruye los de los usuarios que no coinciden.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Solo informa las diferencias, sin modificar nada (termina con error si hay alguna).'
+        )
+        parser.add_argument(
+            '--usuario', action='append', dest='usuarios', metavar='USERNAME',
+            help='Limita la operación a uno o más usuarios.'
+        )
+        parser.add_argument(
+            '--todos', action='store_true',
+            help='Reconstruye los saldos de todos los usuarios (o de los indicados), coincidan o no.'
+        )
+
+    def handle(self, *args, **options):
+        usuarios = None
+        if options['usuarios']:
+            usuarios = list(User.objects.filter(username__in=options['usuarios']))
+            if len(usuarios) != len(set(options['usuarios'])):
+                raise CommandError('Alguno de los usuarios indicados no existe.')
+
+        if options['todos'] and not options['verificar']:
+            cantidad = saldos.reconstruir(usuarios)
+            self.stdout.write(self.style.SUCCESS(f'Saldos reconstruidos: {cantidad} usuarios.'))
+            return
+
+        diferencias = saldos.buscar_diferencias(usuarios)
+        for usuario_id, guardado, esperado, fecha in diferencias:
+            detalle = f' primer día distinto={fecha}' if fecha else ''
+            self.stdout.write(f'usuario={usuario_id}: guardado={guardado} esperado={esperado}{detalle}')
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('Los saldos coinciden con las transacciones.'))
+            return
+        if options['verificar']:
+            raise CommandError(f'{len(diferencias)} usuarios con saldos que no coinciden con las transacciones.')
+
+        cantidad = saldos.reconstruir([usuario_id for usuario_id, *_ in diferencias])
+        self.stdout.write(self.style.SUCCESS(f'Saldos reconstruidos: {cantidad} usuarios.'))
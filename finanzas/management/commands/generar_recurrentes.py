@@ -0,0 +1,109 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from finanzas.models import SerieRecurrente
+from finanzas.recurrentes import generar_transacciones_recurrentes
+
+logger = logging.getLogger(__name__)
+
+
+def procesar_lote(usuarios_ids, hasta):
+    """
+    Genera las transacciones pendientes de un lote de usuarios.
+    Cada usuario va en su propia transacción; un error no detiene al resto del lote.
+    Devuelve (usuarios procesados, transacciones creadas, errores).
+    """
+    creadas = 0
+    errores = 0
+    try:
+        for usuario_id in usuarios_ids:
+            try:
+                creadas += generar_transacciones_recurrentes(usuario_id, hasta)
+            except Exception:
+                errores += 1
+                logger.exception('Error generando recurrentes del usuario %s', usuario_id)
+    finally:
+        # Cada hilo abre su propia conexión; se cierra al terminar el lote
+        connection.close()
+    return len(usuarios_ids), creadas, errores
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera las transacciones recurrentes pendientes de todos los usuarios. '
+        'Pensado para ejecutarse periódicamente (cron, systemd timer) fuera de las peticiones web.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hasta', metavar='YYYY-MM-DD',
+            help='Genera hasta esta fecha (por defecto, hoy).'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=100,
+            help='Usuarios por lote (por defecto 100).'
+        )
+        parser.add_argument(
+            '--trabajadores', type=int, default=4,
+            help='Hilos que procesan lotes en paralelo (por defecto 4).'
+        )
+
+    def handle(self, *args, **options):
+        if options['hasta']:
+            try:
+                hasta = datetime.strptime(options['hasta'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('La fecha debe tener el formato YYYY-MM-DD.')
+        else:
+            hasta = timezone.now().date()
+        if options['lote'] < 1 or options['trabajadores'] < 1:
+            raise CommandError('--lote y --trabajadores deben ser mayores que 0.')
+        trabajadores = options['trabajadores']
+        if connection.vendor == 'sqlite' and trabajadores > 1:
+            # SQLite admite un solo escritor a la vez; los hilos solo se bloquearían entre sí
+            self.stdout.write('SQLite detectado: se usa un solo trabajador.')
+            trabajadores = 1
+
+        # Solo usuarios con alguna serie activa con ocurrencias pendientes (índice serie_proxima)
+        usuarios_ids = list(
+            SerieRecurrente.objects
+            .filter(activa=True, usuario__isnull=False, proxima_fecha__lte=hasta)
+            .values_list('usuario_id', flat=True)
+            .distinct()
+            .order_by('usuario_id')
+        )
+        lote = options['lote']
+        lotes = [usuarios_ids[i:i + lote] for i in range(0, len(usuarios_ids), lote)]
+
+        inicio = time.monotonic()
+        total_usuarios = total_creadas = total_errores = 0
+        with ThreadPoolExecutor(max_workers=trabajadores) as ejecutor:
+            futuros = [ejecutor.submit(procesar_lote, ids, hasta) for ids in lotes]
+            for futuro in as_completed(futuros):
+                usuarios, creadas, errores = futuro.result()
+                total_usuarios += usuarios
+                total_creadas += creadas
+                total_errores += errores
+        duracion = time.monotonic() - inicio
+
+        metricas = {
+            'hasta': hasta.isoformat(),
+            'usuarios': total_usuarios,
+            'lotes': len(lotes),
+            'transacciones_creadas': total_creadas,
+            'errores': total_errores,
+            'segundos': round(duracion, 3),
+            'usuarios_por_segundo': round(total_usuarios / duracion, 1) if duracion else None,
+            'transacciones_por_segundo': round(total_creadas / duracion, 1) if duracion else None,
+        }
+        logger.info('Generación de recurrentes terminada: %s', metricas)
+        self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in metricas.items()))
+        if total_errores:
+            raise CommandError(f'{total_errores} usuarios terminaron con error.')
+        self.stdout.write(self.style.SUCCESS('Transacciones recurrentes generadas.'))
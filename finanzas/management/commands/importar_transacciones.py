@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finanzas.importaciones import TAMANIO_LOTE, ArchivoInvalido, formato_de, importar
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa transacciones de un archivo del banco (CSV, Excel u OFX) para un usuario, con '
+        'las mismas validaciones y detección de duplicados que la importación desde la web.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario', metavar='USERNAME')
+        parser.add_argument('archivo')
+        parser.add_argument(
+            '--formato', choices=['csv', 'xlsx', 'ofx'],
+            help='Formato del archivo (por defecto, según la extensión).'
+        )
+        parser.add_argument('--lote', type=int, default=TAMANIO_LOTE, help=f'Filas por inserción (por defecto {TAMANIO_LOTE}).')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"El usuario {options['usuario']} no existe.")
+
+        try:
+            formato = options['formato'] or formato_de(options['archivo'])
+            with open(options['archivo'], 'rb') as archivo:
+                for progreso in importar(usuario, archivo, formato, lote=options['lote']):
+                    self.stdout.write(
+                        f'{progreso.avance:6.1%} leídas={progreso.leidas} importadas={progreso.importadas} '
+                        f'duplicadas={progreso.duplicadas} inválidas={progreso.invalidas}'
+                    )
+        except (ArchivoInvalido, OSError) as e:
+            raise CommandError(str(e))
+
+        for fila, error in progreso.errores:
+            self.stdout.write(f'fila {fila}: {error}')
+        if progreso.invalidas > len(progreso.errores):
+            self.stdout.write(f'... y {progreso.invalidas - len(progreso.errores)} filas inválidas más')
+        self.stdout.write(self.style.SUCCESS(f'Transacciones importadas: {progreso.importadas}.'))
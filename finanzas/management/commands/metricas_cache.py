@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from finanzas import cache_dashboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Muestra los aciertos, fallos e invalidaciones de la caché del dashboard. Con la caché en '
+        'memoria (locmem) cada proceso tiene sus propios contadores: este comando solo ve los de '
+        'un backend compartido.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Imprime las métricas como JSON.')
+        parser.add_argument('--reiniciar', action='store_true', help='Pone los contadores en cero después de mostrarlos.')
+
+    def handle(self, *args, **options):
+        metricas = cache_dashboard.metricas()
+        if options['json']:
+            self.stdout.write(json.dumps(metricas))
+        else:
+            self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in metricas.items()))
+        if options['reiniciar']:
+            cache_dashboard.reiniciar_metricas()
@@ -0,0 +1,52 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from finanzas.correos import MAX_INTENTOS, vaciar_bandeja
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía los correos de la bandeja de salida por lotes, reutilizando una conexión SMTP '
+        'y reintentando con backoff los que fallan. Por defecto queda escuchando la cola.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help='Correos por lote (por defecto 50).')
+        parser.add_argument(
+            '--intervalo', type=float, default=5,
+            help='Segundos de espera cuando la cola está vacía (por defecto 5).'
+        )
+        parser.add_argument(
+            '--max-intentos', type=int, default=MAX_INTENTOS,
+            help=f'Intentos antes de marcar un correo como fallido (por defecto {MAX_INTENTOS}).'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Vacía la cola una vez y termina (útil para cron o pruebas).'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            try:
+                enviados, fallidos = vaciar_bandeja(options['lote'], options['max_intentos'])
+            except Exception:
+                # Servidor SMTP o base de datos no disponibles: se reintenta en la próxima vuelta
+                logger.exception('Error procesando la bandeja de salida')
+                enviados, fallidos = 0, 0
+                if options['una_vez']:
+                    raise
+
+            if enviados or fallidos:
+                mensaje = f'enviados={enviados} fallidos={fallidos}'
+                logger.info(mensaje)
+                self.stdout.write(mensaje)
+
+            if options['una_vez']:
+                return
+            time.sleep(options['intervalo'])
@@ -0,0 +1,54 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from finanzas.tareas import ejecutar, reencolar_abandonadas, tomar_siguiente
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta las tareas en segundo plano encoladas por las vistas (p. ej. el envío del Excel '
+        'del mes). Por defecto queda escuchando la cola; se pueden correr varios en paralelo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=float, default=2,
+            help='Segundos de espera cuando la cola está vacía (por defecto 2).'
+        )
+        parser.add_argument(
+            '--tiempo-maximo', type=int, default=30,
+            help='Minutos tras los que una tarea que sigue ejecutándose se considera abandonada y se reencola (por defecto 30).'
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help='Ejecuta las tareas en cola y termina (útil para cron o pruebas).'
+        )
+
+    def handle(self, *args, **options):
+        limite = timedelta(minutes=options['tiempo_maximo'])
+        while True:
+            close_old_connections()
+            reencoladas = reencolar_abandonadas(limite)
+            if reencoladas:
+                logger.warning('%s tareas abandonadas devueltas a la cola', reencoladas)
+
+            tarea = tomar_siguiente()
+            while tarea is not None:
+                ejecutar(tarea)
+                mensaje = (
+                    f'tarea={tarea.id} tipo={tarea.tipo} estado={tarea.estado} '
+                    f'en_cola={tarea.segundos_en_cola:.2f}s ejecucion={tarea.segundos_ejecucion:.2f}s'
+                )
+                logger.info(mensaje)
+                self.stdout.write(mensaje)
+                tarea = tomar_siguiente()
+
+            if options['una_vez']:
+                return
+            time.sleep(options['intervalo'])
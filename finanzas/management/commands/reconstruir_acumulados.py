@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finanzas import acumulados
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye (o verifica) los acumulados mensuales a partir de las transacciones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Solo compara los acumulados con las transacciones, sin modificar nada.'
+        )
+        parser.add_argument(
+            '--usuario', action='append', dest='usuarios', metavar='USERNAME',
+            help='Limita la operación a uno o más usuarios.'
+        )
+
+    def handle(self, *args, **options):
+        usuarios = None
+        if options['usuarios']:
+            usuarios = list(User.objects.filter(username__in=options['usuarios']))
+            if len(usuarios) != len(set(options['usuarios'])):
+                raise CommandError('Alguno de los usuarios indicados no existe.')
+
+        if options['verificar']:
+            diferencias = acumulados.buscar_diferencias(usuarios)
+            for clave, guardado, esperado in diferencias:
+                usuario_id, anio, mes, tipo, categoria = clave
+                self.stdout.write(
+                    f"usuario={usuario_id} {anio}-{mes:02d} {tipo} '{categoria}': "
+                    f"guardado={guardado[0]} ({guardado[1]}) esperado={esperado[0]} ({esperado[1]})"
+                )
+            if diferencias:
+                raise CommandError(f'{len(diferencias)} acumulados no coinciden con las transacciones.')
+            self.stdout.write(self.style.SUCCESS('Los acumulados coinciden con las transacciones.'))
+            return
+
+        filas = acumulados.reconstruir(usuarios)
+        self.stdout.write(self.style.SUCCESS(f'Acumulados reconstruidos: {filas} filas.'))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-18 16:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def poblar_acumulados(apps, schema_editor):
+    Transaccion = apps.get_model('finanzas', 'Transaccion')
+    AcumuladoMensual = apps.get_model('finanzas', 'AcumuladoMensual')
+    filas = (
+        Transaccion.objects
+        .filter(usuario__isnull=False, fecha__isnull=False)
+        .annotate(anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'))
+        .values('usuario_id', 'anio', 'mes', 'tipo', 'categoria')
+        .annotate(total=Sum('monto'), cantidad=Count('id'))
+        .order_by()
+    )
+    acumulados = {}
+    for fila in filas:
+        clave = (fila['usuario_id'], fila['anio'], fila['mes'], fila['tipo'], fila['categoria'] or '')
+        total, cantidad = acumulados.get(clave, (0, 0))
+        acumulados[clave] = (total + fila['total'], cantidad + fila['cantidad'])
+    AcumuladoMensual.objects.bulk_create([
+        AcumuladoMensual(
+            usuario_id=usuario_id, anio=anio, mes=mes, tipo=tipo, categoria=categoria,
+            total=total, cantidad=cantidad
+        )
+        for (usuario_id, anio, mes, tipo, categoria), (total, cantidad) in acumulados.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcumuladoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField()),
+                ('mes', models.PositiveSmallIntegerField()),
+                ('tipo', models.CharField(choices=[('INGRESO', 'Ingreso'), ('GASTO', 'Gasto')], max_length=10)),
+                ('categoria', models.CharField(blank=True, default='', max_length=100)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'anio', 'mes', 'tipo', 'categoria'), name='acumulado_mensual_unico')],
+            },
+        ),
+        migrations.RunPython(poblar_acumulados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 16:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0002_acumuladomensual'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'tipo', 'fecha'], name='trans_usuario_tipo_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'fecha', 'id'], name='trans_usuario_fecha_id'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'categoria', 'fecha'], name='trans_usuario_cat_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['serie_recurrente', 'fecha'], name='trans_serie_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(condition=models.Q(('descripcion', 'Balance Inicial')), fields=['usuario'], name='trans_balance_inicial'),
+        ),
+    ]
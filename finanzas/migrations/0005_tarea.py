@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 16:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0004_correopendiente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('ENVIAR_TRANSACCIONES_MES', 'Enviar transacciones del mes')], max_length=30)),
+                ('anio', models.PositiveSmallIntegerField()),
+                ('mes', models.PositiveSmallIntegerField()),
+                ('estado', models.CharField(choices=[('EN_COLA', 'En cola'), ('EJECUTANDO', 'Ejecutando'), ('TERMINADA', 'Terminada'), ('FALLIDA', 'Fallida')], default='EN_COLA', max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'fecha_creacion'], name='tarea_estado_creacion')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado__in', ['EN_COLA', 'EJECUTANDO'])), fields=('usuario', 'tipo', 'anio', 'mes'), name='tarea_activa_unica')],
+            },
+        ),
+    ]
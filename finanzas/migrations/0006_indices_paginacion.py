@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 16:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0005_tarea'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaccion',
+            name='trans_usuario_tipo_fecha',
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'tipo', 'fecha', 'id'], name='trans_usuario_tipo_fecha_id'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'monto', 'fecha', 'id'], name='trans_usuario_monto_id'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'descripcion', '-fecha', '-id'], name='trans_usuario_desc_fecha'),
+        ),
+    ]
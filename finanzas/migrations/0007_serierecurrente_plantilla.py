@@ -0,0 +1,133 @@
+# Generated by Django 5.2 on 2026-10-18 17:01
+
+from calendar import monthrange
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# Copia de la regla de finanzas.reglas al momento de esta migración: cada ocurrencia se
+# calcula desde la fecha de inicio (inicio + n periodos), no sumando un periodo a la anterior
+DIAS = {'DIARIA': 1, 'SEMANAL': 7}
+MESES = {'MENSUAL': 1, 'ANUAL': 12}
+
+
+def _meses(fecha):
+    return fecha.year * 12 + fecha.month - 1
+
+
+def ocurrencia(periodicidad, inicio, n):
+    if periodicidad in DIAS:
+        return inicio + timedelta(days=n * DIAS[periodicidad])
+    anio, mes = divmod(_meses(inicio) + n * MESES[periodicidad], 12)
+    return date(anio, mes + 1, min(inicio.day, monthrange(anio, mes + 1)[1]))
+
+
+def siguiente(periodicidad, inicio, fecha):
+    # Primera ocurrencia del periodo posterior al de ``fecha`` (reglas.Regla.siguiente)
+    if fecha < inicio:
+        return inicio
+    if periodicidad in DIAS:
+        n = (fecha - inicio).days // DIAS[periodicidad]
+    else:
+        n = (_meses(fecha) - _meses(inicio)) // MESES[periodicidad]
+    return ocurrencia(periodicidad, inicio, n + 1)
+
+
+def poblar_plantillas(apps, schema_editor):
+    # Cada serie toma como plantilla su transacción base (la de menor fecha de inicio) y la
+    # próxima fecha es la primera ocurrencia posterior a la última ya generada, igual que en
+    # recurrentes.calcular_proxima_fecha
+    SerieRecurrente = apps.get_model('finanzas', 'SerieRecurrente')
+    Transaccion = apps.get_model('finanzas', 'Transaccion')
+    base = Transaccion.objects.filter(serie_recurrente=OuterRef('pk')).order_by('fecha_inicio', 'id').values('id')[:1]
+    ultima_fecha = Transaccion.objects.filter(serie_recurrente=OuterRef('pk')).order_by('-fecha').values('fecha')[:1]
+    series = list(SerieRecurrente.objects.annotate(base_id=Subquery(base), ultima_fecha=Subquery(ultima_fecha)))
+    bases = Transaccion.objects.in_bulk([serie.base_id for serie in series if serie.base_id])
+    for serie in series:
+        base = bases.get(serie.base_id)
+        if base is None:
+            continue
+        serie.descripcion = base.descripcion
+        serie.monto = base.monto
+        serie.tipo = base.tipo
+        serie.categoria = base.categoria
+        serie.periodicidad = base.periodicidad
+        serie.fecha_inicio = base.fecha_inicio
+        serie.fecha_fin = base.fecha_fin
+        ultima = serie.ultima_generada or serie.ultima_fecha
+        periodicidad = (base.periodicidad or '').upper()
+        proxima = None
+        if serie.activa and (periodicidad in DIAS or periodicidad in MESES) and base.fecha_inicio:
+            proxima = siguiente(periodicidad, base.fecha_inicio, ultima) if ultima else base.fecha_inicio
+            if base.fecha_fin and proxima > base.fecha_fin:
+                proxima = None
+        serie.ultima_generada = ultima
+        serie.proxima_fecha = proxima
+    SerieRecurrente.objects.bulk_update(
+        series,
+        ['descripcion', 'monto', 'tipo', 'categoria', 'periodicidad', 'fecha_inicio', 'fecha_fin',
+         'ultima_generada', 'proxima_fecha'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0006_indices_paginacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='categoria',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='descripcion',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='fecha_fin',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='fecha_inicio',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='monto',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='periodicidad',
+            field=models.CharField(blank=True, choices=[('DIARIA', 'Diaria'), ('SEMANAL', 'Semanal'), ('MENSUAL', 'Mensual'), ('ANUAL', 'Anual')], max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='proxima_fecha',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='serierecurrente',
+            name='tipo',
+            field=models.CharField(blank=True, choices=[('INGRESO', 'Ingreso'), ('GASTO', 'Gasto')], default='', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='serierecurrente',
+            index=models.Index(condition=models.Q(('activa', True)), fields=['usuario', 'proxima_fecha'], name='serie_usuario_proxima'),
+        ),
+        migrations.AddIndex(
+            model_name='serierecurrente',
+            index=models.Index(condition=models.Q(('activa', True)), fields=['proxima_fecha'], name='serie_proxima'),
+        ),
+        migrations.RunPython(poblar_plantillas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-18 17:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def poblar_saldos(apps, schema_editor):
+    Transaccion = apps.get_model('finanzas', 'Transaccion')
+    SaldoCuenta = apps.get_model('finanzas', 'SaldoCuenta')
+    SaldoDiario = apps.get_model('finanzas', 'SaldoDiario')
+    filas = (
+        Transaccion.objects
+        .filter(usuario__isnull=False, fecha__isnull=False)
+        .values('usuario_id', 'fecha')
+        .annotate(ingresos=Sum('monto', filter=Q(tipo='INGRESO')), gastos=Sum('monto', filter=Q(tipo='GASTO')))
+        .order_by('usuario_id', 'fecha')
+    )
+    saldos = {}
+    diarios = []
+    for fila in filas:
+        saldo = saldos.get(fila['usuario_id'], 0) + (fila['ingresos'] or 0) - (fila['gastos'] or 0)
+        saldos[fila['usuario_id']] = saldo
+        diarios.append(SaldoDiario(usuario_id=fila['usuario_id'], fecha=fila['fecha'], saldo=saldo))
+    SaldoDiario.objects.bulk_create(diarios, batch_size=1000)
+    SaldoCuenta.objects.bulk_create([
+        SaldoCuenta(usuario_id=usuario_id, saldo=saldo) for usuario_id, saldo in saldos.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('finanzas', '0007_serierecurrente_plantilla'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoCuenta',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('saldo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SaldoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('saldo', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'fecha'), name='saldo_diario_unico')],
+            },
+        ),
+        migrations.RunPython(poblar_saldos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 17:35
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def calcular_huellas(apps, schema_editor):
+    # Misma fórmula que finanzas.models.calcular_huella al momento de esta migración
+    Transaccion = apps.get_model('finanzas', 'Transaccion')
+    filas = Transaccion.objects.filter(fecha__isnull=False).only('id', 'fecha', 'monto', 'tipo', 'descripcion').order_by('id')
+    # Por rangos de id: SQLite no aísla un cursor abierto de las escrituras en la misma tabla
+    ultimo_id = 0
+    while True:
+        lote = list(filas.filter(id__gt=ultimo_id)[:2000])
+        if not lote:
+            break
+        for transaccion in lote:
+            descripcion = ' '.join((transaccion.descripcion or '').split()).casefold()
+            clave = f'{transaccion.fecha.isoformat()}|{transaccion.monto:.2f}|{transaccion.tipo}|{descripcion}'
+            transaccion.huella = hashlib.blake2b(clave.encode(), digest_size=16).hexdigest()
+        Transaccion.objects.bulk_update(lote, ['huella'])
+        ultimo_id = lote[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0008_saldos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaccion',
+            name='huella',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(condition=models.Q(('huella__isnull', False)), fields=['usuario', 'huella'], name='trans_usuario_huella'),
+        ),
+        migrations.RunPython(calcular_huellas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 17:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0009_huella_transaccion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', '-descripcion', '-fecha', '-id'], name='trans_usuario_desc_desc'),
+        ),
+        migrations.AddIndex(
+            model_name='transaccion',
+            index=models.Index(fields=['usuario', 'tipo', '-fecha', '-id'], name='trans_usuario_tipo_desc'),
+        ),
+    ]
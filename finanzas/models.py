@@ -1,11 +1,22 @@
+import hashlib
+
 from django.db import models
 from django.utils import timezone
-from dateutil.relativedelta import relativedelta
 import datetime
 from django.contrib.auth.models import User
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
 
+def calcular_huella(fecha, monto, tipo, descripcion):
+    """
+    Huella para detectar transacciones repetidas al importar: la misma fecha, monto, tipo y
+    descripción (sin distinguir mayúsculas ni espacios) dan la misma huella.
+    """
+    descripcion = ' '.join((descripcion or '').split()).casefold()
+    clave = f'{fecha.isoformat()}|{monto:.2f}|{tipo}|{descripcion}'
+    return hashlib.blake2b(clave.encode(), digest_size=16).hexdigest()
+
+
 class Transaccion(models.Model):
     TIPO_CHOICES = [
         ('INGRESO', 'Ingreso'),
@@ -30,10 +41,55 @@ class Transaccion(models.Model):
     fecha_fin = models.DateField(null=True, blank=True)
     fecha_inicio = models.DateField(default=now)  # La fecha actual se asignará automáticamente
     serie_recurrente = models.ForeignKey('SerieRecurrente', on_delete=models.CASCADE, null=True, blank=True)
+    # calcular_huella de la fila; se asigna al guardar (quien use bulk_create debe asignarla)
+    huella = models.CharField(max_length=32, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Totales y gráficos por tipo en un rango de fechas (dashboard, exportaciones)
+            # y paginación por cursor de la lista ordenada por -tipo (recorrido hacia atrás)
+            models.Index(fields=['usuario', 'tipo', 'fecha', 'id'], name='trans_usuario_tipo_fecha_id'),
+            # Listados y rangos de fechas ordenados por fecha e id (lista de transacciones)
+            models.Index(fields=['usuario', 'fecha', 'id'], name='trans_usuario_fecha_id'),
+            # Paginación por cursor de la lista ordenada por monto, descripción o tipo. Un índice
+            # sirve para un orden y su inverso solo si las direcciones de todas sus columnas
+            # coinciden: las columnas que desempatan (-fecha, -id) van en la misma dirección
+            models.Index(fields=['usuario', 'monto', 'fecha', 'id'], name='trans_usuario_monto_id'),
+            models.Index(fields=['usuario', 'descripcion', '-fecha', '-id'], name='trans_usuario_desc_fecha'),
+            models.Index(fields=['usuario', '-descripcion', '-fecha', '-id'], name='trans_usuario_desc_desc'),
+            models.Index(fields=['usuario', 'tipo', '-fecha', '-id'], name='trans_usuario_tipo_desc'),
+            # Filtro por categoría de la lista de transacciones
+            models.Index(fields=['usuario', 'categoria', 'fecha'], name='trans_usuario_cat_fecha'),
+            # Fechas ya generadas de cada serie recurrente
+            models.Index(fields=['serie_recurrente', 'fecha'], name='trans_serie_fecha'),
+            # Búsqueda del balance inicial de cada usuario
+            models.Index(
+                fields=['usuario'],
+                condition=models.Q(descripcion='Balance Inicial'),
+                name='trans_balance_inicial'
+            ),
+            # Búsqueda de filas ya registradas al importar un archivo (finanzas/importaciones.py)
+            models.Index(
+                fields=['usuario', 'huella'],
+                condition=models.Q(huella__isnull=False),
+                name='trans_usuario_huella'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.descripcion} - {self.tipo} - ${self.monto}"
 
+    def calcular_huella(self):
+        # Las vistas a veces asignan un datetime o un float antes de guardar
+        fecha = self._meta.get_field('fecha').to_python(self.fecha)
+        monto = self._meta.get_field('monto').to_python(self.monto)
+        return calcular_huella(fecha, monto, self.tipo, self.descripcion)
+
+    def save(self, *args, **kwargs):
+        if self.fecha is not None and self.monto is not None:
+            self.huella = self.calcular_huella()
+        super().save(*args, **kwargs)
+
     def clean(self):
         if self.es_recurrente and not self.fecha_inicio:
             self.fecha_inicio = now()
@@ -50,77 +106,36 @@ class SerieRecurrente(models.Model):
     activa = models.BooleanField(default=True)
     ultima_generada = models.DateField(null=True, blank=True)  # NUEVO
 
+    # Plantilla de las transacciones de la serie (copiada de la transacción base)
+    descripcion = models.CharField(max_length=255, blank=True, default='')
+    monto = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    tipo = models.CharField(max_length=10, choices=Transaccion.TIPO_CHOICES, blank=True, default='')
+    categoria = models.CharField(max_length=100, blank=True, null=True)
+    periodicidad = models.CharField(max_length=10, choices=Transaccion.PERIODICIDAD_CHOICES, null=True, blank=True)
+    fecha_inicio = models.DateField(null=True, blank=True)
+    fecha_fin = models.DateField(null=True, blank=True)
+    # Próxima ocurrencia aún no generada (None si la serie terminó o está inactiva).
+    # Se mantiene con finanzas.recurrentes.programar
+    proxima_fecha = models.DateField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Series de un usuario con ocurrencia en una fecha o rango (dashboard, lista)
+            models.Index(
+                fields=['usuario', 'proxima_fecha'],
+                condition=models.Q(activa=True),
+                name='serie_usuario_proxima'
+            ),
+            # Series con ocurrencias pendientes de todos los usuarios (generar_recurrentes)
+            models.Index(
+                fields=['proxima_fecha'],
+                condition=models.Q(activa=True),
+                name='serie_proxima'
+            ),
+        ]
+
     def __str__(self):
         return f"Serie recurrente #{self.id}"
-    
-    def generar_transacciones_programadas(self, transaccion_base, periodo_meses=12):
-        """
-        Genera transacciones programadas basadas en la periodicidad seleccionada.
-        Por defecto, genera transacciones para los próximos 12 meses.
-        """
-        # Asegurarse de que sea una transacción recurrente
-        if not transaccion_base.es_recurrente:
-            return
-        
-        # Determinar la fecha límite (hasta cuándo generar transacciones)
-        if transaccion_base.fecha_fin:
-            fecha_limite = transaccion_base.fecha_fin
-        else:
-            # Si no hay fecha de fin, generar para el periodo especificado
-            fecha_limite = transaccion_base.fecha_inicio + relativedelta(months=periodo_meses)
-    
-        # Configurar el incremento según la periodicidad
-        incrementos = {
-            'diario': relativedelta(days=1),
-            'semanal': relativedelta(weeks=1),
-            'quincenal': relativedelta(weeks=2),
-            'mensual': relativedelta(months=1),
-            'semestral': relativedelta(months=6),
-            'anual': relativedelta(years=1),
-        }
-        
-        incremento = incrementos.get(transaccion_base.periodicidad)
-        if not incremento:
-            return
-        
-        # Empezar desde la fecha de inicio + el primer incremento
-        fecha_actual = transaccion_base.fecha_inicio + incremento
-        
-        # Limitar el número de transacciones diarias para evitar crear demasiadas
-        max_transacciones = 90 if transaccion_base.periodicidad == 'diario' else 1000
-        contador = 0
-        
-        # Mantener un registro de las fechas ya procesadas para evitar duplicados
-        fechas_procesadas = {transaccion_base.fecha}
-        
-        # Generar transacciones hasta la fecha límite
-        while fecha_actual <= fecha_limite and contador < max_transacciones:
-            # Verificar si ya existe una transacción para esta fecha
-            if fecha_actual in fechas_procesadas:
-                fecha_actual += incremento
-                continue
-            
-            # Registrar la fecha como procesada
-            fechas_procesadas.add(fecha_actual)
-            
-            # Crear nueva transacción con los mismos datos pero fecha diferente
-            nueva_transaccion = Transaccion.objects.create(
-                usuario=transaccion_base.usuario,
-                descripcion=transaccion_base.descripcion,
-                monto=transaccion_base.monto,
-                tipo=transaccion_base.tipo,
-                fecha=fecha_actual,
-                categoria=transaccion_base.categoria,
-                es_recurrente=True,
-                periodicidad=transaccion_base.periodicidad,
-                fecha_inicio=transaccion_base.fecha_inicio,
-                fecha_fin=transaccion_base.fecha_fin,
-                serie_recurrente=self
-            )
-            
-            # Avanzar a la siguiente fecha según la periodicidad
-            fecha_actual += incremento
-            contador += 1
 
 class ObjetivoAhorro(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
@@ -149,3 +164,147 @@ class Presupuesto(models.Model):
 
     def __str__(self):
         return f"Presupuesto: ${self.monto}"
+
+class AcumuladoMensual(models.Model):
+    """
+    Totales mensuales por usuario, tipo y categoría.
+    Se mantiene de forma incremental al crear o eliminar transacciones (ver finanzas/acumulados.py)
+    para que el dashboard no tenga que recorrer todo el historial del usuario.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    anio = models.PositiveSmallIntegerField()
+    mes = models.PositiveSmallIntegerField()
+    tipo = models.CharField(max_length=10, choices=Transaccion.TIPO_CHOICES)
+    categoria = models.CharField(max_length=100, blank=True, default='')  # '' representa "Sin categoría"
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'anio', 'mes', 'tipo', 'categoria'],
+                name='acumulado_mensual_unico'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario} {self.anio}-{self.mes:02d} {self.tipo} {self.categoria}: ${self.total}"
+
+class SaldoCuenta(models.Model):
+    """
+    Saldo actual de cada usuario (ingresos menos gastos de todas sus transacciones).
+    Se mantiene junto con los acumulados al crear o eliminar transacciones (ver
+    finanzas/saldos.py); la fila también sirve de candado para serializar esos cambios.
+    """
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    saldo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.usuario}: ${self.saldo}"
+
+class SaldoDiario(models.Model):
+    """
+    Saldo de un usuario al cierre de cada día con movimientos. El saldo a una fecha es el de
+    la última fila con ``fecha`` menor o igual (una lectura por el índice único).
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    fecha = models.DateField()
+    saldo = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'fecha'], name='saldo_diario_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario} {self.fecha}: ${self.saldo}"
+
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida de correos. Las vistas solo encolan (ver finanzas/correos.py) y el
+    comando ``procesar_correos`` los envía por lotes reutilizando una conexión SMTP.
+    """
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('ENVIADO', 'Enviado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    asunto = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    remitente = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    adjunto_nombre = models.CharField(max_length=255, blank=True, default='')
+    adjunto_contenido = models.BinaryField(null=True, blank=True)
+    adjunto_tipo = models.CharField(max_length=100, blank=True, default='')
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='PENDIENTE')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default='')
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # El worker busca los pendientes cuyo próximo intento ya venció
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_proximo'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)} ({self.estado})"
+
+class Tarea(models.Model):
+    """
+    Trabajo en segundo plano (p. ej. generar y enviar el Excel del mes). Las vistas lo encolan
+    y el comando ``procesar_tareas`` lo ejecuta (ver finanzas/tareas.py). Solo puede haber una
+    tarea activa por usuario, tipo y mes: las solicitudes repetidas reutilizan la existente.
+    """
+    TIPO_CHOICES = [
+        ('ENVIAR_TRANSACCIONES_MES', 'Enviar transacciones del mes'),
+    ]
+    ESTADO_CHOICES = [
+        ('EN_COLA', 'En cola'),
+        ('EJECUTANDO', 'Ejecutando'),
+        ('TERMINADA', 'Terminada'),
+        ('FALLIDA', 'Fallida'),
+    ]
+    ESTADOS_ACTIVOS = ('EN_COLA', 'EJECUTANDO')
+
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    anio = models.PositiveSmallIntegerField()
+    mes = models.PositiveSmallIntegerField()
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='EN_COLA')
+    error = models.TextField(blank=True, default='')
+    fecha_creacion = models.DateTimeField(default=timezone.now)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'tipo', 'anio', 'mes'],
+                condition=models.Q(estado__in=['EN_COLA', 'EJECUTANDO']),
+                name='tarea_activa_unica'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion'], name='tarea_estado_creacion'),
+        ]
+
+    @property
+    def segundos_en_cola(self):
+        fin = self.fecha_inicio or timezone.now()
+        return (fin - self.fecha_creacion).total_seconds()
+
+    @property
+    def segundos_ejecucion(self):
+        if self.fecha_inicio is None:
+            return None
+        fin = self.fecha_fin or timezone.now()
+        return (fin - self.fecha_inicio).total_seconds()
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.anio}-{self.mes:02d} ({self.usuario}): {self.estado}"
@@ -0,0 +1,121 @@
+"""
+Correos de notificación al usuario (objetivos de ahorro, preferencias y privacidad).
+
+Cada función arma el texto y lo deja en la bandeja de salida (finanzas/correos.py);
+las vistas solo deciden cuándo corresponde enviarlo según las preferencias de la sesión.
+"""
+from django.conf import settings
+
+from .correos import encolar_correo
+
+
+def _saludo(usuario):
+    return f"Hola {usuario.first_name or usuario.username},\n\n"
+
+
+def _monto(valor):
+    return f"${int(valor):,}".replace(',', '.')
+
+
+def _enviar(usuario, asunto, mensaje):
+    return encolar_correo(asunto, mensaje, settings.DEFAULT_FROM_EMAIL, [usuario.email], usuario=usuario)
+
+
+def objetivo_por_vencer(usuario, objetivo):
+    return _enviar(
+        usuario,
+        'Tu Objetivo de Ahorro está por Vencer',
+        _saludo(usuario)
+        + f"¡Atención! Tu objetivo '{objetivo.nombre}' está a punto de vencer el {objetivo.fecha_limite.strftime('%d/%m/%Y')}.\n\n"
+        "Asegúrate de hacer tus últimos aportes para alcanzar tu meta.\n\n"
+        "El equipo de EcoFinance",
+    )
+
+
+def objetivo_creado(usuario, objetivo):
+    return _enviar(
+        usuario,
+        'Has Creado un Nuevo Objetivo de Ahorro',
+        _saludo(usuario)
+        + f"Has creado un nuevo objetivo: '{objetivo.nombre}'.\n"
+        f"Tu meta es alcanzar {_monto(objetivo.monto_objetivo)} antes del {objetivo.fecha_limite.strftime('%d/%m/%Y')}.\n\n"
+        "¡Mucha suerte! Estamos aquí para ayudarte a lograrlo.\n\n"
+        "El equipo de EcoFinance",
+    )
+
+
+def aporte_objetivo(usuario, objetivo, monto):
+    return _enviar(
+        usuario,
+        'Aporte a tu Objetivo de Ahorro',
+        _saludo(usuario) + f"Has añadido {_monto(monto)} a tu objetivo '{objetivo.nombre}'.\n¡Sigue así!",
+    )
+
+
+def objetivo_cumplido(usuario, objetivo):
+    return _enviar(
+        usuario,
+        '¡Has Cumplido tu Objetivo!',
+        _saludo(usuario)
+        + f"¡EXTRAORDINARIO! Has alcanzado el 100% de tu objetivo de ahorro '{objetivo.nombre}'.\n"
+        f"Has logrado tu meta de {_monto(objetivo.monto_objetivo)}. ¡Estamos muy orgullosos de ti!\n\n"
+        "El equipo de EcoFinance",
+    )
+
+
+def objetivo_casi_cumplido(usuario, objetivo, porcentaje):
+    return _enviar(
+        usuario,
+        '¡Casi cumples tu objetivo!',
+        _saludo(usuario)
+        + f"¡Felicidades! Estás a punto de alcanzar tu objetivo '{objetivo.nombre}'.\n"
+        f"Has completado más del {porcentaje:.0f}% de tu meta. ¡Ya casi lo tienes!",
+    )
+
+
+def plazo_objetivo(usuario, objetivo, dias_restantes):
+    return _enviar(
+        usuario,
+        '¡Tu Objetivo Está por Vencer!',
+        _saludo(usuario)
+        + f"¡Atención! A tu objetivo '{objetivo.nombre}' le quedan solo {dias_restantes} día(s) para su fecha límite.\n\n"
+        "¡No te rindas, estás muy cerca de lograrlo!\n\n"
+        "El equipo de EcoFinance",
+    )
+
+
+def objetivo_eliminado(usuario, nombre_objetivo):
+    return _enviar(
+        usuario,
+        'Has Eliminado un Objetivo de Ahorro',
+        _saludo(usuario)
+        + f"Has eliminado tu objetivo de ahorro: '{nombre_objetivo}'.\n\n"
+        "Si esto fue un error, puedes crear uno nuevo cuando quieras.\n\n"
+        "El equipo de EcoFinance",
+    )
+
+
+def cambio_notificaciones(usuario, activadas):
+    if activadas:
+        return _enviar(
+            usuario,
+            'Notificaciones Activadas',
+            _saludo(usuario) + "Has activado las notificaciones por correo electrónico en EcoFinance.",
+        )
+    return _enviar(
+        usuario,
+        'Notificaciones Desactivadas',
+        _saludo(usuario) + "Has desactivado las notificaciones por correo electrónico en EcoFinance.",
+    )
+
+
+def cambio_privacidad(usuario, compartir_datos, perfil_publico):
+    return _enviar(
+        usuario,
+        'Actualización de tu Configuración de Privacidad',
+        _saludo(usuario)
+        + "Tu configuración de privacidad en EcoFinance ha sido actualizada.\n\n"
+        f" - Compartir datos anónimos: {'Activado' if compartir_datos else 'Desactivado'}\n"
+        f" - Perfil público: {'Activado' if perfil_publico else 'Desactivado'}\n\n"
+        "El equipo de EcoFinance",
+    )
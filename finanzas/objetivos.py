@@ -0,0 +1,49 @@
+"""
+Movimientos de dinero de los objetivos de ahorro.
+
+Cada aporte se registra además como un gasto "Aporte al objetivo: <nombre>", de modo que
+al eliminar esa transacción el monto vuelve a descontarse del objetivo.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .acumulados import registrar_altas
+from .models import ObjetivoAhorro, Transaccion
+
+PREFIJO_APORTE = "Aporte al objetivo:"
+
+
+def aportar(objetivo, monto):
+    """
+    Suma ``monto`` al objetivo y crea la transacción de gasto que lo respalda.
+    Devuelve la transacción creada.
+    """
+    with transaction.atomic():
+        aporte = Transaccion.objects.create(
+            usuario=objetivo.usuario,
+            descripcion=f"{PREFIJO_APORTE} {objetivo.nombre}",
+            monto=monto,
+            tipo="GASTO",
+            categoria="Ahorro",
+            fecha=timezone.now()
+        )
+        registrar_altas([aporte])
+
+        objetivo.monto_actual += monto
+        objetivo.save()
+    return aporte
+
+
+def revertir_aporte(transaccion):
+    """
+    Si la transacción es un aporte, resta su monto del objetivo correspondiente
+    (sin dejarlo negativo). Devuelve el objetivo afectado o None.
+    """
+    if not transaccion.descripcion.startswith(PREFIJO_APORTE):
+        return None
+    nombre_objetivo = transaccion.descripcion[len(PREFIJO_APORTE):].strip()
+    objetivo = ObjetivoAhorro.objects.filter(usuario_id=transaccion.usuario_id, nombre=nombre_objetivo).first()
+    if objetivo:
+        objetivo.monto_actual = max(objetivo.monto_actual - transaccion.monto, 0)
+        objetivo.save()
+    return objetivo
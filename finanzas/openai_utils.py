@@ -1,41 +1,117 @@
-from openai import OpenAI
+import asyncio
+import weakref
+from types import SimpleNamespace
+
 from django.conf import settings
 
-client = OpenAI(
-    api_key=settings.OPENAI_API_KEY,
-    base_url="https://openrouter.ai/api/v1"
-)
+from .instrumentacion import medir
+
+# El SDK de OpenAI (y httpx) se importa recién al crear el primer cliente real.
+_cliente = None  # Cliente fijado con usar_cliente (p. ej. uno falso en las pruebas)
+_clientes_por_loop = weakref.WeakKeyDictionary()
+
+
+class ClienteFalso:
+    """
+    Cliente local con la misma forma que ``AsyncOpenAI`` (``chat.completions.create``).
+    Devuelve una respuesta fija sin salir a la red; sirve para pruebas y desarrollo sin API key.
+    """
+    def __init__(self, respuesta="- Revisa tus gastos más grandes del mes.", demora=0):
+        self.respuesta = respuesta
+        self.demora = demora
+        self.llamadas = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._crear))
+
+    async def _crear(self, model, messages, **kwargs):
+        self.llamadas.append(messages)
+        if self.demora:
+            await asyncio.sleep(self.demora)
+        mensaje = SimpleNamespace(content=self.respuesta)
+        return SimpleNamespace(choices=[SimpleNamespace(message=mensaje)])
+
+
+def _crear_cliente():
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    import httpx
 
-def obtener_recomendaciones(transacciones):
+    # Un pool de conexiones por cliente: las llamadas siguientes reutilizan la conexión
+    # HTTPS (keep-alive) en lugar de repetir el handshake TLS
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONEXIONES,
+            max_keepalive_connections=settings.OPENAI_MAX_CONEXIONES,
+        ),
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.OPENAI_TIMEOUT,
+        max_retries=0,  # El servicio de recomendaciones ya acota el tiempo total
+        http_client=http_client,
+    )
+
+
+def obtener_cliente():
     """
-    Envía las transacciones a OpenAI y obtiene recomendaciones.
+    Devuelve el cliente de la API, creándolo la primera vez que se usa.
+    Con ``OPENAI_CLIENTE = 'falso'`` en la configuración se usa ``ClienteFalso``.
+
+    El cliente real se guarda por event loop: las conexiones de httpx pertenecen al loop que
+    las abrió. Bajo ASGI hay un solo loop por proceso y el pool se reutiliza entre peticiones;
+    bajo WSGI cada petición asíncrona corre en un loop nuevo y recibe su propio cliente.
     """
-    # Formatear las transacciones como texto para enviar a la IA
-    transacciones_texto = "\n".join([
-        f"{t['fecha']} - {t['descripcion']} - {t['categoria']} - {t['tipo']} - ${t['monto']}"
-        for t in transacciones
-    ])
+    global _cliente
+    if _cliente is not None:
+        return _cliente
+    if settings.OPENAI_CLIENTE == 'falso':
+        _cliente = ClienteFalso()
+        return _cliente
 
-    prompt = f"""
-    Estas son las transacciones del mes:
-    {transacciones_texto}
+    loop = asyncio.get_running_loop()
+    cliente = _clientes_por_loop.get(loop)
+    if cliente is None:
+        cliente = _clientes_por_loop[loop] = _crear_cliente()
+    return cliente
 
-    Por favor, analiza estas transacciones y proporciona recomendaciones para mejorar las finanzas personales. 
+
+def usar_cliente(cliente):
+    """
+    Reemplaza el cliente (p. ej. por un ``ClienteFalso`` en las pruebas). Con None se vuelve
+    a usar el cliente real.
+    """
+    global _cliente
+    _cliente = cliente
+
+
+def construir_prompt(sintesis):
+    """
+    Arma el mensaje que se envía al modelo a partir de la síntesis del mes
+    (ver finanzas/sintesis.py).
+    """
+    return f"""
+    Este es un resumen de las transacciones del mes:
+    {sintesis}
+
+    Por favor, analiza este resumen y proporciona recomendaciones para mejorar las finanzas personales.
     Considera que este mensaje esta saliendo en la app de finanzas personales EcoFinance, por lo que las recomendaciones deben ser claras y concisas.
-    Los GASTOS marcados como Aporte al objetivo son aportes a un objetivo de ahorro, por lo que no deben ser considerados como gastos en el analisis.
+    Los aportes a objetivos de ahorro ya están separados de los gastos, por lo que no deben ser considerados como gastos en el analisis.
     """
 
-    try:
-        response = client.chat.completions.create(
-            model="deepseek/deepseek-r1:free",
+
+async def obtener_recomendaciones(sintesis):
+    """
+    Envía la síntesis del mes al modelo y devuelve el texto de las recomendaciones.
+    Los errores de la API se propagan para que quien llama decida qué mostrar (y no los guarde en caché).
+    """
+    with medir('llm'):
+        response = await obtener_cliente().chat.completions.create(
+            model=settings.OPENAI_MODELO,
             messages=[
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": construir_prompt(sintesis)
                 }
             ]
         )
-        # Extraer el contenido del mensaje de la respuesta
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Error al obtener recomendaciones: {str(e)}"
\ No newline at end of file
+    # Extraer el contenido del mensaje de la respuesta
+    return response.choices[0].message.content.strip()
@@ -0,0 +1,133 @@
+"""
+Paginación por cursor (keyset) para listados largos.
+
+En lugar de ``OFFSET`` + ``COUNT(*)``, cada página pide las filas que siguen (o preceden)
+a la última fila vista según las columnas del orden. Con un índice que empiece por esas
+columnas, cada página es un recorrido acotado del índice, sin importar qué tan lejos esté.
+
+Los cursores son opacos: se firman con ``django.core.signing`` y llevan el orden para el
+que se generaron, así que un cursor manipulado o de otro orden vuelve a la primera página.
+"""
+from dataclasses import dataclass, field
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+SAL = 'finanzas.paginacion'
+
+
+@dataclass
+class PaginaCursor:
+    elementos: list
+    siguiente: str = None  # cursor de la página siguiente (None si es la última)
+    anterior: str = None  # cursor de la página anterior (None si es la primera)
+    total_aproximado: int = None
+    es_cursor: bool = field(default=True, init=False)  # para distinguirla de una página de Paginator
+
+    def __iter__(self):
+        return iter(self.elementos)
+
+    def __len__(self):
+        return len(self.elementos)
+
+    @property
+    def has_other_pages(self):
+        return bool(self.siguiente or self.anterior)
+
+
+def _campos(ordenes):
+    # ['-fecha', '-id'] -> [('fecha', True), ('id', True)]; el último campo debe ser único
+    return [(orden.lstrip('-'), orden.startswith('-')) for orden in ordenes]
+
+
+def codificar_cursor(ordenes, direccion, valores):
+    return signing.dumps(
+        {'o': ','.join(ordenes), 'd': direccion, 'v': [str(valor) for valor in valores]},
+        salt=SAL, compress=True,
+    )
+
+
+def decodificar_cursor(cursor, ordenes, modelo):
+    """
+    Devuelve (direccion, valores) o None si el cursor no es válido para este orden.
+    """
+    try:
+        datos = signing.loads(cursor, salt=SAL)
+        if datos['o'] != ','.join(ordenes) or datos['d'] not in ('sig', 'ant'):
+            return None
+        campos = _campos(ordenes)
+        if len(datos['v']) != len(campos):
+            return None
+        valores = [modelo._meta.get_field(nombre).to_python(valor) for (nombre, _), valor in zip(campos, datos['v'])]
+    except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+        return None
+    return datos['d'], valores
+
+
+def _despues_de(campos, valores, invertir=False):
+    """
+    Condición "fila posterior a ``valores``" para el orden ``campos``:
+    (a > x) OR (a = x AND b > y) OR ... respetando la dirección de cada columna.
+    Se agrega además la cota de la primera columna (a >= x) para que la consulta use
+    el índice como un rango.
+    """
+    condicion = Q()
+    iguales = Q()
+    for (nombre, descendente), valor in zip(campos, valores):
+        mayor = descendente == invertir
+        condicion |= iguales & Q(**{f"{nombre}__{'gt' if mayor else 'lt'}": valor})
+        iguales &= Q(**{nombre: valor})
+    nombre, descendente = campos[0]
+    cota = Q(**{f"{nombre}__{'gte' if descendente == invertir else 'lte'}": valores[0]})
+    return cota & condicion
+
+
+def filtrar_despues_de(queryset, ordenes, valores):
+    """
+    Filas de ``queryset`` que van después de la fila con ``valores`` en el orden ``ordenes``.
+    """
+    # La condición del cursor va primero en el WHERE: si el queryset ya acota la misma
+    # columna (p. ej. fecha <= hoy), SQLite usa la primera cota que encuentra para el rango
+    # del índice; PostgreSQL combina ambas y se queda con la más estricta
+    return queryset.model._default_manager.filter(_despues_de(_campos(ordenes), valores)) & queryset
+
+
+def paginar_por_cursor(queryset, ordenes, cursor=None, por_pagina=10, contar=None):
+    """
+    Devuelve la ``PaginaCursor`` de ``queryset`` ordenado por ``ordenes`` (el último campo
+    debe ser único, p. ej. ``id``, y ninguno puede ser nulo) a partir de ``cursor``.
+    ``contar`` es opcional: una función que devuelve el total aproximado de filas.
+    """
+    campos = _campos(ordenes)
+    decodificado = decodificar_cursor(cursor, ordenes, queryset.model) if cursor else None
+    direccion, valores = decodificado or (None, None)
+
+    if direccion == 'ant':
+        # Hacia atrás se recorre el orden invertido y luego se da vuelta la página
+        invertidos = [nombre if descendente else f'-{nombre}' for nombre, descendente in campos]
+        anteriores = queryset.model._default_manager.filter(_despues_de(campos, valores, invertir=True)) & queryset
+        filas = list(anteriores.order_by(*invertidos)[:por_pagina + 1])
+        hay_mas = len(filas) > por_pagina
+        filas = filas[:por_pagina][::-1]
+        hay_anterior, hay_siguiente = hay_mas, True
+    else:
+        siguientes = filtrar_despues_de(queryset, ordenes, valores) if direccion == 'sig' else queryset
+        filas = list(siguientes.order_by(*ordenes)[:por_pagina + 1])
+        hay_siguiente = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        hay_anterior = direccion == 'sig'
+
+    if direccion and not filas:
+        # Las filas del cursor ya no existen (p. ej. se eliminaron): se vuelve al inicio
+        return paginar_por_cursor(queryset, ordenes, por_pagina=por_pagina, contar=contar)
+
+    def clave(fila):
+        return [getattr(fila, nombre) for nombre, _ in campos]
+
+    return PaginaCursor(
+        elementos=filas,
+        siguiente=codificar_cursor(ordenes, 'sig', clave(filas[-1])) if filas and hay_siguiente else None,
+        anterior=codificar_cursor(ordenes, 'ant', clave(filas[0])) if filas and hay_anterior else None,
+        total_aproximado=contar() if contar else None,
+    )
@@ -0,0 +1,74 @@
+"""
+Movimientos registrados y ocurrencias virtuales de las series recurrentes en un mismo flujo.
+
+Las ocurrencias de una serie a partir de su ``proxima_fecha`` no existen como filas de
+Transaccion: se calculan con su regla al leer. ``movimientos`` las mezcla con las filas
+registradas en orden de fecha usando ``heapq.merge`` sobre generadores, así que solo se
+materializa lo que el consumidor llega a pedir (p. ej. las 10 primeras con ``islice``).
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from .models import SerieRecurrente, Transaccion
+from .reglas import regla_de_serie
+
+
+@dataclass(frozen=True)
+class OcurrenciaVirtual:
+    serie_id: int
+    fecha: date
+    descripcion: str
+    monto: Decimal
+    tipo: str
+    categoria: str = None
+    es_recurrente = True
+    es_virtual = True
+
+    @property
+    def id(self):
+        # Identificador estable para las plantillas (no es una clave de Transaccion)
+        return f'rec_{self.serie_id}_{self.fecha:%Y%m%d}'
+
+
+def ocurrencias_virtuales(serie, desde, hasta, descendente=False):
+    """
+    Genera las ocurrencias aún no registradas de ``serie`` entre ``desde`` y ``hasta``.
+    """
+    if not serie.activa or not serie.proxima_fecha:
+        return
+    for fecha in regla_de_serie(serie).iterar(max(desde, serie.proxima_fecha), hasta, descendente):
+        yield OcurrenciaVirtual(
+            serie_id=serie.id,
+            fecha=fecha,
+            descripcion=serie.descripcion,
+            monto=serie.monto,
+            tipo=serie.tipo,
+            categoria=serie.categoria,
+        )
+
+
+def _clave(movimiento):
+    # Mismo día: las filas registradas por id y después las ocurrencias virtuales por serie
+    if isinstance(movimiento, OcurrenciaVirtual):
+        return movimiento.fecha, 1, movimiento.serie_id
+    return movimiento.fecha, 0, movimiento.id
+
+
+def movimientos(usuario, desde, hasta, descendente=False, tamanio_lote=200):
+    """
+    Flujo perezoso y ordenado por fecha de las transacciones de ``usuario`` entre ``desde``
+    y ``hasta`` (ambas incluidas) junto con las ocurrencias virtuales de sus series activas.
+    Las filas registradas se leen por lotes de ``tamanio_lote``.
+    """
+    orden = ['-fecha', '-id'] if descendente else ['fecha', 'id']
+    registradas = (
+        Transaccion.objects.filter(usuario=usuario, fecha__gte=desde, fecha__lte=hasta)
+        .order_by(*orden)
+        .iterator(chunk_size=tamanio_lote)
+    )
+    # Solo las series con ocurrencias pendientes dentro de la ventana (índice serie_usuario_proxima)
+    series = SerieRecurrente.objects.filter(usuario=usuario, activa=True, proxima_fecha__lte=hasta)
+    virtuales = [ocurrencias_virtuales(serie, desde, hasta, descendente) for serie in series]
+    return heapq.merge(registradas, *virtuales, key=_clave, reverse=descendente)
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .openai_utils import construir_prompt, obtener_recomendaciones
+from .sintesis import calcular_sintesis, estimar_tokens, redactar_sintesis
+
+logger = logging.getLogger(__name__)
+
+# Cambiar esta versión invalida la caché cuando cambia el formato de lo que se envía al modelo
+VERSION_PROMPT = 2
+
+
+class RecomendacionNoDisponible(Exception):
+    """
+    No se pudo obtener una recomendación. ``estado`` es el código HTTP sugerido.
+    """
+    def __init__(self, mensaje, estado):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def huella(texto):
+    """
+    Hash de lo que se enviaría al modelo: si la síntesis del mes no cambia, la recomendación tampoco.
+    """
+    contenido = f'v{VERSION_PROMPT}\x1f{settings.OPENAI_MODELO}\x1f{texto}'
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+async def _consumir_cupo(usuario_id):
+    # Ventana fija de una hora por usuario; solo cuentan las llamadas reales al modelo
+    clave = f'recomendaciones:cupo:{usuario_id}'
+    await cache.aadd(clave, 0, 3600)
+    try:
+        usadas = await cache.aincr(clave)
+    except ValueError:
+        # La clave expiró entre add e incr
+        await cache.aset(clave, 1, 3600)
+        usadas = 1
+    return usadas <= settings.RECOMENDACIONES_LIMITE_POR_HORA
+
+
+async def recomendar(usuario_id, anio, mes):
+    """
+    Devuelve (texto, desde_cache) con las recomendaciones del mes.
+
+    - Al modelo se envía una síntesis agregada del mes (finanzas/sintesis.py) acotada a
+      RECOMENDACIONES_PRESUPUESTO_TOKENS (prompt completo), no cada transacción.
+    - Se guardan en caché por usuario y hash de esa síntesis, así un mes sin cambios no se
+      vuelve a enviar al modelo.
+    - Cada usuario puede tener una sola consulta al modelo en curso y un número limitado
+      por hora (RECOMENDACIONES_LIMITE_POR_HORA).
+    - La llamada se corta a los OPENAI_TIMEOUT segundos.
+
+    Lanza ``RecomendacionNoDisponible`` si no se puede responder.
+    """
+    sintesis = await sync_to_async(calcular_sintesis)(usuario_id, anio, mes)
+    if not sintesis.tiene_transacciones:
+        return "No hay transacciones este mes para analizar.", False
+    # El presupuesto es para el prompt completo: se descuentan las instrucciones fijas
+    presupuesto = settings.RECOMENDACIONES_PRESUPUESTO_TOKENS - estimar_tokens(construir_prompt(""))
+    texto_sintesis = redactar_sintesis(sintesis, presupuesto)
+
+    clave = f'recomendaciones:{usuario_id}:{anio}-{mes:02d}:{huella(texto_sintesis)}'
+    texto = await cache.aget(clave)
+    if texto is not None:
+        return texto, True
+
+    # Un solo cálculo en curso por usuario; el candado expira solo si el proceso muere
+    candado = f'recomendaciones:en_curso:{usuario_id}'
+    if not await cache.aadd(candado, 1, settings.OPENAI_TIMEOUT + 5):
+        raise RecomendacionNoDisponible(
+            "Ya estamos generando tus recomendaciones, espera un momento.", 429
+        )
+    try:
+        if not await _consumir_cupo(usuario_id):
+            raise RecomendacionNoDisponible(
+                "Alcanzaste el límite de recomendaciones por hora. Inténtalo más tarde.", 429
+            )
+        try:
+            texto = await asyncio.wait_for(obtener_recomendaciones(texto_sintesis), settings.OPENAI_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise RecomendacionNoDisponible(
+                "El servicio de recomendaciones tardó demasiado en responder.", 504
+            )
+        except Exception:
+            # El detalle (del SDK o de la red) queda en el log, no se muestra al usuario
+            logger.exception('Error obteniendo recomendaciones del usuario %s', usuario_id)
+            raise RecomendacionNoDisponible(
+                "No pudimos obtener tus recomendaciones. Inténtalo más tarde.", 502
+            )
+        await cache.aset(clave, texto, settings.RECOMENDACIONES_CACHE_SEGUNDOS)
+        return texto, False
+    finally:
+        await cache.adelete(candado)
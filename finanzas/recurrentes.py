@@ -0,0 +1,138 @@
+from django.db import transaction
+
+from . import cache_dashboard
+from .acumulados import registrar_altas
+from .models import SerieRecurrente, Transaccion, calcular_huella
+from .reglas import Regla, regla_de_serie
+
+
+def calcular_proxima_fecha(periodicidad, fecha_inicio, fecha_fin, ultima_generada):
+    """
+    Primera ocurrencia de la serie que todavía no se generó: la fecha de inicio si no se
+    generó ninguna, o la del periodo siguiente a ``ultima_generada``. None si pasa de
+    ``fecha_fin`` o la periodicidad no es válida.
+
+    Es la única regla de calendario de las series: la usan el generador, el dashboard y la
+    lista de transacciones (a través de ``SerieRecurrente.proxima_fecha``).
+    """
+    regla = Regla((periodicidad or '').upper(), fecha_inicio, fecha_fin)
+    if not regla.valida:
+        return None
+    if not ultima_generada:
+        return None if fecha_fin and fecha_inicio > fecha_fin else fecha_inicio
+    return regla.siguiente(ultima_generada)
+
+
+def programar(serie):
+    """
+    Actualiza ``serie.proxima_fecha`` (sin guardar) según su plantilla y ``ultima_generada``.
+    """
+    if serie.activa:
+        serie.proxima_fecha = calcular_proxima_fecha(
+            serie.periodicidad, serie.fecha_inicio, serie.fecha_fin, serie.ultima_generada
+        )
+    else:
+        serie.proxima_fecha = None
+    return serie
+
+
+def crear_serie(transaccion):
+    """
+    Crea la serie de una transacción recurrente nueva tomando sus datos como plantilla.
+    La transacción cuenta como la primera ocurrencia si cae en la fecha de inicio.
+    """
+    fecha = Transaccion._meta.get_field('fecha').to_python(transaccion.fecha)
+    fecha_inicio = Transaccion._meta.get_field('fecha_inicio').to_python(transaccion.fecha_inicio)
+    serie = SerieRecurrente(
+        usuario=transaccion.usuario,
+        activa=True,
+        descripcion=transaccion.descripcion,
+        monto=transaccion.monto,
+        tipo=transaccion.tipo,
+        categoria=transaccion.categoria,
+        periodicidad=transaccion.periodicidad,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=transaccion.fecha_fin,
+        ultima_generada=fecha if fecha == fecha_inicio else None,
+    )
+    programar(serie).save()
+    return serie
+
+
+def fechas_pendientes(serie, hasta):
+    """
+    Devuelve las fechas de la serie desde su próxima fecha hasta ``hasta``,
+    sin pasar de la fecha de fin de la serie.
+    """
+    if not serie.proxima_fecha:
+        return []
+    return regla_de_serie(serie).expandir(serie.proxima_fecha, hasta)
+
+
+@transaction.atomic
+def generar_transacciones_recurrentes(usuario, hasta):
+    """
+    Crea las transacciones pendientes de todas las series activas del usuario hasta ``hasta``,
+    incluidas las atrasadas: cada serie parte de su próxima fecha sin generar.
+
+    Todas las fechas se calculan en memoria, las ya existentes se leen con una sola consulta
+    y las que faltan se insertan con ``bulk_create``. Las series se bloquean con
+    ``select_for_update`` durante la transacción, así que dos peticiones simultáneas no
+    pueden duplicar filas: la segunda espera y encuentra las fechas ya creadas.
+    Devuelve el número de transacciones creadas.
+    """
+    # Solo las series con una ocurrencia pendiente (índice serie_usuario_proxima)
+    series = list(
+        SerieRecurrente.objects
+        .select_for_update()
+        .filter(usuario=usuario, activa=True, proxima_fecha__lte=hasta)
+        .order_by('id')
+    )
+
+    # Fechas que tocan a cada serie, calculadas en memoria
+    pendientes = {}
+    for serie in series:
+        fechas = fechas_pendientes(serie, hasta)
+        if fechas:
+            pendientes[serie] = fechas
+    if not pendientes:
+        return 0
+
+    # Una sola consulta para saber qué fechas ya existen
+    existentes = set(
+        Transaccion.objects.filter(
+            serie_recurrente__in=[serie.id for serie in pendientes],
+            fecha__gte=min(fechas[0] for fechas in pendientes.values()),
+            fecha__lte=hasta
+        ).values_list('serie_recurrente_id', 'fecha')
+    )
+
+    nuevas = []
+    for serie, fechas in pendientes.items():
+        for fecha in fechas:
+            if (serie.id, fecha) in existentes:
+                continue
+            nuevas.append(Transaccion(
+                usuario_id=serie.usuario_id,
+                descripcion=serie.descripcion,
+                monto=serie.monto,
+                tipo=serie.tipo,
+                fecha=fecha,
+                categoria=serie.categoria,
+                es_recurrente=True,
+                periodicidad=serie.periodicidad,
+                fecha_inicio=serie.fecha_inicio,
+                fecha_fin=serie.fecha_fin,
+                serie_recurrente=serie,
+                huella=calcular_huella(fecha, serie.monto, serie.tipo, serie.descripcion),
+            ))
+        # La marca de agua avanza hasta la última fecha revisada, exista o no la fila
+        serie.ultima_generada = fechas[-1]
+        programar(serie)
+
+    Transaccion.objects.bulk_create(nuevas, batch_size=500)
+    registrar_altas(nuevas)
+    # bulk_create no envía post_save
+    cache_dashboard.invalidar(series[0].usuario_id)
+    SerieRecurrente.objects.bulk_update(list(pendientes), ['ultima_generada', 'proxima_fecha'])
+    return len(nuevas)
@@ -0,0 +1,133 @@
+"""
+Reglas de recurrencia: expansión de una serie (frecuencia, intervalo, inicio, fin) en fechas.
+
+Cada ocurrencia se calcula en forma cerrada a partir de la fecha de inicio (la n-ésima es
+``inicio + n * paso``), sin avanzar paso a paso desde la anterior. Así una serie mensual que
+empieza el 31 cae el 28/29 de febrero y vuelve al 31 en marzo, en lugar de quedarse en el 28
+para siempre como ocurre al sumar ``relativedelta(months=1)`` repetidamente; y el primer y el
+último índice de un rango se obtienen con aritmética, sin recorrer las fechas anteriores.
+"""
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+# Tamaño del paso de cada frecuencia, en días o en meses
+DIAS = {'DIARIA': 1, 'SEMANAL': 7}
+MESES = {'MENSUAL': 1, 'ANUAL': 12}
+
+
+def _meses(fecha):
+    return fecha.year * 12 + fecha.month - 1
+
+
+def sumar_meses(fecha, meses, fin_de_mes=False):
+    """
+    ``fecha`` más ``meses`` meses. Si el día no existe en el mes de destino se usa el último
+    día del mes; con ``fin_de_mes`` el resultado es siempre el último día del mes.
+    """
+    anio, mes = divmod(_meses(fecha) + meses, 12)
+    ultimo_dia = monthrange(anio, mes + 1)[1]
+    return date(anio, mes + 1, ultimo_dia if fin_de_mes else min(fecha.day, ultimo_dia))
+
+
+@dataclass(frozen=True)
+class Regla:
+    frecuencia: str  # una de Transaccion.PERIODICIDAD_CHOICES
+    inicio: date
+    fin: date = None
+    intervalo: int = 1  # p. ej. SEMANAL con intervalo 2 = quincenal
+    fin_de_mes: bool = False  # fijar las ocurrencias mensuales/anuales al último día del mes
+
+    @property
+    def valida(self):
+        return bool(self.inicio) and self.intervalo > 0 and (self.frecuencia in DIAS or self.frecuencia in MESES)
+
+    def ocurrencia(self, n):
+        """
+        Fecha de la ocurrencia ``n`` (la 0 es ``inicio``), sin tener en cuenta ``fin``.
+        """
+        if self.frecuencia in DIAS:
+            return self.inicio + timedelta(days=n * DIAS[self.frecuencia] * self.intervalo)
+        return sumar_meses(self.inicio, n * MESES[self.frecuencia] * self.intervalo, self.fin_de_mes)
+
+    def periodo(self, fecha):
+        """
+        Índice del periodo que contiene ``fecha``: el de la última ocurrencia que no es
+        posterior a ella en series diarias/semanales, o el del mes de ``fecha`` en las mensuales.
+        Sirve para retomar una serie cuyas fechas se generaron con otra regla de ajuste.
+        """
+        if self.frecuencia in DIAS:
+            return (fecha - self.inicio).days // (DIAS[self.frecuencia] * self.intervalo)
+        return (_meses(fecha) - _meses(self.inicio)) // (MESES[self.frecuencia] * self.intervalo)
+
+    def primer_indice(self, desde):
+        """
+        Índice de la primera ocurrencia igual o posterior a ``desde``.
+        """
+        if desde <= self.inicio:
+            return 0
+        n = self.periodo(desde)
+        return n if self.ocurrencia(n) >= desde else n + 1
+
+    def ultimo_indice(self, hasta):
+        """
+        Índice de la última ocurrencia igual o anterior a ``hasta`` y a ``fin`` (-1 si no hay).
+        """
+        if self.fin and self.fin < hasta:
+            hasta = self.fin
+        if hasta < self.inicio:
+            return -1
+        n = self.periodo(hasta)
+        return n if self.ocurrencia(n) <= hasta else n - 1
+
+    def siguiente(self, fecha):
+        """
+        Primera ocurrencia del periodo posterior al de ``fecha``, o None si pasa de ``fin``.
+        """
+        proxima = self.inicio if fecha < self.inicio else self.ocurrencia(self.periodo(fecha) + 1)
+        if self.fin and proxima > self.fin:
+            return None
+        return proxima
+
+    def expandir(self, desde, hasta):
+        """
+        Lista de ocurrencias entre ``desde`` y ``hasta`` (ambas incluidas) que no pasan de ``fin``.
+        """
+        if not self.valida:
+            return []
+        primero, ultimo = self.primer_indice(desde), self.ultimo_indice(hasta)
+        if self.frecuencia in DIAS:
+            paso = timedelta(days=DIAS[self.frecuencia] * self.intervalo)
+            return [self.inicio + paso * n for n in range(primero, ultimo + 1)]
+        return [self.ocurrencia(n) for n in range(primero, ultimo + 1)]
+
+    def iterar(self, desde, hasta, descendente=False):
+        """
+        Como ``expandir``, pero genera las fechas de a una (de la más reciente a la más
+        antigua con ``descendente``), sin armar la lista completa.
+        """
+        if not self.valida:
+            return
+        indices = range(self.primer_indice(desde), self.ultimo_indice(hasta) + 1)
+        for n in reversed(indices) if descendente else indices:
+            yield self.ocurrencia(n)
+
+
+def regla_de_serie(serie):
+    """
+    Regla de una ``SerieRecurrente`` (o de cualquier objeto con periodicidad, fecha_inicio y fecha_fin).
+    """
+    return Regla((serie.periodicidad or '').upper(), serie.fecha_inicio, serie.fecha_fin)
+
+
+def expandir_series(series, desde, hasta):
+    """
+    Devuelve {serie: [fechas]} con las ocurrencias de cada serie entre ``desde`` y ``hasta``,
+    omitiendo las series sin ocurrencias en el rango.
+    """
+    expandidas = {}
+    for serie in series:
+        fechas = regla_de_serie(serie).expandir(desde, hasta)
+        if fechas:
+            expandidas[serie] = fechas
+    return expandidas
@@ -0,0 +1,57 @@
+"""
+Respuestas que se envían por partes (exportaciones, progreso de la importación).
+
+Con WSGI, Django recorre el iterador de una StreamingHttpResponse mientras envía. Con ASGI,
+en cambio, un iterador síncrono se lee completo en memoria (``sync_to_async(list)``) antes de
+enviar el primer byte, y un archivo se lee entero igual. Por eso, cuando la petición llega
+por ASGI, las partes se piden de a una en un hilo y se entregan con un iterador asíncrono.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse
+
+# Bytes por lectura al enviar un archivo por ASGI (cada lectura es un salto a otro hilo)
+BLOQUE_ARCHIVO = 64 * 1024
+
+_FIN = object()
+
+
+async def _en_hilo(partes):
+    # thread_sensitive: todas las partes se generan en el hilo de la petición, el mismo donde
+    # corrió la vista, así que las consultas (y la transacción abierta de una importación)
+    # usan siempre la misma conexión
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            parte = await siguiente(partes, _FIN)
+            if parte is _FIN:
+                break
+            yield parte
+    finally:
+        # Si el cliente corta la conexión, el generador se cierra en su hilo (y una
+        # transacción abierta dentro de él se deshace)
+        cerrar = getattr(partes, 'close', None)
+        if cerrar is not None:
+            await sync_to_async(cerrar, thread_sensitive=True)()
+
+
+def partes_para(request, partes):
+    """
+    Devuelve ``partes`` (iterable síncrono) listo para una StreamingHttpResponse: tal cual
+    con WSGI y como iterador asíncrono con ASGI.
+    """
+    if isinstance(request, ASGIRequest):
+        return _en_hilo(iter(partes))
+    return partes
+
+
+def respuesta_archivo(request, archivo, **kwargs):
+    """
+    FileResponse de ``archivo`` (binario, posicionado al inicio) que con ASGI se envía por
+    bloques en vez de leerse entero. Los argumentos son los de FileResponse.
+    """
+    response = FileResponse(archivo, **kwargs)
+    if isinstance(request, ASGIRequest):
+        # Las cabeceras (Content-Length, Content-Disposition) ya quedaron calculadas
+        response.streaming_content = partes_para(request, iter(lambda: archivo.read(BLOQUE_ARCHIVO), b''))
+    return response
@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import AcumuladoMensual, Transaccion
+from .saldos import saldo_actual
+
+
+MESES_ESPANOL = {
+    1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril', 5: 'Mayo', 6: 'Junio',
+    7: 'Julio', 8: 'Agosto', 9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
+}
+
+
+def nombre_mes(fecha):
+    """
+    Devuelve el texto 'Mes Año' en español para una fecha (ej: 'Enero 2025').
+    """
+    return f"{MESES_ESPANOL[fecha.month]} {fecha.year}"
+
+
+def rango_mes(anio, mes):
+    """
+    Devuelve (primer día del mes, primer día del mes siguiente).
+    Filtrar con ``fecha__gte``/``fecha__lt`` sobre este rango permite usar los índices
+    por fecha, a diferencia de ``fecha__year``/``fecha__month``.
+    """
+    inicio = date(anio, mes, 1)
+    return inicio, inicio + relativedelta(months=1)
+
+
+@dataclass
+class TotalCategoria:
+    categoria: str
+    monto: Decimal
+
+
+@dataclass
+class ResumenMensual:
+    """
+    Cifras del dashboard para un usuario y un mes.
+
+    Se construye con ``calcular_resumen_mensual`` y no depende de la vista, por lo
+    que puede reutilizarse desde cualquier otro punto que necesite las mismas cifras.
+    """
+    anio: int
+    mes: int
+    ingresos: Decimal = Decimal('0')
+    gastos: Decimal = Decimal('0')
+    saldo_total: Decimal = Decimal('0')  # todas las transacciones del usuario (finanzas/saldos.py)
+    gastos_categorias: list = field(default_factory=list)
+    ingresos_categorias: list = field(default_factory=list)
+    gastos_dias: list = field(default_factory=list)  # [(fecha, total)] ordenado por día
+    gastos_meses: list = field(default_factory=list)  # [(primer día del mes, total)] últimos 3 meses
+    meses: list = field(default_factory=list)  # primer día de cada mes con transacciones
+
+    @property
+    def balance(self):
+        return self.ingresos - self.gastos
+
+    @property
+    def tiene_transacciones(self):
+        return bool(self.meses)
+
+
+def calcular_resumen_mensual(usuario, anio, mes, hoy=None):
+    """
+    Calcula todas las cifras del dashboard con dos consultas agrupadas y una lectura puntual:
+
+    1. Los acumulados mensuales del usuario agrupados por (mes, tipo), que cuestan
+       O(meses) en vez de O(transacciones). De aquí salen la lista de meses y la
+       serie de gastos de los últimos 3 meses (meses completos).
+    2. El mes seleccionado agrupado por (tipo, categoría, día).
+       De aquí salen los totales del mes, las categorías y los gastos diarios.
+
+    El saldo total se lee del saldo mantenido del usuario (SaldoCuenta).
+    """
+    hoy = hoy or timezone.now().date()
+    resumen = ResumenMensual(anio=anio, mes=mes, saldo_total=saldo_actual(usuario))
+
+    # --- Consulta 1: acumulados por mes ---
+    primer_mes_serie = (hoy - relativedelta(months=3)).replace(day=1)
+    inicio_mes_actual = hoy.replace(day=1)
+    por_mes = (
+        AcumuladoMensual.objects
+        .filter(usuario=usuario, cantidad__gt=0)
+        .values('anio', 'mes')
+        .annotate(
+            ingresos=Sum('total', filter=Q(tipo='INGRESO')),
+            gastos=Sum('total', filter=Q(tipo='GASTO')),
+        )
+        .order_by('anio', 'mes')
+    )
+
+    for fila in por_mes:
+        mes_fecha = date(fila['anio'], fila['mes'], 1)
+        resumen.meses.append(mes_fecha)
+        if fila['gastos'] is not None and primer_mes_serie <= mes_fecha <= inicio_mes_actual:
+            resumen.gastos_meses.append((mes_fecha, fila['gastos']))
+
+    if not resumen.meses:
+        return resumen
+
+    # --- Consulta 2: mes seleccionado por (tipo, categoría, día) ---
+    inicio_mes, fin_mes = rango_mes(anio, mes)
+    por_dia = (
+        Transaccion.objects
+        .filter(usuario=usuario, fecha__gte=inicio_mes, fecha__lt=fin_mes)
+        .values('tipo', 'categoria', 'fecha')
+        # El balance inicial no cuenta como ingreso del mes
+        .annotate(total=Sum('monto', filter=~Q(tipo='INGRESO', descripcion='Balance Inicial')))
+        .order_by('fecha')
+    )
+
+    categorias = {'INGRESO': {}, 'GASTO': {}}
+    gastos_dias = {}
+    for fila in por_dia:
+        total = fila['total']
+        if total is None:
+            continue
+        tipo = fila['tipo']
+        if tipo == 'INGRESO':
+            resumen.ingresos += total
+        elif tipo == 'GASTO':
+            resumen.gastos += total
+            if fila['fecha'] <= hoy:
+                gastos_dias[fila['fecha']] = gastos_dias.get(fila['fecha'], 0) + total
+        else:
+            continue
+        nombre = fila['categoria'] or 'Sin categoría'
+        categorias[tipo][nombre] = categorias[tipo].get(nombre, 0) + total
+
+    resumen.gastos_dias = sorted(gastos_dias.items())
+    resumen.gastos_categorias = [
+        TotalCategoria(categoria=nombre, monto=monto)
+        for nombre, monto in sorted(categorias['GASTO'].items(), key=lambda item: item[1], reverse=True)
+    ]
+    resumen.ingresos_categorias = [
+        TotalCategoria(categoria=nombre, monto=monto)
+        for nombre, monto in sorted(categorias['INGRESO'].items(), key=lambda item: item[1], reverse=True)
+    ]
+    return resumen
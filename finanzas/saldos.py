@@ -0,0 +1,248 @@
+"""
+Saldo por usuario mantenido de forma incremental: el actual (SaldoCuenta) y el del cierre de
+cada día con movimientos (SaldoDiario). Así el saldo total y el saldo a una fecha son una
+lectura puntual en vez de una suma sobre todo el historial.
+
+Los cambios llegan desde acumulados.registrar_altas / registrar_bajas, dentro de la misma
+transacción que inserta o elimina las filas. Antes de tocar los saldos diarios se actualiza
+(y con eso se bloquea) la fila SaldoCuenta del usuario: dos peticiones del mismo usuario se
+aplican una detrás de la otra y ninguna parte de un saldo leído antes del cambio de la otra.
+El comando ``conciliar_saldos`` los compara con las transacciones y corrige las diferencias.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from . import cache_dashboard
+from .models import SaldoCuenta, SaldoDiario, Transaccion
+
+CERO = Decimal('0')
+
+# Fechas por UPDATE de los saldos diarios (ver aplicar)
+FECHAS_POR_CONSULTA = 400
+
+
+def efecto(tipo, monto):
+    """
+    Cuánto mueve el saldo una transacción de ``tipo`` por ``monto``.
+    """
+    if tipo == 'INGRESO':
+        return monto
+    if tipo == 'GASTO':
+        return -monto
+    return CERO
+
+
+def _bloquear(usuario_id):
+    cuenta, _ = SaldoCuenta.objects.select_for_update().get_or_create(usuario_id=usuario_id)
+    return cuenta
+
+
+def _sumar_al_saldo(usuario_id, importe):
+    # El UPDATE deja la fila del usuario bloqueada hasta el commit, igual que select_for_update
+    # pero sin una consulta aparte para leerla
+    cuentas = SaldoCuenta.objects.filter(usuario_id=usuario_id)
+    cambios = {'saldo': F('saldo') + importe, 'actualizado': timezone.now()}
+    if cuentas.update(**cambios):
+        return
+    try:
+        # Savepoint propio: si otra petición creó la fila a la vez, se suma sobre la suya
+        with transaction.atomic():
+            SaldoCuenta.objects.create(usuario_id=usuario_id, saldo=importe)
+    except IntegrityError:
+        cuentas.update(**cambios)
+
+
+def _aplicar_diarios(usuario_id, importes):
+    fechas = sorted(importes)
+    diarios = SaldoDiario.objects.filter(usuario_id=usuario_id)
+    # Los días nuevos parten del saldo del último día anterior con movimientos. Un solo
+    # SELECT trae los días guardados entre la primera y la última fecha del lote más el
+    # anterior a todas: como mucho uno por día del rango, más uno...
+    limite = (fechas[-1] - fechas[0]).days + 2
+    guardados = list(
+        diarios.filter(fecha__lte=fechas[-1]).order_by('-fecha').values_list('fecha', 'saldo')[:limite]
+    )
+    guardados.reverse()
+    nuevos = []
+    saldo = CERO
+    indice = 0
+    for fecha in fechas:
+        existe = False
+        while indice < len(guardados) and guardados[indice][0] <= fecha:
+            existe = guardados[indice][0] == fecha
+            saldo = guardados[indice][1]
+            indice += 1
+        if not existe:
+            nuevos.append(SaldoDiario(usuario_id=usuario_id, fecha=fecha, saldo=saldo))
+    SaldoDiario.objects.bulk_create(nuevos)
+    # ...y todos los días desde cada fecha suman lo acumulado hasta ella, en un solo UPDATE
+    casos = []
+    acumulado = CERO
+    for fecha in fechas:
+        acumulado += importes[fecha]
+        casos.append(When(fecha__gte=fecha, then=Value(acumulado)))
+    diarios.filter(fecha__gte=fechas[0]).update(
+        saldo=F('saldo') + Case(*reversed(casos), default=Value(CERO))
+    )
+
+
+def aplicar(deltas):
+    """
+    Suma ``deltas`` ({(usuario_id, fecha): importe}) al saldo actual de cada usuario y a sus
+    saldos diarios desde cada fecha. Debe llamarse dentro de la transacción que crea o
+    elimina las filas, para que el candado sobre SaldoCuenta dure hasta el commit.
+    """
+    por_usuario = defaultdict(dict)
+    for (usuario_id, fecha), importe in deltas.items():
+        if importe:
+            por_usuario[usuario_id][fecha] = importe
+
+    # Siempre en el mismo orden, para que dos lotes con varios usuarios no se bloqueen entre sí
+    for usuario_id in sorted(por_usuario):
+        importes = por_usuario[usuario_id]
+        _sumar_al_saldo(usuario_id, sum(importes.values()))
+        # Cada fecha agrega dos parámetros al CASE: las importaciones de varios años se aplican
+        # por tramos, cada uno sobre los saldos que dejó el anterior
+        fechas = sorted(importes)
+        for inicio in range(0, len(fechas), FECHAS_POR_CONSULTA):
+            _aplicar_diarios(usuario_id, {fecha: importes[fecha] for fecha in fechas[inicio:inicio + FECHAS_POR_CONSULTA]})
+
+
+def saldo_actual(usuario):
+    """
+    Saldo de ``usuario`` con todas sus transacciones (incluidas las de fecha futura).
+    """
+    saldo = SaldoCuenta.objects.filter(usuario=usuario).values_list('saldo', flat=True).first()
+    return saldo if saldo is not None else CERO
+
+
+def saldo_al(usuario, fecha):
+    """
+    Saldo de ``usuario`` al cierre del día ``fecha``.
+    """
+    saldo = (
+        SaldoDiario.objects
+        .filter(usuario=usuario, fecha__lte=fecha)
+        .order_by('-fecha')
+        .values_list('saldo', flat=True)
+        .first()
+    )
+    return saldo if saldo is not None else CERO
+
+
+# 🔎 Conciliación con las transacciones
+
+def calcular_desde_transacciones(usuarios=None):
+    """
+    Recalcula los saldos diarios a partir de las transacciones.
+    Devuelve {usuario_id: [(fecha, saldo al cierre)]} ordenado por fecha.
+    """
+    transacciones = Transaccion.objects.filter(usuario__isnull=False, fecha__isnull=False)
+    if usuarios is not None:
+        transacciones = transacciones.filter(usuario__in=usuarios)
+    filas = (
+        transacciones
+        .values('usuario_id', 'fecha')
+        .annotate(
+            ingresos=Sum('monto', filter=Q(tipo='INGRESO')),
+            gastos=Sum('monto', filter=Q(tipo='GASTO')),
+        )
+        .order_by('usuario_id', 'fecha')
+    )
+    esperado = defaultdict(list)
+    saldos = defaultdict(lambda: CERO)
+    for fila in filas:
+        usuario_id = fila['usuario_id']
+        saldos[usuario_id] += (fila['ingresos'] or 0) - (fila['gastos'] or 0)
+        esperado[usuario_id].append((fila['fecha'], saldos[usuario_id]))
+    return dict(esperado)
+
+
+def _compactar(diarios):
+    # Un día cuyo saldo repite el del anterior (p. ej. tras eliminar su única transacción)
+    # no cambia el saldo a ninguna fecha, así que no cuenta como diferencia
+    resultado = []
+    anterior = CERO
+    for fecha, saldo in diarios:
+        if saldo != anterior:
+            resultado.append((fecha, saldo))
+            anterior = saldo
+    return resultado
+
+
+def _guardados(usuarios):
+    cuentas = SaldoCuenta.objects.all()
+    diarios = SaldoDiario.objects.order_by('usuario_id', 'fecha')
+    if usuarios is not None:
+        cuentas = cuentas.filter(usuario__in=usuarios)
+        diarios = diarios.filter(usuario__in=usuarios)
+    actuales = dict(cuentas.values_list('usuario_id', 'saldo'))
+    por_dia = defaultdict(list)
+    for usuario_id, fecha, saldo in diarios.values_list('usuario_id', 'fecha', 'saldo'):
+        por_dia[usuario_id].append((fecha, saldo))
+    return actuales, por_dia
+
+
+def buscar_diferencias(usuarios=None):
+    """
+    Compara los saldos guardados con los calculados desde las transacciones.
+    Devuelve una lista de (usuario_id, saldo guardado, saldo esperado, primera fecha cuyo
+    saldo no coincide o None) con los usuarios que no coinciden.
+    """
+    esperado = calcular_desde_transacciones(usuarios)
+    actuales, por_dia = _guardados(usuarios)
+    diferencias = []
+    for usuario_id in sorted(set(esperado) | set(actuales) | set(por_dia)):
+        diarios_esperados = _compactar(esperado.get(usuario_id, []))
+        diarios_guardados = _compactar(por_dia.get(usuario_id, []))
+        saldo_esperado = diarios_esperados[-1][1] if diarios_esperados else CERO
+        saldo_guardado = actuales.get(usuario_id, CERO)
+        if saldo_guardado == saldo_esperado and diarios_guardados == diarios_esperados:
+            continue
+        primera = None
+        for guardado, calculado in zip(diarios_guardados, diarios_esperados):
+            if guardado != calculado:
+                primera = min(guardado[0], calculado[0])
+                break
+        else:
+            if len(diarios_guardados) != len(diarios_esperados):
+                largo = min(len(diarios_guardados), len(diarios_esperados))
+                primera = max(diarios_guardados, diarios_esperados, key=len)[largo][0]
+        diferencias.append((usuario_id, saldo_guardado, saldo_esperado, primera))
+    return diferencias
+
+
+@transaction.atomic
+def reconstruir(usuarios=None):
+    """
+    Reemplaza los saldos por los calculados desde las transacciones.
+    Devuelve el número de usuarios reconstruidos.
+    """
+    cuentas = SaldoCuenta.objects.all()
+    transacciones = Transaccion.objects.filter(usuario__isnull=False)
+    if usuarios is not None:
+        cuentas = cuentas.filter(usuario__in=usuarios)
+        transacciones = transacciones.filter(usuario__in=usuarios)
+    afectados = set(cuentas.values_list('usuario_id', flat=True))
+    afectados.update(transacciones.values_list('usuario_id', flat=True).distinct())
+    # Se bloquean antes de leer las transacciones: un alta que espere el candado se aplicará
+    # después sobre los saldos reconstruidos, que todavía no la incluyen
+    for usuario_id in sorted(afectados):
+        _bloquear(usuario_id)
+
+    esperado = calcular_desde_transacciones(usuarios)
+    SaldoDiario.objects.filter(usuario_id__in=afectados).delete()
+    SaldoDiario.objects.bulk_create([
+        SaldoDiario(usuario_id=usuario_id, fecha=fecha, saldo=saldo)
+        for usuario_id, diarios in esperado.items()
+        for fecha, saldo in diarios
+    ], batch_size=1000)
+    for usuario_id in afectados:
+        diarios = esperado.get(usuario_id)
+        SaldoCuenta.objects.filter(usuario_id=usuario_id).update(saldo=diarios[-1][1] if diarios else CERO)
+        cache_dashboard.invalidar(usuario_id)
+    return len(afectados)
@@ -0,0 +1,134 @@
+"""
+Generación determinista de datos de prueba para los benchmarks.
+Con la misma semilla siempre se obtienen las mismas transacciones.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from . import acumulados, saldos
+from .models import ObjetivoAhorro, Presupuesto, SerieRecurrente, Transaccion, calcular_huella
+from .recurrentes import programar
+
+
+CATEGORIAS_GASTO = ['Alimentos', 'Transporte', 'Entretenimiento', 'Salud', 'Educación', 'Vivienda', None]
+CATEGORIAS_INGRESO = ['Sueldo', 'Ventas', 'General']
+DESCRIPCIONES = {
+    'Alimentos': ['Supermercado Lider', 'Jumbo', 'Feria', 'Panadería'],
+    'Transporte': ['Metro', 'Uber', 'Bencina Copec', 'Bip!'],
+    'Entretenimiento': ['Netflix', 'Cine Hoyts', 'Spotify', 'Concierto'],
+    'Salud': ['Farmacia Cruz Verde', 'Consulta médica', 'Isapre'],
+    'Educación': ['Libros', 'Curso online', 'Matrícula'],
+    'Vivienda': ['Arriendo', 'Luz', 'Agua', 'Gas', 'Internet'],
+    None: ['Varios', 'Transferencia'],
+    'Sueldo': ['Sueldo'],
+    'Ventas': ['Venta Marketplace', 'Boleta de honorarios'],
+    'General': ['Reembolso'],
+}
+
+
+def obtener_usuario(nombre):
+    """
+    Devuelve (creándolo si no existe) un usuario de benchmark.
+    """
+    usuario, _ = User.objects.get_or_create(
+        username=nombre, defaults={'email': f'{nombre}@benchmark.local', 'first_name': nombre}
+    )
+    return usuario
+
+
+def generar_transacciones(usuario, cantidad, semilla=0, dias=3 * 365, hasta=None):
+    """
+    Genera (sin guardar) ``cantidad`` transacciones repartidas en los últimos ``dias`` días.
+    Es un generador, así que no mantiene todas las filas en memoria.
+    """
+    aleatorio = random.Random(semilla)
+    hasta = hasta or timezone.now().date()
+    for _ in range(cantidad):
+        if aleatorio.random() < 0.15:
+            tipo = 'INGRESO'
+            categoria = aleatorio.choice(CATEGORIAS_INGRESO)
+            monto = Decimal(aleatorio.randrange(50_000, 2_000_000, 1000))
+        else:
+            tipo = 'GASTO'
+            categoria = aleatorio.choice(CATEGORIAS_GASTO)
+            monto = Decimal(aleatorio.randrange(500, 150_000, 10))
+        fecha = hasta - timedelta(days=aleatorio.randrange(dias))
+        descripcion = aleatorio.choice(DESCRIPCIONES[categoria])
+        yield Transaccion(
+            usuario_id=usuario.id,
+            descripcion=descripcion,
+            monto=monto,
+            tipo=tipo,
+            fecha=fecha,
+            fecha_inicio=fecha,
+            categoria=categoria,
+            huella=calcular_huella(fecha, monto, tipo, descripcion),
+        )
+
+
+def sembrar_transacciones(usuario, cantidad, semilla=0, lote=5000, **kwargs):
+    """
+    Inserta ``cantidad`` transacciones deterministas con ``bulk_create`` por lotes
+    y reconstruye los acumulados y los saldos del usuario. Devuelve el número de filas insertadas.
+    """
+    pendientes = []
+    insertadas = 0
+    for transaccion in generar_transacciones(usuario, cantidad, semilla=semilla, **kwargs):
+        pendientes.append(transaccion)
+        if len(pendientes) >= lote:
+            Transaccion.objects.bulk_create(pendientes)
+            insertadas += len(pendientes)
+            pendientes = []
+    if pendientes:
+        Transaccion.objects.bulk_create(pendientes)
+        insertadas += len(pendientes)
+    acumulados.reconstruir([usuario])
+    saldos.reconstruir([usuario])
+    return insertadas
+
+
+def sembrar_series(usuario, cantidad, semilla=0, hasta=None):
+    """
+    Crea ``cantidad`` series recurrentes activas que empezaron en los últimos 60 días y no
+    tienen ninguna ocurrencia registrada, así que todas tienen fechas pendientes hasta ``hasta``.
+    """
+    aleatorio = random.Random(semilla)
+    hasta = hasta or timezone.now().date()
+    series = []
+    for _ in range(cantidad):
+        categoria = aleatorio.choice(['Vivienda', 'Entretenimiento', 'Transporte', 'Sueldo'])
+        series.append(programar(SerieRecurrente(
+            usuario_id=usuario.id,
+            activa=True,
+            descripcion=aleatorio.choice(DESCRIPCIONES[categoria]),
+            monto=Decimal(aleatorio.randrange(1_000, 500_000, 100)),
+            tipo='INGRESO' if categoria == 'Sueldo' else 'GASTO',
+            categoria=categoria,
+            periodicidad=aleatorio.choice(['DIARIA', 'SEMANAL', 'SEMANAL', 'MENSUAL', 'MENSUAL', 'ANUAL']),
+            fecha_inicio=hasta - timedelta(days=aleatorio.randrange(1, 60)),
+        )))
+    SerieRecurrente.objects.bulk_create(series)
+    return len(series)
+
+
+def sembrar_objetivos(usuario, cantidad, semilla=0, hasta=None):
+    """
+    Crea ``cantidad`` objetivos de ahorro con avance y fecha límite al azar, y un presupuesto.
+    """
+    aleatorio = random.Random(semilla)
+    hasta = hasta or timezone.now().date()
+    for indice in range(cantidad):
+        monto_objetivo = Decimal(aleatorio.randrange(100_000, 5_000_000, 1000))
+        ObjetivoAhorro.objects.create(
+            usuario=usuario,
+            nombre=f'Objetivo {indice + 1}',
+            monto_objetivo=monto_objetivo,
+            monto_actual=(monto_objetivo * Decimal(aleatorio.random())).quantize(Decimal('1')),
+            fecha_limite=hasta + timedelta(days=aleatorio.randrange(-30, 365)),
+        )
+    Presupuesto.objects.create(usuario=usuario, monto=Decimal(aleatorio.randrange(300_000, 2_000_000, 1000)))
+    return cantidad
@@ -0,0 +1,20 @@
+"""
+Invalidación de la caché del dashboard cuando cambian los datos que muestra.
+
+``bulk_create`` y ``QuerySet.update`` no envían estas señales: quien los use sobre estos
+modelos debe llamar a ``cache_dashboard.invalidar`` (ver recurrentes.py).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache_dashboard
+from .models import ObjetivoAhorro, Presupuesto, SerieRecurrente, Transaccion
+
+
+@receiver([post_save, post_delete], sender=Transaccion)
+@receiver([post_save, post_delete], sender=ObjetivoAhorro)
+@receiver([post_save, post_delete], sender=Presupuesto)
+# Las series activas aparecen en el dashboard como ocurrencias virtuales aún no generadas
+@receiver([post_save, post_delete], sender=SerieRecurrente)
+def invalidar_dashboard(sender, instance, **kwargs):
+    cache_dashboard.invalidar(instance.usuario_id)
@@ -0,0 +1,241 @@
+"""
+Síntesis compacta de las transacciones de un mes para enviarla al modelo de recomendaciones.
+
+En lugar de una línea por transacción, la base de datos agrega los totales por categoría,
+los comercios con más gasto, los movimientos recurrentes y la comparación con los meses
+anteriores. El texto resultante tiene un tamaño acotado por un presupuesto de tokens,
+sin importar cuántas transacciones tenga el usuario.
+"""
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .exportaciones import formatear_monto
+from .models import Transaccion
+from .objetivos import PREFIJO_APORTE
+from .resumen import nombre_mes, rango_mes
+
+# Movimientos que no son ingresos ni gastos reales: los aportes a objetivos de ahorro
+# (se informan aparte) y el balance inicial
+EXCLUIDAS = Q(descripcion__startswith=PREFIJO_APORTE) | Q(tipo='INGRESO', descripcion='Balance Inicial')
+
+
+def estimar_tokens(texto):
+    """
+    Estimación de tokens sin depender del tokenizador del modelo (~4 caracteres por token).
+    """
+    return math.ceil(len(texto) / 4)
+
+
+@dataclass
+class TotalSintesis:
+    nombre: str
+    total: Decimal
+    cantidad: int
+    promedio_previo: Decimal = None  # promedio mensual en los meses anteriores (None si no hay historial)
+
+
+@dataclass
+class SintesisMensual:
+    anio: int
+    mes: int
+    cantidad: int = 0
+    ingresos: Decimal = Decimal('0')
+    gastos: Decimal = Decimal('0')
+    aportes_objetivos: Decimal = Decimal('0')
+    meses_previos: list = field(default_factory=list)  # [(primer día del mes, ingresos, gastos)]
+    gastos_categorias: list = field(default_factory=list)  # [TotalSintesis] de mayor a menor
+    ingresos_categorias: list = field(default_factory=list)
+    comercios: list = field(default_factory=list)  # [TotalSintesis] descripciones con más gasto
+    recurrentes: list = field(default_factory=list)  # [(tipo, TotalSintesis)]
+
+    @property
+    def tiene_transacciones(self):
+        return self.cantidad > 0 or self.aportes_objetivos > 0
+
+
+def calcular_sintesis(usuario_id, anio, mes, meses_previos=3, max_comercios=10, max_recurrentes=10):
+    """
+    Calcula la síntesis del mes con consultas agregadas (no recorre las filas en Python).
+    """
+    inicio_mes, fin_mes = rango_mes(anio, mes)
+    inicio_ventana = inicio_mes - relativedelta(months=meses_previos)
+    ventana = Transaccion.objects.filter(usuario_id=usuario_id, fecha__gte=inicio_ventana, fecha__lt=fin_mes)
+    del_mes = Q(fecha__gte=inicio_mes)
+    sintesis = SintesisMensual(anio=anio, mes=mes)
+
+    # 1. Totales por mes, tipo y categoría de toda la ventana
+    por_mes = {}
+    actuales = {'GASTO': {}, 'INGRESO': {}}
+    previos = {'GASTO': {}, 'INGRESO': {}}
+    filas = (
+        ventana.exclude(EXCLUIDAS)
+        .annotate(mes_fecha=TruncMonth('fecha'))
+        .values('mes_fecha', 'tipo', 'categoria')
+        .annotate(total=Sum('monto'), cantidad=Count('id'))
+        .order_by()
+    )
+    for fila in filas:
+        mes_fecha = fila['mes_fecha']
+        categoria = fila['categoria'] or 'Sin categoría'
+        totales_mes = por_mes.setdefault(mes_fecha, {'INGRESO': Decimal('0'), 'GASTO': Decimal('0')})
+        totales_mes[fila['tipo']] += fila['total']
+        if mes_fecha == inicio_mes:
+            sintesis.cantidad += fila['cantidad']
+            total = actuales[fila['tipo']].setdefault(categoria, TotalSintesis(categoria, Decimal('0'), 0))
+            total.total += fila['total']
+            total.cantidad += fila['cantidad']
+        else:
+            previos[fila['tipo']][categoria] = previos[fila['tipo']].get(categoria, Decimal('0')) + fila['total']
+
+    meses_con_datos = sorted(m for m in por_mes if m != inicio_mes)
+    for tipo, destino in (('GASTO', sintesis.gastos_categorias), ('INGRESO', sintesis.ingresos_categorias)):
+        for total in actuales[tipo].values():
+            if meses_con_datos:
+                total.promedio_previo = previos[tipo].get(total.nombre, Decimal('0')) / len(meses_con_datos)
+            destino.append(total)
+        destino.sort(key=lambda t: t.total, reverse=True)
+    actual = por_mes.get(inicio_mes, {})
+    sintesis.ingresos = actual.get('INGRESO', Decimal('0'))
+    sintesis.gastos = actual.get('GASTO', Decimal('0'))
+    sintesis.meses_previos = [(m, por_mes[m]['INGRESO'], por_mes[m]['GASTO']) for m in meses_con_datos]
+
+    # 2. Aportes a objetivos del mes
+    sintesis.aportes_objetivos = ventana.filter(
+        del_mes, descripcion__startswith=PREFIJO_APORTE
+    ).aggregate(total=Sum('monto'))['total'] or Decimal('0')
+
+    # 3. Comercios (descripciones) con más gasto en el mes
+    comercios = (
+        ventana.filter(del_mes, tipo='GASTO').exclude(EXCLUIDAS)
+        .values('descripcion')
+        .annotate(total=Sum('monto'), cantidad=Count('id'))
+        .order_by('-total')[:max_comercios]
+    )
+    sintesis.comercios = [TotalSintesis(c['descripcion'], c['total'], c['cantidad']) for c in comercios]
+
+    # 4. Recurrentes: movimientos del mes que pertenecen a una serie o que se repiten
+    #    con la misma descripción en al menos dos de los meses anteriores
+    recurrentes = (
+        ventana.exclude(EXCLUIDAS)
+        .values('tipo', 'descripcion')
+        .annotate(
+            meses=Count(TruncMonth('fecha'), distinct=True),
+            en_serie=Count('serie_recurrente', filter=del_mes),
+            total=Sum('monto', filter=del_mes),
+            cantidad=Count('id', filter=del_mes),
+        )
+        .filter(total__gt=0)
+        .filter(Q(en_serie__gt=0) | Q(meses__gte=3))
+        .order_by('-total')[:max_recurrentes]
+    )
+    sintesis.recurrentes = [
+        (r['tipo'], TotalSintesis(r['descripcion'], r['total'], r['cantidad'])) for r in recurrentes
+    ]
+    return sintesis
+
+
+def _variacion(total):
+    if total.promedio_previo is None:
+        return ""
+    if not total.promedio_previo:
+        return ", nuevo este mes"
+    cambio = (total.total - total.promedio_previo) / total.promedio_previo * 100
+    return f", promedio meses anteriores {formatear_monto(total.promedio_previo)} ({cambio:+.0f}%)"
+
+
+class _Seccion:
+    """
+    Lista de líneas recortable: al quitar elementos del final se resumen en una línea "otros".
+    """
+    def __init__(self, titulo, elementos, formatear, resumir=None, minimo=1):
+        self.titulo = titulo
+        self.elementos = list(elementos)
+        self.formatear = formatear
+        self.resumir = resumir
+        self.minimo = minimo
+        self.omitidos = []
+
+    def recortar(self):
+        if len(self.elementos) <= self.minimo:
+            return False
+        self.omitidos.insert(0, self.elementos.pop())
+        return True
+
+    def lineas(self):
+        if not self.elementos and not (self.omitidos and self.resumir):
+            return []
+        lineas = [self.titulo] + [f"- {self.formatear(e)}" for e in self.elementos]
+        if self.omitidos and self.resumir:
+            lineas.append(f"- {self.resumir(self.omitidos)}")
+        return lineas
+
+
+def _otras(elementos):
+    total = sum((e.total for e in elementos), Decimal('0'))
+    return f"Otras {len(elementos)}: {formatear_monto(total)}"
+
+
+def redactar_sintesis(sintesis, presupuesto_tokens=600):
+    """
+    Convierte la síntesis en texto para el prompt sin superar ``presupuesto_tokens``
+    (estimados). Si no cabe, se recortan primero los detalles menos importantes:
+    comercios y recurrentes, luego meses anteriores y por último las categorías más pequeñas.
+    """
+    mes_fecha = rango_mes(sintesis.anio, sintesis.mes)[0]
+    cabecera = [
+        f"Mes: {nombre_mes(mes_fecha)} ({sintesis.cantidad} transacciones)",
+        f"Ingresos: {formatear_monto(sintesis.ingresos)} | Gastos: {formatear_monto(sintesis.gastos)} "
+        f"| Balance: {formatear_monto(sintesis.ingresos - sintesis.gastos)}",
+    ]
+    if sintesis.aportes_objetivos:
+        cabecera.append(
+            f"Aportes a objetivos de ahorro (no son gastos): {formatear_monto(sintesis.aportes_objetivos)}"
+        )
+
+    def formatear_categoria(t):
+        return f"{t.nombre}: {formatear_monto(t.total)} ({t.cantidad} mov.{_variacion(t)})"
+
+    secciones = {
+        'gastos': _Seccion("Gastos por categoría:", sintesis.gastos_categorias, formatear_categoria, _otras),
+        'ingresos': _Seccion("Ingresos por categoría:", sintesis.ingresos_categorias, formatear_categoria, _otras),
+        'meses': _Seccion(
+            "Meses anteriores:", reversed(sintesis.meses_previos),
+            lambda m: f"{nombre_mes(m[0])}: ingresos {formatear_monto(m[1])}, gastos {formatear_monto(m[2])}",
+            minimo=0,
+        ),
+        'comercios': _Seccion(
+            "Comercios con más gasto:", sintesis.comercios,
+            lambda t: f"{t.nombre}: {formatear_monto(t.total)} ({t.cantidad} mov.)", minimo=0,
+        ),
+        'recurrentes': _Seccion(
+            "Movimientos recurrentes:", sintesis.recurrentes,
+            lambda r: f"{r[1].nombre} ({r[0].lower()}): {formatear_monto(r[1].total)}", minimo=0,
+        ),
+    }
+    orden_texto = ['meses', 'gastos', 'ingresos', 'comercios', 'recurrentes']
+    # Dentro de cada grupo se recorta primero la sección más larga
+    grupos_recorte = [('comercios', 'recurrentes'), ('meses',), ('ingresos', 'gastos')]
+
+    def recortar():
+        for grupo in grupos_recorte:
+            candidatas = sorted((secciones[nombre] for nombre in grupo), key=lambda s: len(s.elementos), reverse=True)
+            if any(seccion.recortar() for seccion in candidatas):
+                return True
+        return False
+
+    def componer():
+        lineas = list(cabecera)
+        for nombre in orden_texto:
+            lineas.extend(secciones[nombre].lineas())
+        return "\n".join(lineas)
+
+    texto = componer()
+    # Se recorta una línea a la vez hasta que el texto quepa o no quede nada recortable
+    while estimar_tokens(texto) > presupuesto_tokens and recortar():
+        texto = componer()
+    return texto
@@ -1,9 +1,8 @@
 document.addEventListener('DOMContentLoaded', function() {
     // Función para mostrar la alerta de saldo negativo
-    function checkNegativeBalance() {
-        const saldoTotal = parseFloat(JSON.parse(document.getElementById('saldo-total-data').textContent));
+    function checkNegativeBalance(saldoTotal) {
         const alertElement = document.getElementById('negativeBalanceAlert');
-        if (saldoTotal < 0) {
+        if (alertElement && saldoTotal < 0) {
             alertElement.style.display = 'block';
             setTimeout(() => {
                 alertElement.style.display = 'none';
@@ -50,10 +49,9 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // Función para crear gráfico donut con total al centro
-    function createDonutChart(canvasId, data, colors, total) {
+    function createDonutChart(canvasId, chartData, colors, total) {
         var ctx = document.getElementById(canvasId);
         if (!ctx) return;
-        var chartData = JSON.parse(data);
         var labels = chartData.map(item => item.categoria);
         var values = chartData.map(item => item.monto);
 
@@ -95,12 +93,12 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    // Crear gráfico de barras
-    var ctxBar = document.getElementById('gastosMesChart');
-    if (ctxBar) {
-        // Estos datos deben estar disponibles como variables globales o puedes pasarlos desde Django como JSON en el template
-        var mesesGastos = window.mesesGastos || [];
-        var gastosPorMes = window.gastosPorMes || [];
+    // Crear gráfico de gastos por mes (widget gastos-mensuales)
+    function crearGraficoGastosMes(datos) {
+        var ctxBar = document.getElementById('gastosMesChart');
+        if (!ctxBar) return;
+        var mesesGastos = datos.meses;
+        var gastosPorMes = datos.gastos;
         new Chart(ctxBar, {
             type: 'line',
             data: {
@@ -147,18 +145,143 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Gráfico de evolución del saldo: los puntos llegan ya reducidos desde el servidor,
+    // así que se pueden pedir varios años sin recibir una fila por transacción
+    var ctxEvolucion = document.getElementById('evolucionSaldoChart');
+    var rangoEvolucion = document.getElementById('evolucion-rango');
+    var graficoEvolucion = null;
+
+    // AAAA-MM-DD en hora local (toISOString usa UTC y puede cambiar el día)
+    function fechaISO(fecha) {
+        var mes = String(fecha.getMonth() + 1).padStart(2, '0');
+        var dia = String(fecha.getDate()).padStart(2, '0');
+        return fecha.getFullYear() + '-' + mes + '-' + dia;
+    }
+
+    function cargarEvolucion() {
+        var partes = rangoEvolucion.value.split(':');
+        var hasta = new Date();
+        var desde = new Date(hasta.getFullYear(), hasta.getMonth() - parseInt(partes[0], 10), hasta.getDate());
+        var url = new URL(ctxEvolucion.dataset.url, window.location.origin);
+        url.searchParams.set('desde', fechaISO(desde));
+        url.searchParams.set('hasta', fechaISO(hasta));
+        url.searchParams.set('granularidad', partes[1]);
+        url.searchParams.set('puntos', Math.max(30, Math.min(400, Math.round(ctxEvolucion.clientWidth / 3))));
+
+        fetch(url)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.puntos) return;
+                var datasets = [
+                    {
+                        type: 'line',
+                        label: 'Saldo',
+                        data: data.puntos.map(p => p.saldo),
+                        borderColor: 'rgb(54, 162, 235)',
+                        backgroundColor: 'rgba(54, 162, 235, 0.1)',
+                        borderWidth: 2,
+                        pointRadius: 0,
+                        fill: true
+                    },
+                    {
+                        label: 'Ingresos',
+                        data: data.puntos.map(p => p.ingresos),
+                        backgroundColor: 'rgba(75, 192, 192, 0.6)'
+                    },
+                    {
+                        label: 'Gastos',
+                        data: data.puntos.map(p => -p.gastos),
+                        backgroundColor: 'rgba(255, 99, 132, 0.6)'
+                    }
+                ];
+                var labels = data.puntos.map(p => p.fecha.split('-').reverse().join('/'));
+                if (graficoEvolucion) {
+                    graficoEvolucion.data.labels = labels;
+                    graficoEvolucion.data.datasets = datasets;
+                    graficoEvolucion.update();
+                    return;
+                }
+                graficoEvolucion = new Chart(ctxEvolucion, {
+                    type: 'bar',
+                    data: { labels: labels, datasets: datasets },
+                    options: {
+                        responsive: true,
+                        maintainAspectRatio: false,
+                        legend: { display: true },
+                        scales: {
+                            xAxes: [{
+                                gridLines: { display: false },
+                                ticks: { maxRotation: 0, autoSkip: true, maxTicksLimit: 12, fontSize: 11 }
+                            }],
+                            yAxes: [{
+                                ticks: {
+                                    callback: function(value) {
+                                        return '$' + value.toLocaleString('es-CL');
+                                    },
+                                    fontSize: 11
+                                },
+                                gridLines: { color: "rgba(0, 0, 0, 0.05)" }
+                            }]
+                        },
+                        tooltips: {
+                            mode: 'index',
+                            intersect: false,
+                            callbacks: {
+                                label: function(tooltipItem, data) {
+                                    var label = data.datasets[tooltipItem.datasetIndex].label;
+                                    return label + ': $' + Math.abs(tooltipItem.yLabel).toLocaleString('es-CL');
+                                }
+                            }
+                        }
+                    }
+                });
+            })
+            .catch(error => console.error('Error al cargar la evolución del saldo:', error));
+    }
+
+    if (ctxEvolucion && rangoEvolucion) {
+        rangoEvolucion.addEventListener('change', cargarEvolucion);
+    }
+
     // Colores para el gráfico de gastos por categoría
     var gastosColors = [
         '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
         '#FF9F40', '#8DD17E', '#D7263D', '#6C3483', '#F7B731'
     ];
 
-    // Gráfico donut de gastos por categoría
-    var gastosData = document.getElementById('gastos-categorias-data');
-    if (gastosData) {
-        var chartData = JSON.parse(gastosData.textContent);
+    // Mismo formato que el filtro formato_clp: $1.234.567
+    function formatoCLP(valor) {
+        return '$' + Math.trunc(valor).toLocaleString('es-CL');
+    }
+
+    // Crea un elemento con clase y texto (el texto nunca se interpreta como HTML)
+    function crearElemento(etiqueta, clase, texto) {
+        var elemento = document.createElement(etiqueta);
+        if (clase) elemento.className = clase;
+        if (texto !== undefined) elemento.textContent = texto;
+        return elemento;
+    }
+
+    // Pide un widget del dashboard para el mes seleccionado. Las respuestas llevan ETag y
+    // Last-Modified: el navegador las revalida y, si no cambiaron, reutiliza su copia (304)
+    var dashboard = document.getElementById('dashboard');
+
+    function pedirWidget(nombre) {
+        var clave = 'widget' + nombre.split('-').map(p => p.charAt(0).toUpperCase() + p.slice(1)).join('');
+        var url = new URL(dashboard.dataset[clave], window.location.origin);
+        var mesAnio = new URLSearchParams(window.location.search).get('mes_anio');
+        if (mesAnio) url.searchParams.set('mes_anio', mesAnio);
+        return fetch(url, { credentials: 'same-origin' }).then(response => {
+            if (!response.ok) throw new Error('widget ' + nombre + ': ' + response.status);
+            return response.json();
+        });
+    }
+
+    // Gráfico donut de gastos por categoría (widget categorias)
+    function mostrarCategorias(datos) {
+        var chartData = datos.gastos;
         var totalGastos = chartData.reduce((acc, item) => acc + parseFloat(item.monto), 0);
-        createDonutChart('balanceChart', gastosData.textContent, gastosColors, totalGastos);
+        createDonutChart('balanceChart', chartData, gastosColors, totalGastos);
 
         // Leyenda personalizada
         var legendContainer = document.getElementById('donut-legend');
@@ -166,17 +289,168 @@ document.addEventListener('DOMContentLoaded', function() {
             legendContainer.innerHTML = '';
             chartData.forEach(function(item, idx) {
                 var color = gastosColors[idx % gastosColors.length];
-                var legendItem = document.createElement('div');
-                legendItem.className = 'd-flex align-items-center me-3 mb-2';
-                legendItem.innerHTML = `
-                    <span style="display:inline-block;width:16px;height:16px;background:${color};border-radius:3px;margin-right:8px;"></span>
-                    <span style="font-size: 0.97em;">${item.categoria}</span>
-                `;
+                var legendItem = crearElemento('div', 'd-flex align-items-center me-3 mb-2');
+                var muestra = crearElemento('span');
+                muestra.style.cssText = `display:inline-block;width:16px;height:16px;background:${color};border-radius:3px;margin-right:8px;`;
+                var nombre = crearElemento('span', '', item.categoria);
+                nombre.style.fontSize = '0.97em';
+                legendItem.append(muestra, nombre);
                 legendContainer.appendChild(legendItem);
             });
         }
     }
 
+    // Alertas de objetivos vencidos o por vencer
+    function mostrarAlertaObjetivos(id, objetivos, detalle, claseBarra) {
+        var alerta = document.getElementById(id);
+        if (!alerta || objetivos.length === 0) return;
+        var contenedor = alerta.querySelector('.objetivos-alerta');
+        objetivos.forEach(function(objetivo) {
+            var item = crearElemento('span', 'me-3', `${objetivo.nombre} (${detalle(objetivo)})`);
+            var progreso = crearElemento('div', 'progress progress-inline');
+            var barra = crearElemento('div', 'progress-bar progress-bar-inline ' + claseBarra);
+            barra.setAttribute('role', 'progressbar');
+            barra.style.setProperty('--progress-width', objetivo.progreso + '%');
+            barra.setAttribute('aria-valuenow', objetivo.progreso);
+            barra.setAttribute('aria-valuemin', '0');
+            barra.setAttribute('aria-valuemax', '100');
+            progreso.appendChild(barra);
+            item.appendChild(progreso);
+            contenedor.appendChild(item);
+        });
+        alerta.hidden = false;
+    }
+
+    // Tarjetas de objetivos de ahorro y alertas (widget objetivos)
+    function mostrarObjetivos(datos) {
+        mostrarAlertaObjetivos('alerta-objetivos-vencidos', datos.vencidos,
+            o => `vencido hace ${o.dias_vencido} días`, 'progress-bar-danger');
+        mostrarAlertaObjetivos('alerta-objetivos-por-vencer', datos.por_vencer,
+            o => `faltan ${o.dias_restantes} días`, 'progress-bar-warning');
+
+        var grilla = document.getElementById('objetivos-ahorro');
+        if (datos.objetivos.length === 0) {
+            document.getElementById('sin-objetivos').hidden = false;
+            return;
+        }
+        datos.objetivos.forEach(function(objetivo) {
+            var tarjeta = crearElemento('div', 'objetivo-card');
+            var icono = crearElemento('div', 'icon-container objetivo-icon');
+            icono.style.backgroundColor = objetivo.color;
+            icono.appendChild(crearElemento('i', 'fas fa-piggy-bank fa-lg'));
+
+            var info = crearElemento('div', 'objetivo-info');
+            info.appendChild(crearElemento('h6', 'fw-bold mb-1', objetivo.nombre));
+            info.appendChild(crearElemento('p', 'text-muted mb-2',
+                formatoCLP(objetivo.monto_actual) + ' / ' + formatoCLP(objetivo.monto_objetivo)));
+            var progreso = crearElemento('div', 'progress');
+            progreso.style.height = '8px';
+            var barra = crearElemento('div', 'progress-bar');
+            barra.setAttribute('role', 'progressbar');
+            barra.style.width = objetivo.progreso.toFixed(1) + '%';
+            barra.style.backgroundColor = objetivo.color;
+            barra.setAttribute('aria-valuenow', objetivo.progreso.toFixed(1));
+            barra.setAttribute('aria-valuemin', '0');
+            barra.setAttribute('aria-valuemax', '100');
+            progreso.appendChild(barra);
+            info.appendChild(progreso);
+
+            tarjeta.append(icono, info);
+            grilla.appendChild(tarjeta);
+        });
+    }
+
+    // Lista de últimas transacciones del mes (widget ultimas)
+    function mostrarUltimas(datos) {
+        var lista = document.getElementById('ultimas-transacciones');
+        if (datos.transacciones.length === 0) {
+            lista.appendChild(crearElemento('div', 'list-group-item text-center text-muted',
+                'No hay transacciones recientes en este mes.'));
+            return;
+        }
+        datos.transacciones.forEach(function(transaccion) {
+            var ingreso = transaccion.tipo === 'INGRESO';
+            var item = crearElemento('div', 'list-group-item d-flex align-items-center py-3 px-2 border-0');
+            item.style.background = 'transparent';
+
+            var icono = crearElemento('div', 'rounded-circle d-flex align-items-center justify-content-center me-3');
+            icono.style.cssText = 'width: 44px; height: 44px; background: #f5f5f5;';
+            icono.appendChild(crearElemento('i', transaccion.icono + ' fa-lg text-secondary'));
+
+            var detalle = crearElemento('div', 'flex-grow-1');
+            detalle.appendChild(crearElemento('div', 'fw-bold', transaccion.descripcion));
+            detalle.appendChild(crearElemento('div', 'text-muted small', transaccion.categoria));
+
+            var monto = crearElemento('div', 'text-end ms-2');
+            monto.appendChild(crearElemento('div', 'fw-bold ' + (ingreso ? 'text-success' : 'text-danger'),
+                (ingreso ? '+' : '-') + formatoCLP(transaccion.monto)));
+            monto.appendChild(crearElemento('div', 'text-muted small', transaccion.fecha_texto));
+
+            item.append(icono, detalle, monto);
+            lista.appendChild(item);
+        });
+    }
+
+    // Nombre, selector de periodo y tarjetas de ingresos, gastos y saldo (widget resumen)
+    function mostrarResumen(datos) {
+        document.getElementById('nombre-usuario').textContent = datos.nombre_usuario;
+        document.getElementById('resumen-ingresos').textContent = '+' + formatoCLP(datos.ingresos);
+        document.getElementById('resumen-gastos').textContent = '-' + formatoCLP(datos.gastos);
+        document.getElementById('resumen-saldo').textContent = formatoCLP(datos.saldo_total);
+
+        var mesAnioSelect = document.getElementById('mes_anio');
+        datos.meses_anios.forEach(function(ma) {
+            var opcion = new Option(ma.text, ma.value);
+            opcion.selected = ma.value === datos.mes_seleccionado;
+            mesAnioSelect.appendChild(opcion);
+        });
+        checkNegativeBalance(datos.saldo_total);
+    }
+
+    // El formulario del balance inicial toma el token CSRF de la cookie (la página no lo lleva)
+    function completarCsrf() {
+        var cookie = document.cookie.split('; ').find(c => c.startsWith('csrftoken='));
+        document.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(function(campo) {
+            if (cookie) campo.value = decodeURIComponent(cookie.split('=')[1]);
+        });
+    }
+
+    function mostrarError(nombre) {
+        return error => console.error('Error al cargar el widget ' + nombre + ':', error);
+    }
+
+    if (dashboard) {
+        // Todos los widgets se piden a la vez; cada uno se dibuja en cuanto llega
+        var resumen = pedirWidget('resumen');
+        var widgets = {
+            'categorias': mostrarCategorias,
+            'gastos-mensuales': crearGraficoGastosMes,
+            'objetivos': mostrarObjetivos,
+            'ultimas': mostrarUltimas
+        };
+        var pedidos = {};
+        Object.keys(widgets).forEach(nombre => { pedidos[nombre] = pedirWidget(nombre); });
+
+        resumen.then(function(datos) {
+            if (datos.ingresos > 0 || datos.gastos > 0) {
+                document.getElementById('dashboard-datos').hidden = false;
+                mostrarResumen(datos);
+                Object.keys(widgets).forEach(function(nombre) {
+                    pedidos[nombre].then(widgets[nombre]).catch(mostrarError(nombre));
+                });
+                // El gráfico de evolución mide el ancho del canvas: se pide con la sección visible
+                if (ctxEvolucion && rangoEvolucion) cargarEvolucion();
+            } else if (!datos.tiene_transacciones) {
+                completarCsrf();
+                document.getElementById('dashboard-sin-transacciones').hidden = false;
+            } else {
+                document.getElementById('dashboard-sin-gastos').hidden = false;
+            }
+        }).catch(mostrarError('resumen'));
+        // Si no se van a mostrar, los demás pedidos no deben dejar errores sin manejar
+        Object.values(pedidos).forEach(pedido => pedido.catch(() => {}));
+    }
+
     // Selector de periodo
     const mesAnioSelect = document.getElementById('mes_anio');
     if (mesAnioSelect) {
@@ -213,6 +487,8 @@ document.addEventListener('DOMContentLoaded', function() {
                     if (data.recomendaciones) {
                         // Usar la librería marked para renderizar Markdown
                         recomendacionesTexto.innerHTML = marked.parse(data.recomendaciones);
+                    } else if (data.error) {
+                        recomendacionesTexto.textContent = data.error;
                     } else {
                         recomendacionesTexto.textContent = "No se pudieron generar recomendaciones.";
                     }
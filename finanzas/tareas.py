@@ -0,0 +1,130 @@
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .correos import encolar_correo
+from .exportaciones import CONTENT_TYPE_EXCEL, archivo_excel
+from .models import Tarea, Transaccion
+from .resumen import nombre_mes, rango_mes
+
+logger = logging.getLogger(__name__)
+
+
+def generar_excel_transacciones(usuario, mes=None, anio=None):
+    """
+    Genera el Excel con las transacciones del usuario en el mes indicado, o con todo el
+    historial si no se indica mes. Devuelve un archivo temporal posicionado al inicio.
+    """
+    transacciones = Transaccion.objects.filter(usuario=usuario)
+    if mes and anio:
+        inicio_mes, fin_mes = rango_mes(anio, mes)
+        transacciones = transacciones.filter(fecha__gte=inicio_mes, fecha__lt=fin_mes)
+        titulo_hoja = "Transacciones del Mes"
+    else:
+        titulo_hoja = "Transacciones"
+
+    return archivo_excel(transacciones.order_by("fecha", "id"), titulo_hoja=titulo_hoja)
+
+
+def enviar_notificacion_transacciones(usuario, mes, anio):
+    """
+    Genera el Excel del mes y encola el correo que lo lleva adjunto.
+    """
+    with generar_excel_transacciones(usuario, mes, anio) as excel_file:
+        contenido = excel_file.read()
+
+    periodo = nombre_mes(date(anio, mes, 1))
+    asunto = f"Transacciones del mes {periodo}"
+    mensaje = f"Hola {usuario.first_name},\n\nAdjunto encontrarás el archivo Excel con todas las transacciones del mes {periodo}.\n\nSaludos,\nEcoFinance"
+    encolar_correo(
+        asunto,
+        mensaje,
+        settings.DEFAULT_FROM_EMAIL,
+        [usuario.email],
+        usuario=usuario,
+        adjunto=(f"transacciones_{mes}_{anio}.xlsx", contenido, CONTENT_TYPE_EXCEL)
+    )
+
+
+def _enviar_transacciones_mes(tarea):
+    enviar_notificacion_transacciones(tarea.usuario, tarea.mes, tarea.anio)
+
+
+# Función que ejecuta cada tipo de tarea
+EJECUTORES = {
+    'ENVIAR_TRANSACCIONES_MES': _enviar_transacciones_mes,
+}
+
+# Qué queda hecho cuando una tarea de cada tipo está TERMINADA. El Excel del mes solo queda
+# en la bandeja de salida: el correo lo envía después procesar_correos (ver correos.py)
+RESULTADOS = {
+    'ENVIAR_TRANSACCIONES_MES': 'correo_encolado',
+}
+
+
+def encolar_tarea(usuario, tipo, anio, mes):
+    """
+    Encola una tarea, salvo que ya haya una activa (en cola o ejecutándose) del mismo
+    usuario, tipo y mes; en ese caso se devuelve esa. Devuelve (tarea, creada).
+    """
+    activas = Tarea.objects.filter(usuario=usuario, tipo=tipo, anio=anio, mes=mes, estado__in=Tarea.ESTADOS_ACTIVOS)
+    tarea = activas.first()
+    if tarea is not None:
+        return tarea, False
+    try:
+        with transaction.atomic():
+            return Tarea.objects.create(usuario=usuario, tipo=tipo, anio=anio, mes=mes), True
+    except IntegrityError:
+        # Otra petición la creó entre la consulta y el insert (restricción tarea_activa_unica)
+        return activas.get(), False
+
+
+def tomar_siguiente():
+    """
+    Marca como EJECUTANDO la tarea en cola más antigua y la devuelve (None si no hay).
+    Las filas bloqueadas por otro worker se saltan.
+    """
+    with transaction.atomic():
+        tarea = (
+            Tarea.objects.select_for_update(skip_locked=True)
+            .filter(estado='EN_COLA')
+            .order_by('fecha_creacion', 'id')
+            .first()
+        )
+        if tarea is None:
+            return None
+        tarea.estado = 'EJECUTANDO'
+        tarea.fecha_inicio = timezone.now()
+        tarea.save(update_fields=['estado', 'fecha_inicio'])
+    return tarea
+
+
+def ejecutar(tarea):
+    """
+    Ejecuta una tarea ya tomada y registra el resultado (TERMINADA o FALLIDA).
+    """
+    try:
+        with transaction.atomic():
+            EJECUTORES[tarea.tipo](tarea)
+    except Exception as e:
+        logger.exception('Error ejecutando la tarea %s', tarea.id)
+        tarea.estado = 'FALLIDA'
+        tarea.error = f'{type(e).__name__}: {e}'
+    else:
+        tarea.estado = 'TERMINADA'
+    tarea.fecha_fin = timezone.now()
+    tarea.save(update_fields=['estado', 'error', 'fecha_fin'])
+    return tarea
+
+
+def reencolar_abandonadas(limite):
+    """
+    Devuelve a la cola las tareas que llevan más de ``limite`` (timedelta) ejecutándose,
+    por ejemplo porque el worker que las tomó se detuvo. Devuelve cuántas se reencolaron.
+    """
+    return Tarea.objects.filter(
+        estado='EJECUTANDO', fecha_inicio__lt=timezone.now() - limite
+    ).update(estado='EN_COLA', fecha_inicio=None)
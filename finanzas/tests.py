@@ -1,3 +1,1320 @@
-from django.test import TestCase
+import csv
+import json
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from dateutil.relativedelta import relativedelta
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import acumulados, cache_dashboard, correos, evolucion, exportaciones, importaciones, instrumentacion, objetivos, openai_utils, recomendaciones, saldos, semillas, sintesis, tareas
+from .models import AcumuladoMensual, CorreoPendiente, ObjetivoAhorro, SerieRecurrente, Tarea, Transaccion
+from .openai_utils import ClienteFalso
+from .reglas import DIAS, MESES, Regla
+from .recurrentes import calcular_proxima_fecha, crear_serie, generar_transacciones_recurrentes
+from .views.dashboard import WIDGETS
+from .views.transacciones import ORDENES_CON_CURSOR
+
+
+class TransaccionesWebTestCase(TestCase):
+    """
+    Crea transacciones desde la vista y las edita desde el admin, como un usuario.
+    """
+
+    def setUp(self):
+        self.usuario = User.objects.create_superuser('ana@example.com', 'ana@example.com', 'clave')
+        self.client.force_login(self.usuario)
+
+    def crear(self, **datos):
+        datos = {'monto': '1500', 'descripcion': 'Almuerzo', 'categoria': 'Comida', 'tipo': 'GASTO', **datos}
+        self.client.post(reverse('nueva_transaccion'), datos)
+        return Transaccion.objects.filter(usuario=self.usuario).latest('id')
+
+    def editar(self, transaccion, **cambios):
+        # Las transacciones solo se editan desde el admin
+        datos = {
+            'usuario': transaccion.usuario_id,
+            'descripcion': transaccion.descripcion,
+            'monto': transaccion.monto,
+            'tipo': transaccion.tipo,
+            'fecha': transaccion.fecha,
+            'categoria': transaccion.categoria or '',
+            'fecha_inicio': transaccion.fecha_inicio,
+            **cambios,
+        }
+        response = self.client.post(reverse('admin:finanzas_transaccion_change', args=[transaccion.id]), datos)
+        self.assertEqual(response.status_code, 302)
+        transaccion.refresh_from_db()
+        return transaccion
+
+
+class AcumuladosTests(TransaccionesWebTestCase):
+    """
+    Los acumulados mensuales se mantienen al crear, editar y eliminar transacciones: después
+    de cada cambio deben coincidir con los recalculados desde las transacciones.
+    """
+
+    def guardado(self, anio, mes, tipo, categoria):
+        acumulado = AcumuladoMensual.objects.filter(
+            usuario=self.usuario, anio=anio, mes=mes, tipo=tipo, categoria=categoria
+        ).first()
+        return (acumulado.total, acumulado.cantidad) if acumulado else (Decimal('0'), 0)
+
+    def assertCoinciden(self):
+        self.assertEqual(acumulados.buscar_diferencias([self.usuario]), [])
+
+    def test_alta(self):
+        transaccion = self.crear()
+        self.crear(monto='500', categoria='')
+        self.assertCoinciden()
+        fecha = transaccion.fecha
+        self.assertEqual(self.guardado(fecha.year, fecha.month, 'GASTO', 'Comida'), (Decimal('1500'), 1))
+        self.assertEqual(self.guardado(fecha.year, fecha.month, 'GASTO', ''), (Decimal('500'), 1))
+
+    def test_edicion_de_monto(self):
+        transaccion = self.crear()
+        self.crear(monto='200')
+        self.editar(transaccion, monto='900')
+        self.assertCoinciden()
+        self.assertEqual(self.guardado(transaccion.fecha.year, transaccion.fecha.month, 'GASTO', 'Comida'), (Decimal('1100'), 2))
+
+    def test_edicion_de_fecha_tipo_y_categoria(self):
+        transaccion = self.crear()
+        anterior = transaccion.fecha
+        self.editar(transaccion, fecha='2023-02-28', tipo='INGRESO', categoria='Sueldo')
+        self.assertCoinciden()
+        self.assertEqual(self.guardado(anterior.year, anterior.month, 'GASTO', 'Comida'), (Decimal('0'), 0))
+        self.assertEqual(self.guardado(2023, 2, 'INGRESO', 'Sueldo'), (Decimal('1500'), 1))
+
+    def test_edicion_a_sin_categoria(self):
+        transaccion = self.crear()
+        self.editar(transaccion, categoria='')
+        self.assertCoinciden()
+
+    def test_eliminacion(self):
+        transaccion = self.crear()
+        self.crear(monto='300')
+        self.client.post(reverse('eliminar_transaccion', args=[transaccion.id]))
+        self.assertCoinciden()
+        self.assertEqual(self.guardado(transaccion.fecha.year, transaccion.fecha.month, 'GASTO', 'Comida'), (Decimal('300'), 1))
+
+    def test_eliminacion_en_bloque_desde_el_admin(self):
+        ids = [self.crear(monto=str(monto)).id for monto in (100, 200, 300)]
+        self.client.post(reverse('admin:finanzas_transaccion_changelist'), {
+            'action': 'delete_selected', '_selected_action': ids[:2], 'post': 'yes',
+        })
+        self.assertEqual(Transaccion.objects.filter(usuario=self.usuario).count(), 1)
+        self.assertCoinciden()
+
+    def test_registrar_cambio_entre_meses(self):
+        transaccion = Transaccion.objects.create(
+            usuario=self.usuario, descripcion='Arriendo', monto=Decimal('400000'), tipo='GASTO',
+            categoria='Hogar', fecha=date(2024, 1, 31)
+        )
+        acumulados.registrar_altas([transaccion])
+        anterior = Transaccion.objects.get(pk=transaccion.pk)
+        transaccion.fecha = date(2024, 2, 1)
+        transaccion.save()
+        acumulados.registrar_cambio(anterior, transaccion)
+        self.assertCoinciden()
+        self.assertEqual(self.guardado(2024, 1, 'GASTO', 'Hogar'), (Decimal('0'), 0))
+        self.assertEqual(self.guardado(2024, 2, 'GASTO', 'Hogar'), (Decimal('400000'), 1))
+
+
+class SaldosTests(TransaccionesWebTestCase):
+    """
+    El saldo actual y los saldos diarios se mantienen al crear, editar y eliminar
+    transacciones: deben coincidir con los recalculados desde las transacciones.
+    """
+
+    def recalculado(self, hasta=None):
+        transacciones = Transaccion.objects.filter(usuario=self.usuario)
+        if hasta is not None:
+            transacciones = transacciones.filter(fecha__lte=hasta)
+        return sum((saldos.efecto(t.tipo, t.monto) for t in transacciones), Decimal('0'))
+
+    def assertCoinciden(self):
+        self.assertEqual(saldos.buscar_diferencias([self.usuario]), [])
+        self.assertEqual(saldos.saldo_actual(self.usuario), self.recalculado())
+
+    def test_alta(self):
+        self.crear(monto='100000', tipo='INGRESO', categoria='Sueldo')
+        self.crear()
+        self.assertCoinciden()
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('98500'))
+
+    def test_edicion_de_monto(self):
+        transaccion = self.crear()
+        self.editar(transaccion, monto='900')
+        self.assertCoinciden()
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('-900'))
+
+    def test_edicion_de_fecha_y_tipo(self):
+        transaccion = self.crear()
+        self.crear(monto='500')
+        self.editar(transaccion, fecha='2024-01-05', tipo='INGRESO')
+        self.assertCoinciden()
+        self.assertEqual(saldos.saldo_al(self.usuario, date(2024, 1, 4)), Decimal('0'))
+        self.assertEqual(saldos.saldo_al(self.usuario, date(2024, 1, 5)), Decimal('1500'))
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('1000'))
+
+    def test_eliminacion(self):
+        transaccion = self.crear(monto='2000', tipo='INGRESO', categoria='Sueldo')
+        self.crear(monto='300')
+        self.client.post(reverse('eliminar_transaccion', args=[transaccion.id]))
+        self.assertCoinciden()
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('-300'))
+
+    def test_saldo_al_cierre_de_cada_dia(self):
+        for fecha, monto, tipo in (
+            ('2024-03-01', '100000', 'INGRESO'), ('2024-03-01', '2500', 'GASTO'),
+            ('2024-03-10', '40000', 'GASTO'), ('2099-01-01', '7000', 'INGRESO'),
+        ):
+            self.editar(self.crear(monto=monto, tipo=tipo), fecha=fecha)
+        self.assertCoinciden()
+        for fecha in (date(2024, 2, 29), date(2024, 3, 1), date(2024, 3, 5), date(2024, 3, 10), date(2098, 12, 31)):
+            with self.subTest(fecha=fecha):
+                self.assertEqual(saldos.saldo_al(self.usuario, fecha), self.recalculado(fecha))
+        # El saldo actual incluye las transacciones de fecha futura
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('64500'))
+
+
+class ImportacionTests(TestCase):
+    """
+    Volver a importar el mismo archivo no duplica transacciones (las filas iguales dentro de un
+    archivo sí se guardan todas), y los acumulados y saldos quedan conciliados.
+    """
+
+    EXTRACTO = (
+        'fecha,descripcion,monto\n'
+        '2024-03-01,Pan,-1200\n'
+        '2024-03-02,Sueldo,500000\n'
+        '2024-03-01,Pan,-1200\n'
+        '2024-04-15,Arriendo,-350000\n'
+        '2024-04-15,Café,-2000\n'
+    )
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        self.client.force_login(self.usuario)
+
+    def importar(self, contenido):
+        archivo = SimpleUploadedFile('extracto.csv', contenido.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('importar_transacciones'), {'archivo': archivo})
+            final = json.loads(b''.join(response.streaming_content).decode().splitlines()[-1])
+        self.assertTrue(final['terminada'])
+        return final['importadas'], final['duplicadas']
+
+    def assertConciliado(self):
+        self.assertEqual(acumulados.buscar_diferencias([self.usuario]), [])
+        self.assertEqual(saldos.buscar_diferencias([self.usuario]), [])
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('145600'))
+
+    def test_reimportar_el_mismo_archivo(self):
+        version = cache_dashboard.version(self.usuario.id)
+        self.assertEqual(self.importar(self.EXTRACTO), (5, 0))
+        self.assertNotEqual(cache_dashboard.version(self.usuario.id), version)
+        self.assertConciliado()
+
+        self.assertEqual(self.importar(self.EXTRACTO), (0, 5))
+        self.assertEqual(Transaccion.objects.filter(usuario=self.usuario).count(), 5)
+        self.assertEqual(Transaccion.objects.filter(usuario=self.usuario, descripcion='Pan').count(), 2)
+        self.assertConciliado()
+
+    def test_reimportar_en_lotes_con_filas_nuevas(self):
+        # Con lotes de dos filas los dos "Pan" del archivo quedan en lotes distintos
+        progreso = list(importaciones.importar(self.usuario, BytesIO(self.EXTRACTO.encode()), 'csv', lote=2))[-1]
+        self.assertEqual((progreso.importadas, progreso.duplicadas), (5, 0))
+        # Un tercer "Pan" igual a los dos guardados y una fila nueva, en lotes de dos filas
+        extracto = self.EXTRACTO + '2024-03-01,Pan,-1200\n2024-05-01,Luz,-30000\n'
+        progreso = list(importaciones.importar(self.usuario, BytesIO(extracto.encode()), 'csv', lote=2))[-1]
+        self.assertEqual((progreso.importadas, progreso.duplicadas), (2, 5))
+        self.assertEqual(Transaccion.objects.filter(usuario=self.usuario, descripcion='Pan').count(), 3)
+        self.assertEqual(acumulados.buscar_diferencias([self.usuario]), [])
+        self.assertEqual(saldos.buscar_diferencias([self.usuario]), [])
+        self.assertEqual(saldos.saldo_actual(self.usuario), Decimal('145600') - Decimal('1200') - Decimal('30000'))
+
+
+class GeneradorRecurrentesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+
+    def crear_serie(self, periodicidad, fecha_inicio, fecha_fin=None):
+        base = Transaccion(
+            usuario=self.usuario, descripcion='Arriendo', monto=Decimal('400000'), tipo='GASTO',
+            categoria='Hogar', fecha=fecha_inicio, es_recurrente=True, periodicidad=periodicidad,
+            fecha_inicio=fecha_inicio, fecha_fin=fecha_fin,
+        )
+        base.serie_recurrente = crear_serie(base)
+        base.save()
+        acumulados.registrar_altas([base])
+        return base.serie_recurrente
+
+    def fechas(self, serie):
+        return list(Transaccion.objects.filter(serie_recurrente=serie).order_by('fecha').values_list('fecha', flat=True))
+
+    def test_genera_las_ocurrencias_atrasadas(self):
+        serie = self.crear_serie('MENSUAL', date(2024, 1, 31))
+        creadas = generar_transacciones_recurrentes(self.usuario.id, date(2024, 4, 30))
+        self.assertEqual(creadas, 3)
+        self.assertEqual(self.fechas(serie), [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)])
+        serie.refresh_from_db()
+        self.assertEqual(serie.proxima_fecha, date(2024, 5, 31))
+        self.assertEqual(acumulados.buscar_diferencias([self.usuario]), [])
+
+    def test_no_duplica_ni_pasa_de_la_fecha_de_fin(self):
+        serie = self.crear_serie('SEMANAL', date(2024, 1, 1), fecha_fin=date(2024, 1, 20))
+        generar_transacciones_recurrentes(self.usuario.id, date(2024, 1, 10))
+        self.assertEqual(generar_transacciones_recurrentes(self.usuario.id, date(2024, 1, 10)), 0)
+        generar_transacciones_recurrentes(self.usuario.id, date(2024, 3, 1))
+        self.assertEqual(self.fechas(serie), [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)])
+        self.assertIsNone(SerieRecurrente.objects.get(pk=serie.pk).proxima_fecha)
+
+    def test_la_migracion_de_plantillas_calcula_la_proxima_fecha_como_el_generador(self):
+        # Series anteriores a la plantilla: la migración 0007 parte de la última fecha generada
+        poblar_plantillas = import_module('finanzas.migrations.0007_serierecurrente_plantilla').poblar_plantillas
+        casos = [
+            ('MENSUAL', date(2023, 1, 31), date(2023, 2, 28)),
+            ('MENSUAL', date(2024, 1, 30), date(2024, 2, 29)),
+            ('ANUAL', date(2020, 2, 29), date(2021, 2, 28)),
+            ('SEMANAL', date(2024, 1, 3), date(2024, 2, 14)),
+        ]
+        series = []
+        for periodicidad, inicio, ultima in casos:
+            serie = SerieRecurrente.objects.create(usuario=self.usuario, activa=True)
+            for fecha in (inicio, ultima):
+                Transaccion.objects.create(
+                    usuario=self.usuario, descripcion='Cuota', monto=Decimal('100'), tipo='GASTO', fecha=fecha,
+                    es_recurrente=True, periodicidad=periodicidad, fecha_inicio=inicio, serie_recurrente=serie,
+                )
+            series.append(serie)
+        poblar_plantillas(apps, None)
+        for serie, (periodicidad, inicio, ultima) in zip(series, casos):
+            serie.refresh_from_db()
+            self.assertEqual(serie.proxima_fecha, calcular_proxima_fecha(periodicidad, inicio, None, ultima))
+        self.assertEqual(series[0].proxima_fecha, date(2023, 3, 31))
+        self.assertEqual(series[2].proxima_fecha, date(2022, 2, 28))
+
+
+class CacheDashboardTests(TestCase):
+    """
+    Los widgets responden 304 mientras no cambie la versión de la caché del usuario: todo
+    cambio que se vea en el dashboard debe incrementarla.
+    """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        self.client.force_login(self.usuario)
+
+    def ultimas(self, etag=None):
+        cabeceras = {'If-None-Match': etag} if etag else {}
+        return self.client.get(reverse('dashboard_widget', args=['ultimas']), headers=cabeceras)
+
+    def test_eliminar_una_serie_sin_transacciones_futuras_invalida_los_widgets(self):
+        hoy = timezone.now().date()
+        base = Transaccion(
+            usuario=self.usuario, descripcion='Gimnasio', monto=Decimal('25000'), tipo='GASTO',
+            fecha=hoy - timedelta(days=7), es_recurrente=True, periodicidad='SEMANAL', fecha_inicio=hoy - timedelta(days=7),
+        )
+        base.serie_recurrente = crear_serie(base)
+        base.save()
+        # La ocurrencia de hoy aún no se generó: el widget la muestra como virtual
+        response = self.ultimas()
+        self.assertIn(hoy.isoformat(), [t['fecha'] for t in response.json()['transacciones']])
+        self.assertEqual(self.ultimas(response['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('eliminar_recurrente', args=[base.serie_recurrente_id]))
+
+        response = self.ultimas(response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(hoy.isoformat(), [t['fecha'] for t in response.json()['transacciones']])
+
+
+class BackendContado(locmem.EmailBackend):
+    """
+    Backend en memoria que cuenta las conexiones creadas y guarda cuántos bloques atomic()
+    había abiertos en cada envío.
+    """
+    conexiones = 0
+    bloques_en_envio = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        BackendContado.conexiones += 1
+
+    def send_messages(self, messages):
+        BackendContado.bloques_en_envio.append(len(connection.atomic_blocks))
+        return super().send_messages(messages)
+
+
+class BackendCaido(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('SMTP no disponible')
+
+
+@override_settings(EMAIL_BACKEND='finanzas.tests.BackendContado')
+class BandejaDeSalidaTests(TestCase):
+    """
+    Las vistas solo encolan correos en CorreoPendiente; procesar_correos los envía una vez,
+    con una sola conexión y fuera de la transacción que los reserva, y reintenta con espera
+    creciente los que fallan.
+    """
+
+    def setUp(self):
+        BackendContado.conexiones = 0
+        BackendContado.bloques_en_envio = []
+        self.usuario = User.objects.create_user('ana', 'ana@example.com', 'clave')
+        self.client.force_login(self.usuario)
+        sesion = self.client.session
+        sesion['goal_updates_notifications'] = True
+        sesion.save()
+
+    def encolar(self, cantidad):
+        for indice in range(cantidad):
+            correos.encolar_correo(f'Aviso {indice}', 'Hola', None, ['ana@example.com'], usuario=self.usuario)
+
+    def test_las_vistas_encolan_y_el_worker_envia_una_vez(self):
+        self.client.post(reverse('nuevo_objetivo'), {
+            'nombre': 'Viaje', 'monto_objetivo': '100000', 'monto_actual': '0', 'fecha_limite': '2030-01-01',
+        })
+        objetivo = ObjetivoAhorro.objects.get(usuario=self.usuario)
+        self.client.post(reverse('añadir_dinero_objetivo', args=[objetivo.id]), {'monto': '95000'})
+        asuntos = set(CorreoPendiente.objects.values_list('asunto', flat=True))
+        self.assertEqual(asuntos, {'Has Creado un Nuevo Objetivo de Ahorro', 'Aporte a tu Objetivo de Ahorro', '¡Casi cumples tu objetivo!'})
+        self.assertEqual(mail.outbox, [])
+
+        call_command('procesar_correos', '--una-vez', '--lote', '2', stdout=StringIO())
+        self.assertEqual(sorted(m.subject for m in mail.outbox), sorted(asuntos))
+        self.assertEqual(BackendContado.conexiones, 1)
+        self.assertFalse(CorreoPendiente.objects.exclude(estado='ENVIADO').exists())
+
+        call_command('procesar_correos', '--una-vez', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+        # Con la cola vacía no se abre ninguna conexión
+        self.assertEqual(BackendContado.conexiones, 1)
+
+    def test_el_envio_ocurre_fuera_de_la_transaccion_de_la_reserva(self):
+        self.encolar(3)
+        correos.vaciar_bandeja()
+        self.assertEqual(BackendContado.bloques_en_envio, [len(connection.atomic_blocks)] * 3)
+
+    def test_un_lote_reservado_no_lo_toma_otro_worker(self):
+        self.encolar(3)
+        reservados = correos.reservar_pendientes(lote=2)
+        self.assertEqual(len(reservados), 2)
+        self.assertEqual([c.id for c in correos.reservar_pendientes(lote=5)], [CorreoPendiente.objects.order_by('id').last().id])
+        self.assertEqual(correos.reservar_pendientes(lote=5), [])
+        # Al vencer la reserva (el worker murió sin confirmar) los correos vuelven a la cola
+        CorreoPendiente.objects.filter(id__in=[c.id for c in reservados]).update(proximo_intento=timezone.now())
+        self.assertEqual(len(correos.reservar_pendientes(lote=5)), 2)
+
+    @override_settings(EMAIL_BACKEND='finanzas.tests.BackendCaido')
+    def test_reintentos_con_espera_creciente(self):
+        self.encolar(1)
+        for intento in range(1, correos.MAX_INTENTOS + 1):
+            antes = timezone.now()
+            with self.assertLogs('finanzas.correos', 'WARNING'):
+                self.assertEqual(correos.vaciar_bandeja(), (0, 1))
+            correo = CorreoPendiente.objects.get()
+            self.assertEqual(correo.intentos, intento)
+            self.assertIn('SMTP no disponible', correo.ultimo_error)
+            if intento < correos.MAX_INTENTOS:
+                self.assertEqual(correo.estado, 'PENDIENTE')
+                espera = correos.espera_reintento(intento)
+                self.assertTrue(antes + espera <= correo.proximo_intento <= timezone.now() + espera)
+                # Hasta que vence la espera no se vuelve a intentar
+                self.assertEqual(correos.vaciar_bandeja(), (0, 0))
+                CorreoPendiente.objects.update(proximo_intento=timezone.now())
+        self.assertEqual(correo.estado, 'FALLIDO')
+        self.assertEqual(correos.espera_reintento(2), 2 * correos.espera_reintento(1))
+        self.assertEqual(mail.outbox, [])
+
+
+class ClienteConError(ClienteFalso):
+    async def _crear(self, model, messages, **kwargs):
+        self.llamadas.append(messages)
+        raise RuntimeError('401 Unauthorized: clave sk-secreta inválida')
+
+
+@override_settings(OPENAI_CLIENTE='falso', RECOMENDACIONES_LIMITE_POR_HORA=10)
+class RecomendacionesTests(TestCase):
+    """
+    Recomendaciones con el cliente falso: caché por hash de la síntesis del mes, candado por
+    usuario, cupo por hora, tiempo máximo y errores del servicio.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.cliente = ClienteFalso()
+        openai_utils.usar_cliente(self.cliente)
+        self.addCleanup(openai_utils.usar_cliente, None)
+        self.usuario = User.objects.create_user('ana', 'ana@example.com', 'clave')
+        self.client.force_login(self.usuario)
+        self.hoy = timezone.now().date()
+        self.agregar('Supermercado', '45000')
+
+    def agregar(self, descripcion, monto, fecha=None):
+        Transaccion.objects.create(
+            usuario=self.usuario, descripcion=descripcion, monto=Decimal(monto), tipo='GASTO',
+            categoria='Comida', fecha=fecha or self.hoy,
+        )
+
+    def pedir(self):
+        response = self.client.get(reverse('generar_recomendaciones'))
+        return response.status_code, response.json()
+
+    def test_en_cache_mientras_no_cambien_las_transacciones(self):
+        self.assertEqual(self.pedir(), (200, {'recomendaciones': self.cliente.respuesta, 'desde_cache': False}))
+        self.assertEqual(self.pedir(), (200, {'recomendaciones': self.cliente.respuesta, 'desde_cache': True}))
+        self.assertEqual(len(self.cliente.llamadas), 1)
+
+        # Otra transacción cambia la síntesis (y su hash): se vuelve a consultar al modelo
+        self.agregar('Farmacia', '12000')
+        self.assertEqual(self.pedir()[1]['desde_cache'], False)
+        self.assertEqual(len(self.cliente.llamadas), 2)
+
+    def test_otro_mes_consulta_de_nuevo(self):
+        async_to_sync(recomendaciones.recomendar)(self.usuario.id, self.hoy.year, self.hoy.month)
+        anterior = self.hoy.replace(day=1) - timedelta(days=1)
+        self.agregar('Supermercado', '45000', fecha=anterior)
+        _, desde_cache = async_to_sync(recomendaciones.recomendar)(self.usuario.id, anterior.year, anterior.month)
+        self.assertFalse(desde_cache)
+        self.assertEqual(len(self.cliente.llamadas), 2)
+
+    def test_una_consulta_en_curso_por_usuario(self):
+        cache.add(f'recomendaciones:en_curso:{self.usuario.id}', 1)
+        estado, datos = self.pedir()
+        self.assertEqual(estado, 429)
+        self.assertIn('generando', datos['error'])
+        self.assertEqual(self.cliente.llamadas, [])
+
+    @override_settings(RECOMENDACIONES_LIMITE_POR_HORA=1)
+    def test_cupo_por_hora(self):
+        self.assertEqual(self.pedir()[0], 200)
+        # Una respuesta en caché no gasta cupo
+        self.assertEqual(self.pedir()[0], 200)
+        self.agregar('Farmacia', '12000')
+        estado, datos = self.pedir()
+        self.assertEqual(estado, 429)
+        self.assertIn('límite', datos['error'])
+        self.assertEqual(len(self.cliente.llamadas), 1)
+
+    @override_settings(OPENAI_TIMEOUT=0.05)
+    def test_tiempo_maximo(self):
+        openai_utils.usar_cliente(ClienteFalso(demora=1))
+        self.assertEqual(self.pedir()[0], 504)
+        # El candado se libera y el error no queda en caché
+        openai_utils.usar_cliente(self.cliente)
+        self.assertEqual(self.pedir(), (200, {'recomendaciones': self.cliente.respuesta, 'desde_cache': False}))
+
+    def test_error_del_servicio_no_se_muestra(self):
+        openai_utils.usar_cliente(ClienteConError())
+        with self.assertLogs('finanzas.recomendaciones', 'ERROR') as registro:
+            estado, datos = self.pedir()
+        self.assertEqual(estado, 502)
+        self.assertNotIn('sk-secreta', datos['error'])
+        self.assertIn('sk-secreta', registro.output[0])
+
+    def test_sin_transacciones_no_consulta_al_modelo(self):
+        Transaccion.objects.all().delete()
+        self.assertEqual(self.pedir(), (200, {'recomendaciones': 'No hay transacciones este mes para analizar.', 'desde_cache': False}))
+        self.assertEqual(self.cliente.llamadas, [])
+
+
+class SintesisTests(TestCase):
+    """
+    Síntesis del mes para el prompt: qué movimientos cuenta, qué considera recurrente y
+    cómo se recorta el texto para no pasar del presupuesto de tokens.
+    """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana', 'ana@example.com', 'clave')
+
+    def agregar(self, descripcion, monto, fecha, tipo='GASTO', categoria='Comida', **kwargs):
+        return Transaccion.objects.create(
+            usuario=self.usuario, descripcion=descripcion, monto=Decimal(monto), tipo=tipo,
+            categoria=categoria, fecha=fecha, **kwargs
+        )
+
+    def test_excluye_aportes_y_balance_inicial_de_las_categorias(self):
+        self.agregar('Supermercado', '30000', date(2024, 5, 3))
+        self.agregar(f'{objetivos.PREFIJO_APORTE} Vacaciones', '50000', date(2024, 5, 4), categoria='Ahorro')
+        self.agregar('Balance Inicial', '900000', date(2024, 5, 1), tipo='INGRESO', categoria='Otros')
+        self.agregar('Sueldo', '800000', date(2024, 5, 30), tipo='INGRESO', categoria='Sueldo')
+
+        s = sintesis.calcular_sintesis(self.usuario.id, 2024, 5)
+        self.assertEqual(s.cantidad, 2)
+        self.assertEqual((s.ingresos, s.gastos, s.aportes_objetivos), (Decimal('800000'), Decimal('30000'), Decimal('50000')))
+        self.assertEqual([t.nombre for t in s.gastos_categorias], ['Comida'])
+        self.assertEqual([t.nombre for t in s.ingresos_categorias], ['Sueldo'])
+        self.assertEqual([t.nombre for t in s.comercios], ['Supermercado'])
+
+    def test_detecta_recurrentes(self):
+        base = Transaccion(
+            usuario=self.usuario, descripcion='Arriendo', monto=Decimal('400000'), tipo='GASTO',
+            categoria='Hogar', fecha=date(2024, 5, 1), es_recurrente=True, periodicidad='MENSUAL',
+            fecha_inicio=date(2024, 5, 1),
+        )
+        base.serie_recurrente = crear_serie(base)
+        base.save()
+        for fecha in (date(2024, 3, 10), date(2024, 4, 10), date(2024, 5, 10)):
+            self.agregar('Streaming', '9000', fecha, categoria='Ocio')
+        # Solo un mes anterior: todavía no es recurrente
+        for fecha in (date(2024, 4, 15), date(2024, 5, 15)):
+            self.agregar('Cine', '7000', fecha, categoria='Ocio')
+        # Se repite en meses anteriores pero no en este
+        for fecha in (date(2024, 2, 5), date(2024, 3, 5), date(2024, 4, 5)):
+            self.agregar('Gimnasio', '25000', fecha, categoria='Salud')
+
+        s = sintesis.calcular_sintesis(self.usuario.id, 2024, 5)
+        self.assertEqual(
+            [(tipo, t.nombre, t.total) for tipo, t in s.recurrentes],
+            [('GASTO', 'Arriendo', Decimal('400000')), ('GASTO', 'Streaming', Decimal('9000'))],
+        )
+
+    def sintesis_extensa(self):
+        total = lambda nombre, monto: sintesis.TotalSintesis(nombre, Decimal(monto), 3, Decimal(monto) / 2)
+        return sintesis.SintesisMensual(
+            anio=2024, mes=5, cantidad=5000, ingresos=Decimal('9000000'), gastos=Decimal('7000000'),
+            aportes_objetivos=Decimal('100000'),
+            meses_previos=[(date(2024, m, 1), Decimal('8000000'), Decimal('6000000')) for m in (2, 3, 4)],
+            gastos_categorias=[total(f'Categoría de gasto {i}', 100000 - i * 1000) for i in range(40)],
+            ingresos_categorias=[total(f'Categoría de ingreso {i}', 50000 - i * 1000) for i in range(10)],
+            comercios=[total(f'Comercio {i}', 90000 - i * 1000) for i in range(10)],
+            recurrentes=[('GASTO', total(f'Suscripción {i}', 20000 - i * 1000)) for i in range(10)],
+        )
+
+    def secciones(self, texto):
+        secciones, actual = {}, None
+        for linea in texto.splitlines():
+            if linea.endswith(':') and not linea.startswith('- '):
+                actual = secciones.setdefault(linea, [])
+            elif actual is not None:
+                actual.append(linea)
+        return secciones
+
+    def test_respeta_el_presupuesto_de_tokens(self):
+        s = self.sintesis_extensa()
+        self.assertGreater(sintesis.estimar_tokens(sintesis.redactar_sintesis(s, 100000)), 600)
+        for presupuesto in (150, 300, 600, 1000):
+            with self.subTest(presupuesto=presupuesto):
+                self.assertLessEqual(sintesis.estimar_tokens(sintesis.redactar_sintesis(s, presupuesto)), presupuesto)
+
+    def test_orden_de_recorte(self):
+        s = self.sintesis_extensa()
+        completo = self.secciones(sintesis.redactar_sintesis(s, 100000))
+        vistos = set()
+        for presupuesto in range(1400, 140, -20):
+            secciones = self.secciones(sintesis.redactar_sintesis(s, presupuesto))
+            detalles = len(secciones.get('Comercios con más gasto:', [])) + len(secciones.get('Movimientos recurrentes:', []))
+            meses = len(secciones.get('Meses anteriores:', []))
+            resumidas = any(l.startswith('- Otras ') for l in secciones['Gastos por categoría:'] + secciones['Ingresos por categoría:'])
+            with self.subTest(presupuesto=presupuesto):
+                # Los meses anteriores se recortan solo cuando ya no quedan comercios ni recurrentes,
+                # y las categorías solo cuando ya no quedan meses
+                if meses < len(completo['Meses anteriores:']):
+                    self.assertEqual(detalles, 0)
+                if resumidas:
+                    self.assertEqual(meses, 0)
+            vistos.add((detalles < 20, meses < 3, resumidas))
+        # Los presupuestos probados pasan por las tres etapas del recorte
+        self.assertTrue({(True, False, False), (True, True, False), (True, True, True)} <= vistos)
+
+        # Las categorías recortadas se resumen con su cantidad y su total
+        gastos = self.secciones(sintesis.redactar_sintesis(s, 150))['Gastos por categoría:']
+        omitidas = s.gastos_categorias[len(gastos) - 1:]
+        suma = sum((t.total for t in omitidas), Decimal('0'))
+        self.assertEqual(gastos[-1], f'- Otras {len(omitidas)}: {exportaciones.formatear_monto(suma)}')
+
+
+class TareasTests(TestCase):
+    """
+    Las solicitudes repetidas del Excel del mes reutilizan la tarea activa, y el estado
+    muestra el paso de la cola a la ejecución y al resultado.
+    """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana', 'ana@example.com', 'clave')
+        self.client.force_login(self.usuario)
+
+    def solicitar(self):
+        response = self.client.post(reverse('enviar_transacciones_mes'))
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def estado(self, tarea_id):
+        return self.client.get(reverse('estado_tarea', args=[tarea_id])).json()
+
+    def test_las_solicitudes_repetidas_devuelven_la_misma_tarea(self):
+        primera, segunda = self.solicitar(), self.solicitar()
+        self.assertEqual(primera['tarea_id'], segunda['tarea_id'])
+        self.assertEqual((primera['creada'], segunda['creada']), (True, False))
+        # Mientras se ejecuta también se reutiliza
+        tareas.tomar_siguiente()
+        self.assertEqual(self.solicitar()['tarea_id'], primera['tarea_id'])
+        self.assertEqual(Tarea.objects.count(), 1)
+
+    def test_la_restriccion_impide_dos_tareas_activas(self):
+        datos = {'usuario': self.usuario, 'tipo': 'ENVIAR_TRANSACCIONES_MES', 'anio': 2024, 'mes': 5}
+        Tarea.objects.create(**datos)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Tarea.objects.create(**datos)
+        Tarea.objects.create(**datos, estado='TERMINADA')
+
+    def test_nueva_tarea_cuando_la_anterior_termino_o_fallo(self):
+        ids = {self.solicitar()['tarea_id']}
+        for estado in ('TERMINADA', 'FALLIDA'):
+            Tarea.objects.filter(estado='EN_COLA').update(estado=estado)
+            respuesta = self.solicitar()
+            self.assertTrue(respuesta['creada'])
+            ids.add(respuesta['tarea_id'])
+        self.assertEqual(len(ids), 3)
+
+    def test_estados_y_tiempos(self):
+        tarea_id = self.solicitar()['tarea_id']
+        estado = self.estado(tarea_id)
+        self.assertEqual((estado['estado'], estado['fecha_inicio'], estado['segundos_ejecucion']), ('EN_COLA', None, None))
+
+        tarea = tareas.tomar_siguiente()
+        estado = self.estado(tarea_id)
+        self.assertEqual(estado['estado'], 'EJECUTANDO')
+        self.assertIsNotNone(estado['fecha_inicio'])
+        self.assertIsNone(tareas.tomar_siguiente())
+
+        tareas.ejecutar(tarea)
+        estado = self.estado(tarea_id)
+        self.assertEqual((estado['estado'], estado['resultado'], estado['error']), ('TERMINADA', 'correo_encolado', ''))
+        self.assertGreaterEqual(estado['segundos_en_cola'], 0)
+        self.assertGreaterEqual(estado['segundos_ejecucion'], 0)
+        # Terminada significa encolada: el correo sale con procesar_correos
+        correo = CorreoPendiente.objects.get(usuario=self.usuario)
+        self.assertEqual(correo.estado, 'PENDIENTE')
+        self.assertTrue(correo.adjunto_nombre.endswith('.xlsx'))
+
+    def test_tarea_fallida(self):
+        tarea_id = self.solicitar()['tarea_id']
+
+        def fallar(tarea):
+            raise RuntimeError('sin disco')
+
+        with mock.patch.dict(tareas.EJECUTORES, {'ENVIAR_TRANSACCIONES_MES': fallar}), self.assertLogs('finanzas.tareas', 'ERROR'):
+            tareas.ejecutar(tareas.tomar_siguiente())
+        estado = self.estado(tarea_id)
+        self.assertEqual((estado['estado'], estado['resultado'], estado['error']), ('FALLIDA', None, 'RuntimeError: sin disco'))
+        self.assertIsNotNone(estado['fecha_fin'])
+        self.assertFalse(CorreoPendiente.objects.exists())
+
+    def test_tarea_de_otro_usuario(self):
+        tarea_id = self.solicitar()['tarea_id']
+        self.client.force_login(User.objects.create_user('beto', 'beto@example.com', 'clave'))
+        self.assertEqual(self.client.get(reverse('estado_tarea', args=[tarea_id])).status_code, 404)
+
+
+class EvolucionTests(TestCase):
+    """
+    Serie de evolución del saldo: totales por periodo con funciones de ventana, saldo al
+    cierre de cada periodo, periodos sin transacciones y reducción con LTTB.
+    """
+
+    DESDE, HASTA = date(2024, 1, 1), date(2024, 3, 31)
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        transacciones = [
+            Transaccion.objects.create(usuario=self.usuario, descripcion=descripcion, monto=Decimal(monto), tipo=tipo, fecha=fecha)
+            for fecha, descripcion, monto, tipo in (
+                (date(2023, 12, 20), 'Sueldo', '100000', 'INGRESO'),
+                (date(2024, 1, 1), 'Balance Inicial', '50000', 'INGRESO'),
+                (date(2024, 1, 3), 'Almuerzo', '2000', 'GASTO'),
+                (date(2024, 1, 3), 'Cena', '3000', 'GASTO'),
+                (date(2024, 1, 10), 'Venta', '20000', 'INGRESO'),
+                (date(2024, 2, 15), 'Luz', '10000', 'GASTO'),
+                (date(2024, 3, 31), 'Pan', '500', 'GASTO'),
+            )
+        ]
+        acumulados.registrar_altas(transacciones)
+        self.client.force_login(self.usuario)
+
+    def test_totales_y_saldo_por_mes(self):
+        saldo_inicial, puntos = evolucion.calcular_serie(self.usuario, self.DESDE, self.HASTA, 'mes')
+        self.assertEqual(saldo_inicial, Decimal('100000'))
+        # El balance inicial cuenta para el saldo pero no como ingreso
+        self.assertEqual(
+            [(p.fecha, p.ingresos, p.gastos, p.saldo) for p in puntos],
+            [
+                (date(2024, 1, 1), Decimal('20000'), Decimal('5000'), Decimal('165000')),
+                (date(2024, 2, 1), Decimal('0'), Decimal('10000'), Decimal('155000')),
+                (date(2024, 3, 1), Decimal('0'), Decimal('500'), Decimal('154500')),
+            ],
+        )
+
+    def test_saldo_al_cierre_de_cada_periodo(self):
+        for granularidad in evolucion.GRANULARIDADES:
+            _, puntos = evolucion.calcular_serie(self.usuario, self.DESDE, self.HASTA, granularidad)
+            cierres = [p.fecha - timedelta(days=1) for p in puntos[1:]] + [self.HASTA]
+            for punto, cierre in zip(puntos, cierres):
+                with self.subTest(granularidad=granularidad, fecha=punto.fecha):
+                    self.assertEqual(punto.saldo, saldos.saldo_al(self.usuario, cierre))
+
+    def test_periodos_sin_transacciones(self):
+        _, puntos = evolucion.calcular_serie(self.usuario, self.DESDE, self.HASTA, 'dia')
+        self.assertEqual([p.fecha for p in puntos], [self.DESDE + timedelta(days=n) for n in range(91)])
+        segundo = puntos[1]
+        self.assertEqual((segundo.ingresos, segundo.gastos, segundo.saldo), (Decimal('0'), Decimal('0'), Decimal('150000')))
+        _, semanas = evolucion.calcular_serie(self.usuario, self.DESDE, self.HASTA, 'semana')
+        self.assertEqual(len(semanas), 13)
+        self.assertTrue(all(p.fecha.weekday() == 0 for p in semanas))
+
+    def test_reducir_conserva_totales_y_extremos(self):
+        generador = random.Random(23)
+        saldo = Decimal('0')
+        puntos = []
+        for n in range(2000):
+            ingresos, gastos = Decimal(generador.randrange(0, 5000)), Decimal(generador.randrange(0, 5000))
+            saldo += ingresos - gastos
+            puntos.append(evolucion.Punto(date(2020, 1, 1) + timedelta(days=n), ingresos, gastos, saldo))
+        por_fecha = {p.fecha: p.saldo for p in puntos}
+        for maximo in (3, 10, 137, 1999, 2000, 5000):
+            with self.subTest(maximo=maximo):
+                reducidos = evolucion.reducir(puntos, maximo)
+                self.assertLessEqual(len(reducidos), maximo)
+                self.assertEqual(len(reducidos), min(maximo, len(puntos)))
+                self.assertEqual((reducidos[0].fecha, reducidos[-1].fecha), (puntos[0].fecha, puntos[-1].fecha))
+                self.assertTrue(all(a.fecha < b.fecha for a, b in zip(reducidos, reducidos[1:])))
+                self.assertTrue(all(p.saldo == por_fecha[p.fecha] for p in reducidos))
+                self.assertEqual(sum(p.ingresos for p in reducidos), sum(p.ingresos for p in puntos))
+                self.assertEqual(sum(p.gastos for p in reducidos), sum(p.gastos for p in puntos))
+
+    def test_rango_de_la_vista(self):
+        url = reverse('evolucion_saldo')
+        for consulta in (
+            '?desde=0001-01-01',
+            '?hasta=0001-01-01',
+            '?desde=0001-01-01&hasta=9999-12-31&granularidad=dia',
+            f'?desde=2014-01-01&hasta={date(2014, 1, 1) + timedelta(days=evolucion.MAX_DIAS + 1)}',
+        ):
+            with self.subTest(consulta):
+                self.assertEqual(self.client.get(url + consulta).status_code, 400)
+        for consulta in (
+            f'?desde=2014-01-01&hasta={date(2014, 1, 1) + timedelta(days=evolucion.MAX_DIAS)}&granularidad=dia',
+            '?desde=0001-01-02&hasta=0001-12-31&granularidad=semana',
+            '?desde=9999-01-01&hasta=9999-12-31&granularidad=mes',
+        ):
+            with self.subTest(consulta):
+                response = self.client.get(url + consulta)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(response.json()['puntos']), 200)
+
+
+class ExportacionPdfTests(TestCase):
+    """
+    Las filas del PDF tienen alto fijo: cada texto debe caber en una línea de su columna y
+    cada página llena debe caber entre los márgenes.
+    """
+    # Los valores más anchos de cada columna: letras anchas y el mayor monto de max_digits=10
+    FILAS_ANCHAS = [
+        (date(2024, 12, 28), 'W' * 80, 'M' * 40, 'INGRESO', Decimal('-99999999.99')),
+        (date(2024, 12, 28), 'Compra en supermercado Líder Express de la esquina', 'Alimentación y bebidas', 'GASTO', Decimal('99999999')),
+    ]
+
+    def setUp(self):
+        from reportlab.lib.pagesizes import letter
+
+        self.ancho, self.alto = letter
+
+    def test_cada_texto_cabe_en_su_columna(self):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        celdas = [(texto, exportaciones.FUENTE_FILAS_PDF) for fila in self.FILAS_ANCHAS for texto in exportaciones.fila_pdf(*fila)]
+        celdas += [(texto, ('Helvetica-Bold', 12)) for texto in exportaciones.COLUMNAS]
+        for indice, (texto, fuente) in enumerate(celdas):
+            columna = indice % len(exportaciones.COLUMNAS)
+            disponible = exportaciones.ANCHOS_COLUMNAS_PDF[columna] - 2 * exportaciones.RELLENO_CELDA_PDF
+            self.assertLessEqual(stringWidth(texto, *fuente), disponible, texto)
+        self.assertTrue(exportaciones.fila_pdf(*self.FILAS_ANCHAS[1])[1].endswith('…'))
+
+    def test_las_columnas_ocupan_el_ancho_entre_margenes(self):
+        self.assertEqual(sum(exportaciones.ANCHOS_COLUMNAS_PDF), self.ancho - 2 * exportaciones.PULGADA)
+
+    def test_una_pagina_llena_cabe_entre_los_margenes(self):
+        primera, resto = exportaciones.filas_por_pagina_pdf(self.alto)
+        disponible = self.alto - 2 * exportaciones.PULGADA
+        fila = exportaciones.fila_pdf(*self.FILAS_ANCHAS[0])
+        for filas, alto_disponible in ((primera, disponible - exportaciones.ALTO_TITULO_PDF), (resto, disponible)):
+            alto_tabla = exportaciones.tabla_pdf([fila] * filas).wrap(self.ancho, self.alto)[1]
+            self.assertLessEqual(alto_tabla, alto_disponible)
+            # Y no cabe una fila más: la página se aprovecha entera
+            alto_tabla = exportaciones.tabla_pdf([fila] * (filas + 1)).wrap(self.ancho, self.alto)[1]
+            self.assertGreater(alto_tabla, alto_disponible)
+
+    def test_paginas_del_pdf(self):
+        usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        primera, resto = exportaciones.filas_por_pagina_pdf(self.alto)
+        Transaccion.objects.bulk_create([
+            Transaccion(usuario=usuario, descripcion=descripcion, monto=monto, tipo=tipo, categoria=categoria, fecha=fecha)
+            for fecha, descripcion, categoria, tipo, monto in self.FILAS_ANCHAS * (primera + resto)
+        ])
+        transacciones = Transaccion.objects.filter(usuario=usuario).order_by('id')
+        self.assertEqual(exportaciones.generar_pdf(transacciones[:primera + resto], BytesIO()), 2)
+        self.assertEqual(exportaciones.generar_pdf(transacciones[:primera + resto + 1], BytesIO()), 3)
+        self.assertEqual(exportaciones.generar_pdf(transacciones.none(), BytesIO()), 1)
+
+
+class ExportacionFiltrosTests(TestCase):
+    """
+    Las exportaciones entregan las mismas transacciones que la lista con los mismos filtros
+    (mes, categoría y rango de fechas), en el mismo orden. En el Excel las fechas y los montos
+    son valores tipados, no texto.
+    """
+    CONSULTAS = [
+        '',
+        '?mes=2024-03',
+        '?mes=2024-03&categoria=Comida',
+        '?mes=3',
+        '?categoria=Transporte',
+        '?fecha_desde=2024-03-06&fecha_hasta=2024-04-01',
+        '?mes=2024-13&fecha_desde=fecha',  # Valores inválidos: se ignoran
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        otro = User.objects.create_user('luis@example.com', 'luis@example.com', 'clave')
+        filas = [
+            (cls.usuario, date(2024, 2, 29), 'Fin de febrero', 'Comida', '1500'),
+            (cls.usuario, date(2024, 3, 1), 'Pan', 'Comida', '1200.50'),
+            (cls.usuario, date(2024, 3, 10), 'Micro', 'Transporte', '800'),
+            (cls.usuario, date(2024, 3, 31), 'Cena', 'Comida', '25000'),
+            (cls.usuario, date(2024, 4, 1), 'Inicio de abril', 'Comida', '3000'),
+            (cls.usuario, date(2023, 3, 15), 'Marzo del año anterior', 'Comida', '900'),
+            (otro, date(2024, 3, 15), 'De otro usuario', 'Comida', '700'),
+        ]
+        Transaccion.objects.bulk_create([
+            Transaccion(usuario=usuario, fecha=fecha, descripcion=descripcion, categoria=categoria, monto=Decimal(monto), tipo='GASTO')
+            for usuario, fecha, descripcion, categoria, monto in filas
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def en_la_lista(self, consulta):
+        return [t.descripcion for t in self.client.get(reverse('lista_transacciones') + consulta).context['transacciones']]
+
+    def en_el_csv(self, consulta):
+        contenido = b''.join(self.client.get(reverse('descargar_transacciones') + consulta).streaming_content)
+        return [fila[1] for fila in list(csv.reader(contenido.decode('utf-8-sig').splitlines(), delimiter=';'))[1:]]
+
+    def en_el_pdf(self, consulta):
+        with mock.patch('finanzas.views.exportaciones.generar_pdf', wraps=exportaciones.generar_pdf) as generar:
+            response = self.client.get(reverse('descargar_transacciones_pdf') + consulta)
+        self.assertEqual(response.status_code, 200)
+        return list(generar.call_args.args[0].values_list('descripcion', flat=True))
+
+    def libro_excel(self, consulta):
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('descargar_transacciones_excel') + consulta)
+        return load_workbook(BytesIO(b''.join(response.streaming_content)))
+
+    def en_el_excel(self, consulta):
+        return [fila[1] for fila in self.libro_excel(consulta).active.iter_rows(min_row=2, values_only=True)]
+
+    def test_el_mes_con_anio_es_exacto(self):
+        self.assertEqual(self.en_la_lista('?mes=2024-03'), ['Cena', 'Micro', 'Pan'])
+        self.assertEqual(self.en_la_lista('?mes=3'), ['Cena', 'Micro', 'Pan', 'Marzo del año anterior'])
+
+    def test_mismas_transacciones_que_la_lista(self):
+        for consulta in self.CONSULTAS:
+            with self.subTest(consulta):
+                esperadas = self.en_la_lista(consulta)
+                self.assertEqual(self.en_el_csv(consulta), esperadas)
+                self.assertEqual(self.en_el_pdf(consulta), esperadas)
+                self.assertEqual(self.en_el_excel(consulta), esperadas)
+
+    def test_celdas_del_excel_tipadas(self):
+        hoja = self.libro_excel('?mes=2024-03&categoria=Comida').active
+        self.assertEqual([c.value for c in hoja[1]], exportaciones.COLUMNAS)
+        cena, pan = list(hoja.iter_rows(min_row=2))
+        for celda_fecha, fecha in ((cena[0], date(2024, 3, 31)), (pan[0], date(2024, 3, 1))):
+            self.assertTrue(celda_fecha.is_date)
+            self.assertEqual(celda_fecha.value.date(), fecha)
+            self.assertEqual(celda_fecha.number_format, exportaciones.FORMATO_FECHA_EXCEL)
+        for celda_monto, monto in ((cena[4], 25000), (pan[4], 1200.5)):
+            self.assertEqual(celda_monto.data_type, 'n')
+            self.assertEqual(celda_monto.value, monto)
+            self.assertEqual(celda_monto.number_format, exportaciones.FORMATO_MONTO_EXCEL)
+        self.assertEqual((pan[1].value, pan[2].value, pan[3].value), ('Pan', 'Comida', 'GASTO'))
+
+
+class RespuestasPorPartesTests(TestCase):
+    """
+    Las exportaciones y el progreso de la importación se envían por partes con WSGI y con
+    ASGI: con ASGI el contenido debe ser un iterador asíncrono, o Django lo lee entero en
+    memoria antes de enviarlo.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        Transaccion.objects.bulk_create([
+            Transaccion(usuario=cls.usuario, descripcion=f'Compra {i}', monto=Decimal(1000 + i), tipo='GASTO', fecha=date(2024, 1, 1 + i % 28))
+            for i in range(300)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    async def leer(self, response):
+        self.assertTrue(response.is_async)
+        return b''.join([parte async for parte in response.streaming_content])
+
+    async def test_exportaciones_por_asgi(self):
+        await self.async_client.aforce_login(self.usuario)
+        for nombre in ('descargar_transacciones', 'descargar_transacciones_pdf', 'descargar_transacciones_excel'):
+            with self.subTest(nombre):
+                response = await self.async_client.get(reverse(nombre))
+                contenido = await self.leer(response)
+                if 'Content-Length' in response:
+                    self.assertEqual(int(response['Content-Length']), len(contenido))
+                if nombre == 'descargar_transacciones':
+                    esperado = await sync_to_async(lambda: b''.join(self.client.get(reverse(nombre)).streaming_content))()
+                    self.assertEqual(contenido, esperado)
+
+    def test_exportaciones_por_wsgi(self):
+        response = self.client.get(reverse('descargar_transacciones'))
+        self.assertFalse(response.is_async)
+        self.assertEqual(b''.join(response.streaming_content).decode('utf-8-sig').count('\n'), 301)
+
+    async def test_progreso_de_la_importacion_por_asgi(self):
+        await self.async_client.aforce_login(self.usuario)
+        archivo = SimpleUploadedFile('extracto.csv', b'fecha,descripcion,monto\n2024-03-01,Pan,-1200\n2024-03-02,Sueldo,500000\n')
+        response = await self.async_client.post(reverse('importar_transacciones'), {'archivo': archivo})
+        final = json.loads((await self.leer(response)).decode().splitlines()[-1])
+        self.assertEqual((final['importadas'], final['terminada']), (2, True))
+
+
+class ListaPorCursorTests(TestCase):
+    """
+    Recorrer la lista con los cursores (hacia adelante y de vuelta) debe entregar cada fila
+    exactamente una vez, también cuando muchas filas empatan en las columnas del orden.
+    """
+    # Orden completo de cada orden de la lista (ver lista_transacciones)
+    ORDENES = {
+        '-fecha': ['-fecha', '-id'],
+        'fecha': ['fecha', 'id'],
+        '-monto': ['-monto', '-fecha', '-id'],
+        'monto': ['monto', 'fecha', 'id'],
+        'descripcion': ['descripcion', '-fecha', '-id'],
+        '-descripcion': ['-descripcion', '-fecha', '-id'],
+        'tipo': ['tipo', '-fecha', '-id'],
+        '-tipo': ['-tipo', '-fecha', '-id'],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        # Pocos valores distintos por columna: páginas que empiezan y terminan en medio de empates
+        Transaccion.objects.bulk_create([
+            Transaccion(
+                usuario=cls.usuario, descripcion=['Almuerzo', 'Bencina', 'Cine'][i % 3],
+                monto=Decimal([1000, 2500][i % 2]), tipo=['GASTO', 'INGRESO'][i % 5 == 0],
+                fecha=date(2024, 3, 1 + i % 4),
+            )
+            for i in range(57)
+        ])
+        # Una fila futura: la lista solo muestra hasta hoy
+        Transaccion.objects.create(usuario=cls.usuario, descripcion='Futura', monto=1, tipo='GASTO', fecha=date(2999, 1, 1))
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def pagina(self, orden, cursor=None):
+        parametros = {'orden': orden, **({'cursor': cursor} if cursor else {})}
+        return self.client.get(reverse('lista_transacciones'), parametros).context['transacciones']
+
+    def test_los_ordenes_de_la_prueba_son_los_de_la_lista(self):
+        self.assertEqual(set(self.ORDENES), ORDENES_CON_CURSOR)
+
+    def test_recorrido_hacia_adelante_y_hacia_atras(self):
+        for orden, ordenes in self.ORDENES.items():
+            with self.subTest(orden):
+                esperado = list(
+                    Transaccion.objects.filter(usuario=self.usuario, fecha__lte=date.today())
+                    .order_by(*ordenes).values_list('id', flat=True)
+                )
+                paginas = [self.pagina(orden)]
+                while paginas[-1].siguiente:
+                    paginas.append(self.pagina(orden, paginas[-1].siguiente))
+                self.assertEqual([t.id for pagina in paginas for t in pagina], esperado)
+
+                # De vuelta desde la última página: las mismas páginas en orden inverso
+                vuelta = [paginas[-1]]
+                while vuelta[-1].anterior:
+                    vuelta.append(self.pagina(orden, vuelta[-1].anterior))
+                self.assertEqual(
+                    [[t.id for t in pagina] for pagina in reversed(vuelta)],
+                    [[t.id for t in pagina] for pagina in paginas],
+                )
+
+    @skipUnless(connection.vendor == 'sqlite', 'El plan se revisa con EXPLAIN QUERY PLAN de SQLite')
+    def test_cada_pagina_recorre_un_indice_sin_ordenar(self):
+        for orden in self.ORDENES:
+            with self.subTest(orden):
+                segunda = self.pagina(orden, self.pagina(orden).siguiente)
+                with CaptureQueriesContext(connection) as consultas:
+                    self.pagina(orden, segunda.siguiente)
+                    self.pagina(orden, segunda.anterior)
+                paginas = [c['sql'] for c in consultas if 'FROM "finanzas_transaccion"' in c['sql'] and 'LIMIT' in c['sql']]
+                self.assertEqual(len(paginas), 2)
+                for sql in paginas:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                        plan = ' | '.join(str(fila[-1]) for fila in cursor.fetchall())
+                    self.assertNotIn('TEMP B-TREE', plan)
+                    self.assertIn('USING INDEX', plan)
+
+
+class ReglasTests(SimpleTestCase):
+    """
+    La expansión en forma cerrada (inicio + n pasos) frente a las expansiones de referencia
+    con relativedelta: ajuste a fin de mes, años bisiestos y fecha de fin.
+    """
+
+    @staticmethod
+    def desde_inicio(regla, desde, hasta):
+        # Referencia de la forma cerrada: inicio + relativedelta(n pasos) para cada n
+        if regla.frecuencia in DIAS:
+            paso = relativedelta(days=DIAS[regla.frecuencia] * regla.intervalo)
+        else:
+            paso = relativedelta(months=MESES[regla.frecuencia] * regla.intervalo)
+        limite = min(hasta, regla.fin) if regla.fin else hasta
+        fechas = []
+        n = 0
+        while (fecha := regla.inicio + paso * n) <= limite:
+            if fecha >= desde:
+                fechas.append(fecha)
+            n += 1
+        return fechas
+
+    @staticmethod
+    def paso_a_paso(regla, desde, hasta):
+        # Expansión anterior a las reglas: sumar el incremento a la fecha previa
+        if regla.frecuencia in DIAS:
+            incremento = relativedelta(days=DIAS[regla.frecuencia] * regla.intervalo)
+        else:
+            incremento = relativedelta(months=MESES[regla.frecuencia] * regla.intervalo)
+        limite = min(hasta, regla.fin) if regla.fin else hasta
+        fechas = []
+        fecha = regla.inicio
+        while fecha <= limite:
+            if fecha >= desde:
+                fechas.append(fecha)
+            fecha += incremento
+        return fechas
+
+    def test_mensual_desde_fin_de_mes(self):
+        regla = Regla('MENSUAL', date(2024, 1, 31))
+        self.assertEqual(regla.expandir(date(2024, 1, 1), date(2024, 6, 30)), [
+            date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31),
+            date(2024, 4, 30), date(2024, 5, 31), date(2024, 6, 30),
+        ])
+        self.assertEqual(regla.siguiente(date(2024, 2, 29)), date(2024, 3, 31))
+        # El paso a paso se queda en el día 29 desde febrero
+        self.assertEqual(self.paso_a_paso(regla, date(2024, 3, 1), date(2024, 3, 31)), [date(2024, 3, 29)])
+
+    def test_mensual_anclada_al_ultimo_dia(self):
+        regla = Regla('MENSUAL', date(2023, 2, 28), fin_de_mes=True)
+        self.assertEqual(regla.expandir(date(2023, 2, 1), date(2023, 5, 31)), [
+            date(2023, 2, 28), date(2023, 3, 31), date(2023, 4, 30), date(2023, 5, 31),
+        ])
+
+    def test_anual_desde_29_de_febrero(self):
+        regla = Regla('ANUAL', date(2020, 2, 29))
+        self.assertEqual(regla.expandir(date(2020, 1, 1), date(2028, 12, 31)), [
+            date(2020, 2, 29), date(2021, 2, 28), date(2022, 2, 28), date(2023, 2, 28),
+            date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29),
+        ])
+
+    def test_fecha_de_fin(self):
+        regla = Regla('SEMANAL', date(2024, 1, 1), fin=date(2024, 1, 15))
+        # El fin es inclusivo y acota aunque el rango pedido siga
+        self.assertEqual(regla.expandir(date(2023, 12, 1), date(2024, 12, 31)), [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)])
+        self.assertIsNone(regla.siguiente(date(2024, 1, 15)))
+        self.assertEqual(Regla('MENSUAL', date(2024, 1, 31), fin=date(2024, 2, 28)).expandir(date(2024, 1, 1), date(2024, 12, 31)), [date(2024, 1, 31)])
+        self.assertEqual(Regla('DIARIA', date(2024, 1, 10), fin=date(2024, 1, 9)).expandir(date(2024, 1, 1), date(2024, 1, 31)), [])
+
+    def test_rango_antes_del_inicio_o_regla_invalida(self):
+        self.assertEqual(Regla('DIARIA', date(2024, 5, 1)).expandir(date(2024, 1, 1), date(2024, 4, 30)), [])
+        self.assertEqual(Regla('QUINCENAL', date(2024, 5, 1)).expandir(date(2024, 1, 1), date(2024, 12, 31)), [])
+        self.assertEqual(Regla('SEMANAL', date(2024, 5, 1), intervalo=0).expandir(date(2024, 1, 1), date(2024, 12, 31)), [])
+
+    def test_propiedades_con_reglas_al_azar(self):
+        generador = random.Random(17)
+        hoy = date(2025, 6, 15)
+        for _ in range(1500):
+            frecuencia = generador.choice(['DIARIA', 'SEMANAL', 'MENSUAL', 'ANUAL'])
+            inicio = hoy - timedelta(days=generador.randint(0, 4 * 365))
+            if generador.random() < 0.4:
+                # Días 29 a 31: ajuste de febrero (bisiesto o no) y de los meses de 30 días
+                inicio = (inicio.replace(day=1) + relativedelta(months=1)) - timedelta(days=generador.randint(1, 3))
+            fin = inicio + timedelta(days=generador.randint(0, 6 * 365)) if generador.random() < 0.5 else None
+            regla = Regla(frecuencia, inicio, fin, intervalo=generador.choice([1, 1, 2, 3]))
+            desde = hoy - timedelta(days=generador.randint(0, 3 * 365))
+            hasta = desde + timedelta(days=generador.randint(0, 2 * 365))
+
+            with self.subTest(regla=regla, desde=desde, hasta=hasta):
+                fechas = regla.expandir(desde, hasta)
+                self.assertEqual(fechas, self.desde_inicio(regla, desde, hasta))
+                # El paso a paso solo coincide mientras el día de inicio exista en todos los meses
+                if frecuencia in DIAS or inicio.day <= 28:
+                    self.assertEqual(fechas, self.paso_a_paso(regla, desde, hasta))
+                self.assertTrue(all(a < b for a, b in zip(fechas, fechas[1:])))
+                self.assertTrue(all(desde <= fecha <= hasta and (fin is None or fecha <= fin) for fecha in fechas))
+                for anterior, proxima in zip(fechas, fechas[1:]):
+                    self.assertEqual(regla.siguiente(anterior), proxima)
+                self.assertEqual(list(regla.iterar(desde, hasta)), fechas)
+                self.assertEqual(list(regla.iterar(desde, hasta, descendente=True)), fechas[::-1])
+                corte = desde + timedelta(days=generador.randint(0, (hasta - desde).days))
+                self.assertEqual(regla.expandir(corte, hasta), [fecha for fecha in fechas if fecha >= corte])
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'finanzas.instrumentacion.MedicionMiddleware'})
+@override_settings(INSTRUMENTACION_ESTRICTA=True, OPENAI_CLIENTE='falso')
+class PresupuestoConsultasTests(TransactionTestCase):
+    """
+    Cada vista de PRESUPUESTO_CONSULTAS, con datos sembrados y la medición del middleware en
+    modo estricto: superar el presupuesto lanza PresupuestoConsultasExcedido. La medición debe
+    contar todas las consultas de la petición, también las que una exportación hace mientras
+    se envía. Es una TransactionTestCase porque dentro de la transacción de una TestCase cada
+    atomic() de las vistas agrega dos consultas (SAVEPOINT y RELEASE) que en producción no hay.
+    """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('ana@example.com', 'ana@example.com', 'clave')
+        semillas.sembrar_transacciones(self.usuario, 300)
+        semillas.sembrar_series(self.usuario, 5)
+        semillas.sembrar_objetivos(self.usuario, 3)
+        # Sin datos del dashboard de otra prueba en caché: se mide el peor caso
+        cache.clear()
+        # Con el cliente asíncrono el middleware se carga en otro hilo: el contador se instala
+        # aquí en la conexión ya abierta de este hilo, donde corren las consultas
+        instrumentacion.instalar()
+        self.client.force_login(self.usuario)
+        self.medidas = {}
+
+    def pedir(self, metodo, nombre, *args, datos=None, consulta=''):
+        with self.assertLogs('finanzas.instrumentacion', 'INFO') as registro, CaptureQueriesContext(connection) as consultas:
+            response = getattr(self.client, metodo)(reverse(nombre, args=args) + consulta, datos)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, nombre)
+        medicion = json.loads(registro.records[-1].getMessage())
+        self.assertEqual(medicion['vista'], nombre)
+        # COMMIT y ROLLBACK quedan en el registro de la conexión pero no pasan por execute_wrappers
+        ejecutadas = [consulta for consulta in consultas if consulta['sql'] not in ('COMMIT', 'ROLLBACK')]
+        self.assertEqual(medicion['consultas'], len(ejecutadas), nombre)
+        self.medidas.setdefault(nombre, []).append(medicion['consultas'])
+        return response
+
+    def test_vistas_dentro_de_su_presupuesto(self):
+        objetivo = ObjetivoAhorro.objects.create(
+            usuario=self.usuario, nombre='Vacaciones', monto_objetivo=Decimal('1000000'),
+            monto_actual=Decimal('100000'), fecha_limite=timezone.now().date() + timedelta(days=60),
+        )
+        serie = SerieRecurrente.objects.filter(usuario=self.usuario).first()
+        transaccion = Transaccion.objects.filter(usuario=self.usuario).first()
+
+        self.pedir('get', 'dashboard')
+        for nombre in WIDGETS:
+            self.pedir('get', 'dashboard_widget', nombre)
+        self.pedir('get', 'evolucion_saldo', consulta='?granularidad=semana')
+        self.pedir('get', 'lista_transacciones')
+        self.pedir('get', 'lista_transacciones', consulta='?orden=categoria&page=3')
+        self.pedir('post', 'nueva_transaccion', datos={'monto': '1500', 'descripcion': 'Pan', 'categoria': 'Comida', 'tipo': 'GASTO'})
+        for nombre in ('descargar_transacciones', 'descargar_transacciones_pdf', 'descargar_transacciones_excel'):
+            self.pedir('get', nombre)
+        self.pedir('get', 'lista_objetivos')
+        self.pedir('post', 'nuevo_objetivo', datos={'nombre': 'Auto', 'monto_objetivo': '5000000', 'monto_actual': '0', 'fecha_limite': '2030-01-01'})
+        self.pedir('post', 'editar_objetivo', objetivo.id, datos={
+            'nombre': 'Viaje', 'monto_objetivo': '1200000', 'monto_actual': '100000', 'fecha_limite': objetivo.fecha_limite,
+        })
+        self.pedir('post', 'añadir_dinero_objetivo', objetivo.id, datos={'monto': '50000'})
+        self.pedir('post', 'eliminar_dinero_objetivo', objetivo.id, datos={'monto': '20000'})
+        self.pedir('get', 'perfil_usuario')
+        self.pedir('post', 'establecer_presupuesto', datos={'monto': '900000'})
+        self.pedir('post', 'establecer_balance_inicial', datos={'balance_inicial': '250000'})
+        tarea = self.pedir('post', 'enviar_transacciones_mes').json()
+        self.pedir('get', 'estado_tarea', tarea['tarea_id'])
+        self.pedir('get', 'generar_recomendaciones')
+        self.pedir('post', 'eliminar_transaccion', transaccion.id)
+        self.pedir('post', 'eliminar_recurrente', serie.id)
+        self.pedir('post', 'eliminar_objetivo', objetivo.id)
+
+        self.assertEqual(set(self.medidas), set(settings.PRESUPUESTO_CONSULTAS))
+        # La exportación en CSV consulta las filas mientras se envía
+        self.assertGreater(self.medidas['descargar_transacciones'][0], 2)
+
+    async def test_exportacion_por_asgi(self):
+        await self.async_client.aforce_login(self.usuario)
+        with self.assertLogs('finanzas.instrumentacion', 'INFO') as registro:
+            response = await self.async_client.get(reverse('descargar_transacciones'))
+            # La petición se registra cuando termina de enviarse el cuerpo
+            self.assertEqual(registro.records, [])
+            contenido = b''.join([parte async for parte in response.streaming_content])
+        self.assertEqual(contenido.decode('utf-8-sig').count('\n'), 301)
+        self.assertGreater(json.loads(registro.records[-1].getMessage())['consultas'], 2)
+
+    def test_primera_transaccion_de_un_usuario_nuevo(self):
+        # Crea las filas de acumulados y saldos del usuario: es el caso con más consultas
+        for indice, (nombre, datos) in enumerate([
+            ('establecer_balance_inicial', {'balance_inicial': '250000'}),
+            ('nueva_transaccion', {
+                'monto': '30000', 'descripcion': 'Gimnasio', 'categoria': 'Salud', 'tipo': 'GASTO',
+                'es_recurrente': 'on', 'periodicidad': 'MENSUAL', 'fecha_inicio': timezone.now().date(),
+            }),
+        ]):
+            with self.subTest(nombre):
+                nuevo = User.objects.create_user(f'nuevo{indice}@example.com', f'nuevo{indice}@example.com', 'clave')
+                self.client.force_login(nuevo)
+                self.pedir('post', nombre, datos=datos)
+
+
+class BenchmarkIndicesTests(TransactionTestCase):
+    """
+    benchmark_indices con --forzar sobre la base de pruebas. Es una TransactionTestCase porque
+    el editor de esquema de SQLite no puede eliminar índices dentro de una transacción.
+    """
+
+    def test_deja_los_indices_y_los_totales_como_estaban(self):
+        tabla = Transaccion._meta.db_table
+        with connection.cursor() as cursor:
+            antes = set(connection.introspection.get_constraints(cursor, tabla))
+        call_command('benchmark_indices', '--forzar', filas=200, usuarios=2, repeticiones=1, stdout=StringIO())
+
+        with connection.cursor() as cursor:
+            self.assertEqual(set(connection.introspection.get_constraints(cursor, tabla)), antes)
+        usuarios = User.objects.filter(username__startswith='benchmark_indices_')
+        self.assertEqual(usuarios.count(), 2)
+        # La serie diaria y el balance inicial se insertan aparte de las semillas
+        self.assertTrue(Transaccion.objects.filter(usuario__in=usuarios, descripcion='Balance Inicial').exists())
+        self.assertEqual(acumulados.buscar_diferencias(usuarios), [])
+        self.assertEqual(saldos.buscar_diferencias(usuarios), [])
@@ -1,27 +1,35 @@
 from django.urls import path
-from . import views
+from .views import cuentas, dashboard, objetivos, transacciones, vista_perezosa
 from django.contrib.auth import views as auth_views
 
+# Las vistas de exportaciones, importaciones, tareas y recomendaciones usan dependencias
+# pesadas (reportlab, openpyxl, openai): su módulo se importa en la primera petición.
+# Las métricas solo se usan con la instrumentación activa y también se cargan al pedirlas
+
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
-    path('transacciones/', views.lista_transacciones, name='lista_transacciones'),
-    path('transacciones/nueva/', views.nueva_transaccion, name='nueva_transaccion'),
-    path('transacciones/<int:id>/eliminar/', views.eliminar_transaccion, name='eliminar_transaccion'),
-    path('transacciones/descargar/', views.descargar_transacciones, name='descargar_transacciones'),
-    path('transacciones/descargar-pdf/', views.descargar_transacciones_pdf, name='descargar_transacciones_pdf'),
-    path('objetivos/', views.lista_objetivos, name='lista_objetivos'),
-    path('objetivos/nuevo/', views.nuevo_objetivo, name='nuevo_objetivo'),
-    path('objetivos/<int:objetivo_id>/editar/', views.editar_objetivo, name='editar_objetivo'),
-    path('objetivos/<int:objetivo_id>/añadir-dinero/', views.añadir_dinero_objetivo, name='añadir_dinero_objetivo'),
-    path('objetivos/<int:objetivo_id>/eliminar-dinero/', views.eliminar_dinero_objetivo, name='eliminar_dinero_objetivo'),
-    path('objetivos/<int:objetivo_id>/eliminar-objetivo/', views.eliminar_objetivo, name='eliminar_objetivo'),
-    path('login/', views.login_view, name='login'),
-    path('logout/', views.logout_view, name='logout'),
-    path('registro/', views.registro_view, name='registro'),
-    path('perfil/', views.perfil_usuario, name='perfil_usuario'),
-    path('presupuesto/', views.establecer_presupuesto, name='establecer_presupuesto'),
-    path('establecer-balance-inicial/', views.establecer_balance_inicial, name='establecer_balance_inicial'),
-    path('recurrentes/eliminar/<int:serie_id>/', views.eliminar_recurrente, name='eliminar_recurrente'),
+    path('', dashboard.dashboard, name='dashboard'),
+    path('dashboard/evolucion/', dashboard.evolucion_saldo, name='evolucion_saldo'),
+    path('dashboard/widgets/<str:nombre>/', dashboard.widget, name='dashboard_widget'),
+    path('transacciones/', transacciones.lista_transacciones, name='lista_transacciones'),
+    path('transacciones/nueva/', transacciones.nueva_transaccion, name='nueva_transaccion'),
+    path('transacciones/<int:id>/eliminar/', transacciones.eliminar_transaccion, name='eliminar_transaccion'),
+    path('transacciones/importar/', vista_perezosa('finanzas.views.importaciones.importar_transacciones'), name='importar_transacciones'),
+    path('transacciones/descargar/', vista_perezosa('finanzas.views.exportaciones.descargar_transacciones'), name='descargar_transacciones'),
+    path('transacciones/descargar-pdf/', vista_perezosa('finanzas.views.exportaciones.descargar_transacciones_pdf'), name='descargar_transacciones_pdf'),
+    path('transacciones/descargar-excel/', vista_perezosa('finanzas.views.exportaciones.descargar_transacciones_excel'), name='descargar_transacciones_excel'),
+    path('objetivos/', objetivos.lista_objetivos, name='lista_objetivos'),
+    path('objetivos/nuevo/', objetivos.nuevo_objetivo, name='nuevo_objetivo'),
+    path('objetivos/<int:objetivo_id>/editar/', objetivos.editar_objetivo, name='editar_objetivo'),
+    path('objetivos/<int:objetivo_id>/añadir-dinero/', objetivos.añadir_dinero_objetivo, name='añadir_dinero_objetivo'),
+    path('objetivos/<int:objetivo_id>/eliminar-dinero/', objetivos.eliminar_dinero_objetivo, name='eliminar_dinero_objetivo'),
+    path('objetivos/<int:objetivo_id>/eliminar-objetivo/', objetivos.eliminar_objetivo, name='eliminar_objetivo'),
+    path('login/', cuentas.login_view, name='login'),
+    path('logout/', cuentas.logout_view, name='logout'),
+    path('registro/', cuentas.registro_view, name='registro'),
+    path('perfil/', cuentas.perfil_usuario, name='perfil_usuario'),
+    path('presupuesto/', transacciones.establecer_presupuesto, name='establecer_presupuesto'),
+    path('establecer-balance-inicial/', transacciones.establecer_balance_inicial, name='establecer_balance_inicial'),
+    path('recurrentes/eliminar/<int:serie_id>/', transacciones.eliminar_recurrente, name='eliminar_recurrente'),
     path('password_reset/', auth_views.PasswordResetView.as_view(
         template_name='finanzas/password_reset_form.html'
     ), name='password_reset'),
@@ -34,6 +42,8 @@ urlpatterns = [
     path('reset/done/', auth_views.PasswordResetCompleteView.as_view(
         template_name='finanzas/password_reset_complete.html'
     ), name='password_reset_complete'),
-    path('enviar-transacciones-mes/', views.enviar_transacciones_mes, name='enviar_transacciones_mes'),
-    path('generar-recomendaciones/', views.generar_recomendaciones, name='generar_recomendaciones'),
+    path('enviar-transacciones-mes/', vista_perezosa('finanzas.views.tareas.enviar_transacciones_mes'), name='enviar_transacciones_mes'),
+    path('tareas/<int:tarea_id>/', vista_perezosa('finanzas.views.tareas.estado_tarea'), name='estado_tarea'),
+    path('generar-recomendaciones/', vista_perezosa('finanzas.views.recomendaciones.generar_recomendaciones', asincrona=True), name='generar_recomendaciones'),
+    path('metricas/', vista_perezosa('finanzas.views.metricas.metricas'), name='metricas'),
 ]
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Vistas de la aplicación, separadas por funcionalidad.
+
+Las vistas livianas (dashboard, transacciones, objetivos, cuentas) se importan al cargar
+las URLs. Las que dependen de módulos pesados (exportaciones con reportlab/openpyxl,
+recomendaciones con el cliente de OpenAI, tareas en segundo plano) se registran con
+``vista_perezosa`` y su módulo se importa la primera vez que llega una petición.
+"""
+from functools import wraps
+from importlib import import_module
+
+
+def vista_perezosa(ruta, asincrona=False):
+    """
+    Devuelve una vista que importa ``ruta`` ("paquete.modulo.funcion") en la primera petición.
+
+    Django decide si ejecuta una vista como corrutina antes de llamarla, por eso las vistas
+    ``async def`` deben registrarse con ``asincrona=True``. Los atributos que agregan algunos
+    decoradores (p. ej. ``csrf_exempt``) no se ven hasta cargar el módulo: esas vistas no
+    deben registrarse de forma perezosa.
+    """
+    nombre_modulo, nombre_vista = ruta.rsplit('.', 1)
+    cargada = None
+
+    def cargar():
+        nonlocal cargada
+        if cargada is None:
+            cargada = getattr(import_module(nombre_modulo), nombre_vista)
+        return cargada
+
+    if asincrona:
+        async def vista(request, *args, **kwargs):
+            return await cargar()(request, *args, **kwargs)
+    else:
+        def vista(request, *args, **kwargs):
+            return cargar()(request, *args, **kwargs)
+
+    vista.__name__ = vista.__qualname__ = nombre_vista
+    vista.__module__ = nombre_modulo
+    vista.ruta = ruta
+    return vista
@@ -0,0 +1,181 @@
+from django.contrib import messages
+from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.shortcuts import render, redirect
+
+from .. import notificaciones
+
+
+def login_view(request):
+    if request.method == 'POST':
+        email = request.POST.get('email')
+        password = request.POST.get('password')
+        user = authenticate(request, username=email, password=password)
+        
+        if user is not None:
+            login(request, user)
+            nombre = user.first_name if user.first_name else user.email
+            messages.success(request, f'¡Bienvenido {nombre}! Has iniciado sesión correctamente.')
+            return redirect('dashboard')
+        else:
+            messages.error(request, 'Correo electrónico o contraseña incorrectos')
+            return render(request, 'finanzas/login.html')
+    
+    return render(request, 'finanzas/login.html')
+
+
+def registro_view(request):
+    if request.method == 'POST':
+        nombre = request.POST.get('nombre')
+        email = request.POST.get('email')
+        password1 = request.POST.get('password1')
+        password2 = request.POST.get('password2')
+
+        if password1 != password2:
+            return render(request, 'finanzas/registro.html', {
+                'error': 'Las contraseñas no coinciden'
+            })
+
+        # Verificar si el email ya está registrado
+        if User.objects.filter(email=email).exists():
+            return render(request, 'finanzas/registro.html', {
+                'error': 'El correo electrónico ya está registrado'
+            })
+
+        try:
+            user = User.objects.create_user(username=email, email=email, password=password1)
+            user.first_name = nombre
+            user.save()            
+            # Usa authenticate antes de login para obtener el backend
+            user = authenticate(request, username=email, password=password1)
+            login(request, user)
+            
+            return redirect('dashboard')
+        except Exception as e:
+            return render(request, 'finanzas/registro.html', {
+                'error': 'Error al crear el usuario. Por favor, inténtalo de nuevo. ' + str(e)
+            })
+
+    return render(request, 'finanzas/registro.html')
+
+
+def logout_view(request):
+    logout(request)
+    messages.success(request, 'Has cerrado sesión correctamente.')
+    return redirect('login')
+
+
+@login_required
+def perfil_usuario(request):
+    if request.method == 'POST':
+        # Formulario para actualizar información personal
+        if 'update_profile' in request.POST:
+            nombre = request.POST.get('nombre')
+            if nombre:
+                request.user.first_name = nombre
+                request.user.save()
+                messages.success(request, 'Tu nombre ha sido actualizado correctamente.')
+            return redirect('perfil_usuario')
+
+        # Formulario para cambiar la contraseña
+        elif 'update_password' in request.POST:
+            password_errors = []
+            password_actual = request.POST.get('password_actual')
+            password_nueva = request.POST.get('password_nueva')
+            password_confirmar = request.POST.get('password_confirmar')
+            user = request.user
+
+            if not all([password_actual, password_nueva, password_confirmar]):
+                password_errors.append('Por favor, completa todos los campos.')
+            else:
+                if not user.check_password(password_actual):
+                    password_errors.append('La contraseña actual es incorrecta.')
+                if password_nueva != password_confirmar:
+                    password_errors.append('Las nuevas contraseñas no coinciden.')
+                if password_actual == password_nueva:
+                    password_errors.append('La nueva contraseña no puede ser igual a la anterior.')
+                
+                try:
+                    validate_password(password_nueva, user=user)
+                except ValidationError as errors:
+                    password_errors.extend(list(errors))
+
+            if password_errors:
+                return render(request, 'finanzas/perfil.html', {'password_errors': password_errors})
+
+            # Si todas las validaciones pasan, cambiar la contraseña
+            user.set_password(password_nueva)
+            user.save()
+            update_session_auth_hash(request, user)  # Mantener la sesión
+            messages.success(request, 'Tu contraseña ha sido actualizada correctamente.')
+            return redirect('perfil_usuario')
+            
+        # Formulario para preferencias de notificaciones
+        elif 'update_notifications' in request.POST:
+            # Obtener el estado anterior desde la sesión
+            old_email_pref = request.session.get('email_notifications', True)
+
+            # Obtener el nuevo estado desde el formulario
+            new_email_pref = request.POST.get('email_notifications') == 'on'
+            new_goal_pref = request.POST.get('goal_updates') == 'on'
+
+            # Guardar el nuevo estado en la sesión
+            request.session['email_notifications'] = new_email_pref
+            request.session['goal_updates_notifications'] = new_goal_pref
+
+            # Comprobar si el estado cambió para enviar correo
+            if new_email_pref and not old_email_pref:
+                # Enviar correo de activación
+                notificaciones.cambio_notificaciones(request.user, activadas=True)
+                messages.success(request, '¡Notificaciones activadas! Te enviaremos un correo de confirmación.')
+            elif not new_email_pref and old_email_pref:
+                # Enviar correo de desactivación
+                notificaciones.cambio_notificaciones(request.user, activadas=False)
+                messages.success(request, '¡Notificaciones desactivadas! Te enviaremos un correo de confirmación.')
+            else:
+                messages.success(request, 'Tus preferencias de notificación han sido guardadas.')
+
+            return redirect('perfil_usuario')
+
+        # Formulario para configuración de privacidad
+        elif 'update_privacy' in request.POST:
+            # Obtener el estado anterior desde la sesión
+            old_share_data = request.session.get('share_anonymous_data', True)
+            old_public_profile = request.session.get('public_profile', False)
+
+            # Obtener el nuevo estado desde el formulario
+            new_share_data = request.POST.get('share_anonymous_data') == 'on'
+            new_public_profile = request.POST.get('public_profile') == 'on'
+
+            # Guardar siempre el nuevo estado en la sesión
+            request.session['share_anonymous_data'] = new_share_data
+            request.session['public_profile'] = new_public_profile
+
+            # Comprobar si hubo cambios
+            if old_share_data == new_share_data and old_public_profile == new_public_profile:
+                messages.info(request, 'No se han detectado cambios en la configuración de privacidad.')
+            else:
+                # Si hubo cambios, y las notificaciones están activas, enviar correo
+                if request.session.get('email_notifications', True):
+                    notificaciones.cambio_privacidad(request.user, new_share_data, new_public_profile)
+                    messages.success(request, 'Configuración de privacidad guardada. Te enviaremos un correo de confirmación.')
+                else:
+                    messages.success(request, 'Tu configuración de privacidad ha sido guardada.')
+            
+            return redirect('perfil_usuario')
+
+    # Para peticiones GET, pasar el estado de la sesión a la plantilla
+    context = {
+        'notification_prefs': {
+            'email_notifications': request.session.get('email_notifications', True),
+            'goal_updates_notifications': request.session.get('goal_updates_notifications', False)
+        },
+        'privacy_prefs': {
+            'share_anonymous_data': request.session.get('share_anonymous_data', True),
+            'public_profile': request.session.get('public_profile', False)
+        }
+    }
+    return render(request, 'finanzas/perfil.html', context)
@@ -0,0 +1,314 @@
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateformat import format as formatear_fecha
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import condition, conditional_page
+
+from .. import cache_dashboard, evolucion, notificaciones
+from ..models import ObjetivoAhorro, Presupuesto
+from ..proyecciones import movimientos
+from ..resumen import calcular_resumen_mensual, nombre_mes, rango_mes
+from ..templatetags.custom_filters import icono_categoria
+
+
+# 📊 Cifras del mes, gráficos, selector de meses y progreso de objetivos (lo que se guarda en caché),
+# agrupadas por widget del dashboard
+def datos_mensuales(usuario, anio, mes, hoy):
+    # Calcular todas las cifras del mes seleccionado en pocas consultas agrupadas
+    resumen = calcular_resumen_mensual(usuario, anio, mes, hoy)
+
+    # Convertir a lista de diccionarios con categoría y monto para gastos
+    gastos_categorias = [
+        {'categoria': item.categoria, 'monto': float(item.monto)}
+        for item in resumen.gastos_categorias
+    ]
+
+    # Convertir a lista de diccionarios con categoría y monto para ingresos
+    ingresos_categorias = [
+        {'categoria': item.categoria, 'monto': float(item.monto)}
+        for item in resumen.ingresos_categorias
+    ]
+
+    ingresos = resumen.ingresos
+    gastos = resumen.gastos
+
+    # Calcular el saldo total acumulado (independiente del filtro de mes/año)
+    saldo_total = float(resumen.saldo_total)
+
+    # Obtener datos para el gráfico de gastos por día para el mes y año seleccionados
+    gastos_dias_labels = []
+    gastos_dias_data = []
+    for dia, total in resumen.gastos_dias:
+        gastos_dias_labels.append(dia.strftime('%d/%m'))
+        gastos_dias_data.append(float(total))
+
+    # Obtener datos para el gráfico de gastos por mes (últimos 3 meses con transacciones)
+    meses_gastos = []
+    gastos_por_mes = []
+    max_gasto = 0
+    mes_max_gasto = ""
+
+    for mes_fecha, total in resumen.gastos_meses:
+        mes_formateado = nombre_mes(mes_fecha)
+        meses_gastos.append(mes_formateado)
+        monto = float(total)
+        gastos_por_mes.append(monto)
+        if monto > max_gasto:
+            max_gasto = monto
+            mes_max_gasto = mes_formateado
+
+    # Obtener objetivos y calcular días restantes
+    objetivos = list(ObjetivoAhorro.objects.filter(usuario=usuario))
+    colores = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40']  # Lista de colores predefinidos
+    for idx, objetivo in enumerate(objetivos):
+        progreso = (float(objetivo.monto_actual) / float(objetivo.monto_objetivo) * 100) if objetivo.monto_objetivo > 0 else 0
+        objetivo.progreso = round(progreso, 1)
+        objetivo.progreso_str = f"{objetivo.progreso:.1f}"  # Formatear a un decimal
+        objetivo.color = colores[idx % len(colores)]  # Asignar color dinámico basado en la posición
+    objetivos_por_vencer = []
+    objetivos_vencidos = []
+    
+    # Preparar datos para el gráfico de ahorro
+    objetivos_ahorro = []
+    total_ahorrado = 0
+    
+    for objetivo in objetivos:
+        # Calcular el progreso
+        progreso = (float(objetivo.monto_actual) / float(objetivo.monto_objetivo) * 100) if objetivo.monto_objetivo > 0 else 0
+        # objetivo.progreso = f"{progreso:.1f}"  # Formato con punto decimal
+        # Agregar datos para el gráfico
+        objetivos_ahorro.append({
+            'nombre': objetivo.nombre,
+            'monto_actual': float(objetivo.monto_actual),
+            'monto_objetivo': float(objetivo.monto_objetivo),
+            'progreso': round(progreso, 1),
+            'color': objetivo.color,
+        })
+        total_ahorrado += float(objetivo.monto_actual)
+        
+        if objetivo.fecha_limite:
+            dias_restantes = (objetivo.fecha_limite - hoy).days
+            if dias_restantes <= 10 and dias_restantes >= 0:
+                objetivos_por_vencer.append({
+                    'nombre': objetivo.nombre,
+                    'dias_restantes': dias_restantes,
+                    'progreso': round(progreso, 1)
+                })
+            elif dias_restantes < 0:
+                objetivos_vencidos.append({
+                    'nombre': objetivo.nombre,
+                    'dias_vencido': abs(dias_restantes),
+                    'progreso': round(progreso, 1)
+                })
+    
+    # Obtener el último presupuesto del usuario
+    presupuesto = Presupuesto.objects.filter(usuario=usuario).last()
+    presupuesto_monto = float(presupuesto.monto) if presupuesto else 0
+
+    # Formatear los meses y años con transacciones para el selector
+    meses_anios_formateados = [
+        {'value': f'{mes_anio.year}-{mes_anio.month:02d}', 'text': nombre_mes(mes_anio)}
+        for mes_anio in resumen.meses
+    ]
+
+    return {
+        'resumen': {
+            'ingresos': float(ingresos),
+            'gastos': float(gastos),
+            'saldo_total': saldo_total,
+            'presupuesto': presupuesto_monto,
+            # ¿El usuario tiene alguna transacción registrada?
+            'tiene_transacciones': resumen.tiene_transacciones,
+            'meses_anios': meses_anios_formateados,
+        },
+        'categorias': {
+            'gastos': gastos_categorias,
+            'ingresos': ingresos_categorias,
+        },
+        'gastos_diarios': {
+            'labels': gastos_dias_labels,
+            'data': gastos_dias_data,
+        },
+        'gastos_mensuales': {
+            'meses': meses_gastos,
+            'gastos': gastos_por_mes,
+            'mes_max_gasto': mes_max_gasto,
+            'max_gasto': max_gasto,
+        },
+        'objetivos': {
+            'objetivos': objetivos_ahorro,
+            'por_vencer': objetivos_por_vencer,
+            'vencidos': objetivos_vencidos,
+            'total_ahorrado': float(total_ahorrado),
+        },
+    }
+
+
+def mes_seleccionado(request):
+    # Mes y año del parámetro mes_anio en formato YYYY-MM (por defecto, el mes actual)
+    fecha_actual = timezone.now().date()
+    mes_anio_str = request.GET.get('mes_anio')
+    if mes_anio_str:
+        try:
+            # Intentar parsear la cadena YYYY-MM
+            fecha_seleccionada = datetime.strptime(mes_anio_str, '%Y-%m').date()
+            return fecha_seleccionada.year, fecha_seleccionada.month
+        except ValueError:
+            pass
+    return fecha_actual.year, fecha_actual.month
+
+
+# 🏠 Dashboard: solo la estructura de la página, sin datos del usuario. Los widgets se piden
+# en paralelo desde dashboard.js, así que la página se revalida con un ETag de su contenido y
+# normalmente se responde con 304 (el token CSRF lo toma el formulario desde la cookie)
+@login_required
+@cache_control(private=True, no_cache=True)
+@conditional_page
+@ensure_csrf_cookie
+def dashboard(request):
+    # --- Notificaciones de objetivos por vencer ---
+    email_enabled = request.session.get('email_notifications', True)
+    goal_updates_enabled = request.session.get('goal_updates_notifications', False)
+
+    if email_enabled and goal_updates_enabled:
+        hoy = timezone.now().date()
+        limite_vencimiento = hoy + timedelta(days=7)
+        
+        # Objetivos que están por vencer en los próximos 7 días y no están completados
+        objetivos_por_vencer = ObjetivoAhorro.objects.filter(
+            usuario=request.user,
+            fecha_limite__gte=hoy,
+            fecha_limite__lte=limite_vencimiento,
+            completado=False
+        )
+
+        # Usar la sesión para evitar enviar notificaciones repetidas
+        notificaciones_enviadas = request.session.get('notif_vencimiento_enviadas', [])
+        
+        for objetivo in objetivos_por_vencer:
+            if objetivo.id not in notificaciones_enviadas:
+                notificaciones.objetivo_por_vencer(request.user, objetivo)
+                notificaciones_enviadas.append(objetivo.id)
+        
+        request.session['notif_vencimiento_enviadas'] = notificaciones_enviadas
+
+    return render(request, 'finanzas/dashboard.html', {'widgets': list(WIDGETS)})
+
+
+# 🧩 Widgets del dashboard (JSON). Todos dependen de la versión de los datos del usuario
+# (finanzas/cache_dashboard.py), del mes pedido y del día: con eso se arman el ETag y la fecha
+# de modificación, y un widget que no cambió se responde con 304 sin calcular nada
+
+def widget_mensual(clave):
+    # Parte de las cifras del mes guardadas en caché
+    def calcular(request, anio, mes, hoy):
+        datos = cache_dashboard.obtener(
+            request.user.id,
+            f'{anio}-{mes:02d}:{hoy}',
+            lambda: datos_mensuales(request.user, anio, mes, hoy),
+        )
+        return datos[clave]
+    return calcular
+
+
+def widget_resumen(request, anio, mes, hoy):
+    return {
+        **widget_mensual('resumen')(request, anio, mes, hoy),
+        'nombre_usuario': request.user.first_name or request.user.username,
+        'mes_seleccionado': f'{anio}-{mes:02d}',
+    }
+
+
+def widget_ultimas(request, anio, mes, hoy):
+    # Últimas 10 transacciones del mes seleccionado hasta hoy, incluidas las ocurrencias de
+    # series recurrentes que aún no se registraron (virtuales, primero dentro del mismo día)
+    inicio_mes, fin_mes = rango_mes(anio, mes)
+    ultimas = islice(
+        movimientos(request.user, inicio_mes, min(fin_mes - timedelta(days=1), hoy), descendente=True),
+        10
+    )
+    return {
+        'transacciones': [
+            {
+                'descripcion': transaccion.descripcion,
+                'categoria': transaccion.categoria or 'Sin categoría',
+                'icono': icono_categoria(transaccion.categoria),
+                'tipo': transaccion.tipo,
+                'monto': float(transaccion.monto),
+                'fecha': transaccion.fecha.isoformat(),
+                'fecha_texto': formatear_fecha(transaccion.fecha, 'd M Y'),
+            }
+            for transaccion in ultimas
+        ],
+    }
+
+
+WIDGETS = {
+    'resumen': widget_resumen,
+    'categorias': widget_mensual('categorias'),
+    'gastos-diarios': widget_mensual('gastos_diarios'),
+    'gastos-mensuales': widget_mensual('gastos_mensuales'),
+    'objetivos': widget_mensual('objetivos'),
+    'ultimas': widget_ultimas,
+}
+
+
+def _etag_widget(request, nombre):
+    anio, mes = mes_seleccionado(request)
+    version = cache_dashboard.version(request.user.id)
+    return f'{nombre}-{version}-{anio}{mes:02d}-{timezone.now().date():%Y%m%d}'
+
+
+def _modificado_widget(request, nombre):
+    # Los widgets cambian con los datos del usuario y también al cambiar el día
+    inicio_del_dia = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(cache_dashboard.modificado(request.user.id), inicio_del_dia)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_etag_widget, last_modified_func=_modificado_widget)
+def widget(request, nombre):
+    if nombre not in WIDGETS:
+        raise Http404('Widget desconocido')
+    anio, mes = mes_seleccionado(request)
+    return JsonResponse(WIDGETS[nombre](request, anio, mes, timezone.now().date()))
+
+
+# 📈 Evolución del saldo, ingresos y gastos (JSON para el gráfico del dashboard)
+@login_required
+def evolucion_saldo(request):
+    # Parámetros: desde y hasta (AAAA-MM-DD, por defecto el último año), granularidad
+    # (dia, semana o mes) y puntos (máximo de puntos de la respuesta)
+    hoy = timezone.now().date()
+    try:
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else hoy
+        desde = date.fromisoformat(request.GET['desde']) if request.GET.get('desde') else hasta - timedelta(days=365)
+        puntos = int(request.GET.get('puntos', 200))
+    except (ValueError, OverflowError):
+        return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+    granularidad = request.GET.get('granularidad', 'dia')
+    if granularidad not in evolucion.GRANULARIDADES:
+        return JsonResponse({'error': 'La granularidad debe ser dia, semana o mes'}, status=400)
+    if desde > hasta:
+        return JsonResponse({'error': 'La fecha desde no puede ser posterior a hasta'}, status=400)
+    if desde < evolucion.MIN_FECHA:
+        return JsonResponse({'error': 'La fecha desde está fuera de rango'}, status=400)
+    if (hasta - desde).days > evolucion.MAX_DIAS:
+        return JsonResponse({'error': f'El rango no puede superar los {evolucion.MAX_DIAS} días'}, status=400)
+    if not 3 <= puntos <= evolucion.MAX_PUNTOS:
+        return JsonResponse({'error': f'puntos debe estar entre 3 y {evolucion.MAX_PUNTOS}'}, status=400)
+
+    # Se guarda en la caché del dashboard: se invalida con cualquier cambio del usuario
+    datos = cache_dashboard.obtener(
+        request.user.id,
+        f'evolucion:{desde}:{hasta}:{granularidad}:{puntos}',
+        lambda: evolucion.evolucion(request.user, desde, hasta, granularidad, puntos),
+    )
+    return JsonResponse(datos)
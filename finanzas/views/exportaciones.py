@@ -0,0 +1,51 @@
+import tempfile
+
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
+
+from ..exportaciones import generar_csv, generar_pdf, archivo_excel, CONTENT_TYPE_EXCEL
+from ..filtros import filtros_desde_parametros, filtrar_transacciones
+from ..models import Transaccion
+from ..respuestas import partes_para, respuesta_archivo
+
+
+@login_required
+def descargar_transacciones(request):
+    # Transacciones del usuario con los mismos filtros que la lista (mes, categoría, fechas)
+    filtros = filtros_desde_parametros(request.GET)
+    transacciones = filtrar_transacciones(
+        Transaccion.objects.filter(usuario=request.user), filtros
+    ).order_by('-fecha', '-id')
+
+    # El CSV se genera por bloques mientras se envía, sin cargarlo completo en memoria
+    response = StreamingHttpResponse(partes_para(request, generar_csv(transacciones)), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="transacciones.csv"'
+    return response
+
+
+@login_required
+def descargar_transacciones_pdf(request):
+    # Transacciones del usuario con los mismos filtros que la lista (mes, categoría, fechas)
+    filtros = filtros_desde_parametros(request.GET)
+    transacciones = filtrar_transacciones(
+        Transaccion.objects.filter(usuario=request.user), filtros
+    ).order_by('-fecha', '-id')
+
+    # El PDF se escribe en un archivo temporal y se envía por bloques desde el disco
+    archivo = tempfile.TemporaryFile()
+    generar_pdf(transacciones, archivo)
+    archivo.seek(0)
+    return respuesta_archivo(request, archivo, as_attachment=True, filename='transacciones.pdf', content_type='application/pdf')
+
+
+@login_required
+def descargar_transacciones_excel(request):
+    # Transacciones del usuario con los mismos filtros que la lista (mes, categoría, fechas)
+    filtros = filtros_desde_parametros(request.GET)
+    transacciones = filtrar_transacciones(
+        Transaccion.objects.filter(usuario=request.user), filtros
+    ).order_by('-fecha', '-id')
+
+    # El libro se escribe en modo de solo escritura y pasa a disco si crece demasiado
+    archivo = archivo_excel(transacciones)
+    return respuesta_archivo(request, archivo, as_attachment=True, filename='transacciones.xlsx', content_type=CONTENT_TYPE_EXCEL)
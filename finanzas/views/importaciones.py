@@ -0,0 +1,46 @@
+import json
+import logging
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+
+from ..forms import ImportacionForm
+from ..importaciones import ArchivoInvalido, formato_de, importar
+from ..respuestas import partes_para
+
+logger = logging.getLogger(__name__)
+
+
+def _linea(datos):
+    return json.dumps(datos, ensure_ascii=False) + '\n'
+
+
+# 📥 Importar transacciones desde un archivo del banco (CSV, Excel u OFX)
+@login_required
+def importar_transacciones(request):
+    if request.method != 'POST':
+        return render(request, 'finanzas/importar_transacciones.html', {'form': ImportacionForm()})
+
+    form = ImportacionForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({'errores': [error for errores in form.errors.values() for error in errores]}, status=400)
+    archivo = form.cleaned_data['archivo']
+    usuario = request.user
+
+    # El progreso se envía mientras se importa: una línea JSON por lote y la última con el
+    # resumen. Si el cliente corta la conexión, la importación se deshace completa
+    def progreso():
+        try:
+            for estado in importar(usuario, archivo, formato_de(archivo.name)):
+                yield _linea(estado.como_dict())
+        except ArchivoInvalido as e:
+            yield _linea({'error': str(e)})
+        except Exception:
+            logger.exception('Error importando %s del usuario %s', archivo.name, usuario.id)
+            yield _linea({'error': 'No se pudo leer el archivo. Revisa que el formato sea correcto.'})
+
+    response = StreamingHttpResponse(partes_para(request, progreso()), content_type='application/x-ndjson; charset=utf-8')
+    # Que los proxies no junten las líneas antes de enviarlas
+    response['X-Accel-Buffering'] = 'no'
+    return response
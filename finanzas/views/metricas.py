@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .. import cache_dashboard
+from ..instrumentacion import histograma
+
+
+# 📈 Métricas del proceso en formato de texto de Prometheus (solo con la instrumentación activa)
+def metricas(request):
+    if not settings.INSTRUMENTACION:
+        raise Http404
+
+    # Acceso para el personal o para un recolector con el token de config.ini
+    token = settings.INSTRUMENTACION_TOKEN
+    autorizacion = request.headers.get('Authorization', '')
+    if not (request.user.is_staff or (token and constant_time_compare(autorizacion, f'Bearer {token}'))):
+        return HttpResponse(status=403)
+
+    lineas = [histograma.exportar()]
+    lineas.append('# TYPE ecofinance_cache_dashboard_total counter')
+    for metrica, valor in cache_dashboard.metricas().items():
+        if metrica != 'tasa_aciertos':
+            lineas.append(f'ecofinance_cache_dashboard_total{{resultado="{metrica}"}} {valor}')
+    return HttpResponse('\n'.join(lineas) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
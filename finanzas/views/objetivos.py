@@ -0,0 +1,213 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+
+from .. import notificaciones
+from ..forms import ObjetivoForm
+from ..models import ObjetivoAhorro
+from ..objetivos import aportar
+
+
+# 📄 Lista de objetivos de ahorro
+@login_required
+def lista_objetivos(request):
+    objetivos = ObjetivoAhorro.objects.filter(usuario=request.user).order_by('fecha_limite')
+    objetivos_por_vencer = []
+    objetivos_vencidos = []
+    fecha_actual = timezone.now().date()
+    
+    for objetivo in objetivos:
+        # Calcular el progreso
+        progreso = (objetivo.monto_actual / objetivo.monto_objetivo * 100) if objetivo.monto_objetivo > 0 else 0
+        objetivo.progreso = round(progreso, 1)
+        
+        if objetivo.fecha_limite:
+            dias_restantes = (objetivo.fecha_limite - fecha_actual).days
+            if dias_restantes <= 10 and dias_restantes >= 0:
+                objetivos_por_vencer.append({
+                    'nombre': objetivo.nombre,
+                    'dias_restantes': dias_restantes,
+                    'progreso': objetivo.progreso
+                })
+            elif dias_restantes < 0:
+                objetivos_vencidos.append({
+                    'nombre': objetivo.nombre,
+                    'dias_vencido': abs(dias_restantes),
+                    'progreso': objetivo.progreso
+                })
+        objetivo.progreso_str = f"{objetivo.progreso:.1f}"  # Formatear a un decimal
+    
+    return render(request, 'finanzas/lista_objetivos.html', {
+        'objetivos': objetivos,
+        'objetivos_por_vencer': objetivos_por_vencer,
+        'objetivos_vencidos': objetivos_vencidos,
+        'fecha_actual': fecha_actual
+    })
+
+
+# ➕ Crear nuevo objetivo de ahorro
+@login_required
+def nuevo_objetivo(request):
+    if request.method == 'POST':
+        form = ObjetivoForm(request.POST)
+        if form.is_valid():
+            objetivo = form.save(commit=False)
+            objetivo.usuario = request.user
+            objetivo.save()
+            messages.success(request, f'¡Objetivo "{objetivo.nombre}" creado exitosamente!')
+
+            # --- Envío de correo al crear un nuevo objetivo ---
+            email_enabled = request.session.get('email_notifications', True)
+            goal_updates_enabled = request.session.get('goal_updates_notifications', False)
+
+            if email_enabled and goal_updates_enabled:
+                notificaciones.objetivo_creado(request.user, objetivo)
+
+            return redirect('lista_objetivos')
+    else:
+        form = ObjetivoForm(initial={'monto_actual': 0})
+
+    fecha_actual = timezone.now().date().isoformat()  # Formato YYYY-MM-DD
+    return render(request, 'finanzas/nuevo_objetivo.html', {
+        'form': form,
+        'fecha_actual': fecha_actual
+    })
+
+
+@login_required
+def editar_objetivo(request, objetivo_id):
+    objetivo = get_object_or_404(ObjetivoAhorro, id=objetivo_id, usuario=request.user)
+    
+    if request.method == 'POST':
+        form = ObjetivoForm(request.POST, instance=objetivo)
+        if form.is_valid():
+            form.save()
+            messages.success(request, f'¡Objetivo "{objetivo.nombre}" actualizado exitosamente!')
+            return redirect('lista_objetivos')
+    else:
+        form = ObjetivoForm(instance=objetivo)
+
+    return render(request, 'finanzas/editar_objetivo.html', {
+        'form': form,
+        'objetivo': objetivo
+    })
+
+
+@login_required
+def añadir_dinero_objetivo(request, objetivo_id):
+    objetivo = get_object_or_404(ObjetivoAhorro, id=objetivo_id, usuario=request.user)
+    user = request.user
+
+    # Verificar si las notificaciones están activadas en la sesión
+    email_enabled = request.session.get('email_notifications', True)
+    goal_updates_enabled = request.session.get('goal_updates_notifications', False)
+
+    if request.method == 'POST':
+        monto = request.POST.get('monto')
+        try:
+            monto = Decimal(monto)
+            if monto <= 0:
+                messages.error(request, 'El monto debe ser mayor que 0.')
+                return redirect('lista_objetivos')
+
+            if objetivo.monto_actual + monto > objetivo.monto_objetivo:
+                messages.warning(request, 'No puedes añadir más dinero del que falta para alcanzar el objetivo.')
+                return redirect('lista_objetivos')
+            
+            monto_previo = objetivo.monto_actual
+            estaba_completado = objetivo.completado
+
+            # Registra el aporte como gasto y lo suma al objetivo
+            aportar(objetivo, monto)
+
+            if not estaba_completado and objetivo.completado:
+                messages.success(request, f'¡Felicidades! Has completado tu objetivo "{objetivo.nombre}".')
+            else:
+                messages.success(request, f'Se han añadido ${int(monto):,}'.replace(',', '.') + f' al objetivo "{objetivo.nombre}".')
+
+            # --- Lógica de envío de correos ---
+            if email_enabled and goal_updates_enabled:
+                # 1. Correo de confirmación por añadir dinero (se envía siempre)
+                notificaciones.aporte_objetivo(user, objetivo, monto)
+
+                # 2. Correo si el objetivo se acaba de completar
+                if not estaba_completado and objetivo.completado:
+                    notificaciones.objetivo_cumplido(user, objetivo)
+                # 3. Correo si el objetivo está cerca de completarse (y no está ya completado)
+                elif not objetivo.completado:
+                    porcentaje_actual = (objetivo.monto_actual / objetivo.monto_objetivo) * 100
+                    porcentaje_previo = (monto_previo / objetivo.monto_objetivo) * 100
+
+                    if porcentaje_actual >= 90 and porcentaje_previo < 90:
+                        notificaciones.objetivo_casi_cumplido(user, objetivo, porcentaje_actual)
+
+                # 4. Correo si la fecha límite está cerca (y no se ha enviado antes)
+                dias_restantes = (objetivo.fecha_limite - date.today()).days
+                notificacion_deadline_enviada = request.session.get(f'deadline_notified_{objetivo.id}', False)
+
+                if 0 <= dias_restantes < 10 and not notificacion_deadline_enviada and not objetivo.completado:
+                    notificaciones.plazo_objetivo(user, objetivo, dias_restantes)
+                    request.session[f'deadline_notified_{objetivo.id}'] = True
+
+        except (ValueError, InvalidOperation):
+            messages.error(request, 'El monto ingresado no es válido.')
+
+    return redirect('lista_objetivos')
+
+
+@login_required
+def eliminar_dinero_objetivo(request, objetivo_id):
+    objetivo = get_object_or_404(ObjetivoAhorro, id=objetivo_id, usuario=request.user)
+    
+    if request.method == 'POST':
+        monto = request.POST.get('monto')
+        try:
+            monto = Decimal(monto)
+            if monto <= 0:
+                messages.error(request, 'El monto debe ser mayor que 0')
+                return redirect('lista_objetivos')
+            
+            if monto > objetivo.monto_actual:
+                messages.error(request, 'No puedes retirar más dinero del que tienes en el objetivo')
+                return redirect('lista_objetivos')
+            
+            objetivo.monto_actual -= monto
+            objetivo.save()
+            messages.success(request, f'Se han retirado ${int(monto):,}'.replace(',', '.') + f' del objetivo "{objetivo.nombre}"')
+        except (ValueError, InvalidOperation):
+            messages.error(request, 'El monto ingresado no es válido')
+    
+    return redirect('lista_objetivos')
+
+
+@login_required
+def eliminar_objetivo(request, objetivo_id):
+    objetivo = get_object_or_404(ObjetivoAhorro, id=objetivo_id, usuario=request.user)
+    
+    if request.method == 'POST':
+        nombre_objetivo = objetivo.nombre
+        user = request.user
+        
+        # Primero, preparamos el correo
+        email_enabled = request.session.get('notifications_email', False)
+        goal_updates_enabled = request.session.get('notifications_goals', False)
+
+        if email_enabled and goal_updates_enabled:
+            notificaciones.objetivo_eliminado(user, nombre_objetivo)
+        else:
+            # Mensaje de diagnóstico si las notificaciones están desactivadas
+            messages.warning(request, "El correo de notificación no se envió porque las notificaciones por correo para objetivos están desactivadas en tu perfil.")
+
+        # Ahora, eliminamos el objetivo
+        objetivo.delete()
+        messages.success(request, f'El objetivo "{nombre_objetivo}" ha sido eliminado correctamente.')
+        
+        return redirect('lista_objetivos')
+
+    # Si no es POST, simplemente renderizamos la página (aunque el modal se encarga)
+    # o redirigimos. La redirección es más segura.
+    return redirect('lista_objetivos')
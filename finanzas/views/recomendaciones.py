@@ -0,0 +1,18 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+
+from ..recomendaciones import recomendar, RecomendacionNoDisponible
+
+
+@login_required
+async def generar_recomendaciones(request):
+    # Vista asíncrona: mientras se espera al modelo el worker ASGI puede atender otras peticiones
+    usuario = await request.auser()
+    fecha_actual = timezone.now().date()
+    try:
+        recomendaciones, desde_cache = await recomendar(usuario.pk, fecha_actual.year, fecha_actual.month)
+    except RecomendacionNoDisponible as e:
+        return JsonResponse({'error': str(e)}, status=e.estado)
+
+    return JsonResponse({'recomendaciones': recomendaciones, 'desde_cache': desde_cache})
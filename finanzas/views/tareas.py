@@ -0,0 +1,40 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Tarea
+from ..tareas import RESULTADOS, encolar_tarea
+
+
+@login_required
+def enviar_transacciones_mes(request):
+    # El Excel se genera y se envía en segundo plano (comando procesar_tareas);
+    # si ya hay una solicitud activa para este mes se devuelve la misma tarea
+    ahora = timezone.now()
+    tarea, creada = encolar_tarea(request.user, 'ENVIAR_TRANSACCIONES_MES', ahora.year, ahora.month)
+    return JsonResponse({
+        "tarea_id": tarea.id,
+        "estado": tarea.estado,
+        "creada": creada,
+        "url_estado": reverse('estado_tarea', args=[tarea.id]),
+    }, status=202)
+
+
+@login_required
+def estado_tarea(request, tarea_id):
+    tarea = get_object_or_404(Tarea, id=tarea_id, usuario=request.user)
+    return JsonResponse({
+        "tarea_id": tarea.id,
+        "tipo": tarea.tipo,
+        "estado": tarea.estado,
+        "error": tarea.error,
+        # TERMINADA no implica que el correo ya salió: ver RESULTADOS en finanzas/tareas.py
+        "resultado": RESULTADOS.get(tarea.tipo) if tarea.estado == 'TERMINADA' else None,
+        "fecha_creacion": tarea.fecha_creacion.isoformat(),
+        "fecha_inicio": tarea.fecha_inicio.isoformat() if tarea.fecha_inicio else None,
+        "fecha_fin": tarea.fecha_fin.isoformat() if tarea.fecha_fin else None,
+        "segundos_en_cola": round(tarea.segundos_en_cola, 3),
+        "segundos_ejecucion": round(tarea.segundos_ejecucion, 3) if tarea.segundos_ejecucion is not None else None,
+    })
@@ -0,0 +1,283 @@
+from datetime import date
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.db import transaction
+from django.db.models import F
+from django.http import JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+
+from ..acumulados import registrar_altas, registrar_bajas
+from ..filtros import filtros_desde_parametros, filtrar_transacciones, contar_aproximado
+from ..forms import TransaccionForm, PresupuestoForm
+from ..models import Transaccion, SerieRecurrente, AcumuladoMensual
+from ..objetivos import revertir_aporte
+from ..paginacion import paginar_por_cursor
+from ..recurrentes import crear_serie, programar
+from ..resumen import nombre_mes
+from ..saldos import saldo_actual
+
+# Órdenes de la lista cuyas columnas no admiten nulos: se paginan por cursor
+ORDENES_CON_CURSOR = {'-fecha', 'fecha', '-monto', 'monto', 'descripcion', '-descripcion', 'tipo', '-tipo'}
+
+# Columnas de la tabla de recurrentes y el campo de SerieRecurrente por el que se ordenan
+ORDEN_RECURRENTES = {
+    'Descripción': 'descripcion',
+    'Categoría': 'categoria',
+    'Tipo': 'tipo',
+    'Fecha Inicio': 'fecha_inicio',
+    'Fecha Fin': 'fecha_fin',
+    'Periodicidad': 'periodicidad',
+    'Próxima Fecha': 'proxima_fecha',
+    'Activa': 'activa',
+}
+
+
+# 📄 Lista de transacciones
+@login_required
+def lista_transacciones(request):
+    fecha_actual = timezone.now().date()
+
+    # Obtener parámetros de filtro
+    filtros = filtros_desde_parametros(request.GET)
+    mes = filtros['mes']
+    categoria = filtros['categoria']
+    fecha_desde_str = filtros['fecha_desde_str']
+    fecha_hasta_str = filtros['fecha_hasta_str']
+    orden = request.GET.get('orden')
+    orden_recurrente = request.GET.get('orden_recurrente')
+
+    # Convertir la cadena 'None' a None real para el orden
+    if orden == 'None':
+        orden = None
+
+    # Filtrar transacciones para la tabla principal
+    transacciones = Transaccion.objects.filter(
+        usuario=request.user,
+        fecha__lte=fecha_actual # Añadir filtro para mostrar solo transacciones hasta la fecha actual
+    )
+
+    # Aplicar filtros
+    transacciones = filtrar_transacciones(transacciones, filtros)
+
+    # Orden por defecto: fecha descendente y luego id descendente
+    if not orden:
+        orden = '-fecha'
+    if orden == '-fecha':
+        ordenes = ['-fecha', '-id']
+    elif orden == 'fecha':
+        ordenes = ['fecha', 'id']
+    elif orden == '-monto':
+        ordenes = ['-monto', '-fecha', '-id']
+    elif orden == 'monto':
+        ordenes = ['monto', 'fecha', 'id']
+    elif orden == 'descripcion':
+        ordenes = ['descripcion', '-fecha', '-id']
+    elif orden == '-descripcion':
+        ordenes = ['-descripcion', '-fecha', '-id']
+    elif orden == 'categoria':
+        ordenes = ['categoria', '-fecha', '-id']
+    elif orden == '-categoria':
+        ordenes = ['-categoria', '-fecha', '-id']
+    elif orden == 'tipo':
+        ordenes = ['tipo', '-fecha', '-id']
+    elif orden == '-tipo':
+        ordenes = ['-tipo', '-fecha', '-id']
+    else:
+        ordenes = [orden, '-fecha', '-id']
+
+    # Obtener categorías y meses para los filtros desde los acumulados mensuales
+    acumulados = AcumuladoMensual.objects.filter(usuario=request.user, cantidad__gt=0)
+
+    # Categorías únicas (sin la categoría vacía) ordenadas
+    categorias = sorted(set(acumulados.exclude(categoria='').values_list('categoria', flat=True)))
+
+    # Meses únicos con transacciones, formateados para el selector (ej: 'Enero 2025')
+    meses_con_transacciones = acumulados.values_list('anio', 'mes').distinct().order_by('anio', 'mes')
+    meses_formateados = []
+    for anio_num, mes_num in meses_con_transacciones:
+        meses_formateados.append({'value': f'{anio_num}-{mes_num:02d}', 'text': nombre_mes(date(anio_num, mes_num, 1))})
+
+    # Paginación: por cursor cuando las columnas del orden no admiten nulos (cada página es
+    # un rango del índice, sin OFFSET ni COUNT); la categoría puede ser nula y usa Paginator
+    if orden in ORDENES_CON_CURSOR:
+        transacciones_paginadas = paginar_por_cursor(
+            transacciones, ordenes, request.GET.get('cursor'), por_pagina=10,
+            contar=lambda: contar_aproximado(request.user, filtros, hasta=fecha_actual),
+        )
+    else:
+        page = request.GET.get('page', 1)
+        paginator = Paginator(transacciones.order_by(*ordenes), 10)
+        try:
+            transacciones_paginadas = paginator.page(page)
+        except PageNotAnInteger:
+            transacciones_paginadas = paginator.page(1)
+        except EmptyPage:
+            transacciones_paginadas = paginator.page(paginator.num_pages)
+
+    # Series recurrentes activas con su plantilla y su próxima fecha ya calculada:
+    # una sola consulta (índice serie_usuario_proxima)
+    series_activas = SerieRecurrente.objects.filter(usuario=request.user, activa=True)
+
+    # Lógica de ordenamiento para series recurrentes (columnas de la plantilla)
+    campo = ORDEN_RECURRENTES.get((orden_recurrente or '').lstrip('-'))
+    if campo:
+        # Sin fecha de fin o sin próxima fecha cuenta como "la fecha más lejana"; sin categoría, como vacía
+        nulos_como_maximo = campo in ('fecha_fin', 'proxima_fecha')
+        if orden_recurrente.startswith('-'):
+            expresion = F(campo).desc(**({'nulls_first': True} if nulos_como_maximo else {'nulls_last': True}))
+        else:
+            expresion = F(campo).asc(**({'nulls_last': True} if nulos_como_maximo else {'nulls_first': True}))
+        series_activas = series_activas.order_by(expresion, 'id')
+    else:
+        series_activas = series_activas.order_by('id')
+
+    series_con_base = [
+        {
+            'serie': serie,
+            'proxima_fecha': serie.proxima_fecha,
+            'periodicidad_display': serie.get_periodicidad_display(),
+        }
+        for serie in series_activas
+    ]
+
+    context = {
+        'transacciones': transacciones_paginadas,
+        'orden_actual': orden,
+        'categorias': categorias,
+        'meses': meses_formateados, # Pasar la lista de meses formateados
+        'mes_actual': mes,
+        'categoria_actual': categoria,
+        'fecha_desde': fecha_desde_str,
+        'fecha_hasta': fecha_hasta_str,
+        'series_con_base': series_con_base,
+        'today': fecha_actual,
+        'orden_recurrente_actual': orden_recurrente,
+    }
+
+    return render(request, 'finanzas/lista_transacciones.html', context)
+
+
+# ➕ Crear nueva transacción
+@login_required
+def nueva_transaccion(request):
+    if request.method == 'POST':
+        form = TransaccionForm(request.POST)
+        if form.is_valid():
+            transaccion = form.save(commit=False)
+            transaccion.usuario = request.user
+            tipo = request.POST.get('tipo')
+            if tipo:
+                transaccion.tipo = tipo
+
+            with transaction.atomic():
+                # Si es recurrente, crear la serie con esta transacción como plantilla
+                if transaccion.es_recurrente:
+                    transaccion.serie_recurrente = crear_serie(transaccion)
+
+                transaccion.save()
+                registrar_altas([transaccion])
+            
+            messages.success(request, '¡Transacción registrada exitosamente!')
+            return redirect('dashboard')
+    else:
+        form = TransaccionForm()
+    
+    return render(request, 'finanzas/nueva_transaccion.html', {'form': form})
+
+
+def calcular_saldo_total(usuario):
+    # Saldo mantenido al registrar y eliminar transacciones (ver finanzas/saldos.py)
+    return float(saldo_actual(usuario))
+
+
+@login_required
+def establecer_presupuesto(request):
+    if request.method == 'POST':
+        form = PresupuestoForm(request.POST)
+        if form.is_valid():
+            presupuesto = form.save(commit=False)
+            presupuesto.usuario = request.user
+            presupuesto.save()
+            messages.success(request, 'Presupuesto establecido correctamente')
+            return redirect('dashboard')
+    else:
+        form = PresupuestoForm()
+
+    return render(request, 'finanzas/establecer_presupuesto.html', {
+        'form': form
+    })
+
+
+@login_required
+def eliminar_transaccion(request, id):
+    transaccion = get_object_or_404(Transaccion, id=id, usuario=request.user)
+    
+    with transaction.atomic():
+        # Si es un aporte a un objetivo de ahorro, se descuenta del objetivo
+        revertir_aporte(transaccion)
+
+        # Eliminar la transacción
+        registrar_bajas([transaccion])
+        transaccion.delete()
+    messages.success(request, "Transacción eliminada con éxito.")
+    return redirect('lista_transacciones')
+
+
+@login_required
+def establecer_balance_inicial(request):
+    # Verificar si ya existe un balance inicial
+    if Transaccion.objects.filter(usuario=request.user, descripcion="Balance Inicial").exists():
+        messages.error(request, 'Ya has establecido un balance inicial.')
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        balance_inicial = request.POST.get('balance_inicial')
+        try:
+            # Validar que el balance inicial sea un número válido
+            balance_inicial = float(balance_inicial)
+            if balance_inicial < 0:
+                messages.error(request, 'El balance inicial no puede ser negativo.')
+                return redirect('dashboard')
+
+            # Crear una transacción de tipo "INGRESO" para el balance inicial
+            with transaction.atomic():
+                balance = Transaccion.objects.create(
+                    usuario=request.user,
+                    descripcion="Balance Inicial",
+                    monto=balance_inicial,
+                    tipo="INGRESO",
+                    categoria="General",
+                    fecha=timezone.now()
+                )
+                registrar_altas([balance])
+
+            messages.success(request, '¡Balance inicial establecido correctamente!')
+            return redirect('dashboard')
+        except ValueError:
+            messages.error(request, 'Por favor, ingresa un número válido.')
+            return redirect('dashboard')
+    else:
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+
+
+@login_required
+def listar_recurrentes(request):
+    series = SerieRecurrente.objects.filter(usuario=request.user, activa=True)
+    return render(request, 'finanzas/lista_recurrentes.html', {'series': series})
+
+
+@login_required
+def eliminar_recurrente(request, serie_id):
+    serie = get_object_or_404(SerieRecurrente, id=serie_id, usuario=request.user, activa=True)
+    hoy = timezone.now().date()
+    with transaction.atomic():
+        futuras = Transaccion.objects.filter(serie_recurrente=serie, fecha__gt=hoy)
+        registrar_bajas(futuras)
+        futuras.delete()
+        serie.activa = False
+        programar(serie).save()
+    messages.success(request, "Transacción recurrente eliminada y futuras transacciones canceladas.")
+    return redirect('lista_transacciones')